@@ -6,6 +6,7 @@ from .feedback_learning import feedback_learning_agent
 from .metrics_agent import metrics_agent
 from .outfit_designer import outfit_designer_agent
 from .preference_ranking import preference_ranking_agent
+from .slate_join import slate_join_agent
 from .wardrobe_cataloger import wardrobe_cataloger_agent
 from .weather_agent import weather_agent
 
@@ -16,6 +17,7 @@ __all__ = [
     "metrics_agent",
     "outfit_designer_agent",
     "preference_ranking_agent",
+    "slate_join_agent",
     "wardrobe_cataloger_agent",
     "cloth_registrar_agent",
 ]
@@ -0,0 +1,638 @@
+"""Deterministic travel capsule planner.
+
+Travel mode asks for one outfit per trip day while packing as few unique pieces
+as possible, a set-cover style problem. `plan_capsule` scores each day's
+candidates with the outfit engine (that day's weather and occasion), adding
+combinations of the pieces that suit the trip as a whole so days can share
+them. It builds a greedy plan starting from the most constrained day, then
+improves it with local search: single-day swaps plus a move that drops one
+packed item by re-dressing every day that used it. Seeded perturbations restart
+the search until ``max_rounds`` or the time budget runs out.
+
+Plans compare lexicographically: fewest days that repeat an earlier day's base
+(top + bottom, or dress), then fewest unique items, then the highest total
+engine score. Shoes, outer layers and accessories are meant to be re-worn.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import time
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+from agents.outfit_designer import (
+    OutfitCandidate,
+    OutfitDesignerInput,
+    OutfitDesignerOutput,
+    OutfitItemDetail,
+    TravelDesignerOutput,
+    TripDay,
+)
+from agents.outfit_engine import (
+    SLOT_BEAM,
+    DesignContext,
+    WardrobeIndex,
+    _combine,
+    _enumerate,
+    _outfit_description,
+    _outfit_name,
+    _score_item,
+    _Scored,
+    design_context_from_state,
+    is_travel_request,
+    short_name,
+)
+from agents.state_payloads import (
+    content_text,
+    load_payload,
+    wardrobe_items_from_state,
+    weather_from_state,
+)
+from agents.wardrobe_cataloger import WardrobeItem
+
+DEFAULT_TIME_BUDGET_S = 0.5
+DEFAULT_MAX_ROUNDS = 200
+# Per-day candidates kept for the search, the share of them reserved for
+# combinations of the trip-wide pieces (the ones days can share), and how far
+# below the day's best outfit a candidate may score and still be packed. Every
+# candidate is scanned on each local-search move, so the cap sets the search speed.
+CANDIDATE_LIMIT = 400
+TRIP_SHARE = 0.75
+SCORE_SLACK = 0.25
+# Share of days re-drawn by each perturbation, and from how many top options.
+PERTURB_SHARE = 0.34
+PERTURB_TOP = 12
+# Rounds without an improvement before the search gives up early.
+PATIENCE = 10
+# Budget kept back from the search for its last move and for building the plan,
+# so solves finish inside `time_budget_s`.
+FINISH_RESERVE_S = 0.01
+_EPSILON = 1e-9
+BASE_CATEGORIES = frozenset({"top", "bottom", "dress"})
+# "4-day trip", "3 nights in Lisbon": a trip length stated in free text.
+TRIP_LENGTH = re.compile(r"\b(\d{1,2})[- ]?(day|night)s?\b", re.IGNORECASE)
+MAX_TRIP_DAYS = 21
+
+Cost = tuple[int, int, float]
+
+
+class CapsuleDay(BaseModel):
+    """One trip day of the plan."""
+
+    day: int
+    date: Optional[str] = None
+    occasion: str
+    outfit: OutfitCandidate
+
+
+class PackingItem(BaseModel):
+    """One piece to pack and the trip days it is worn."""
+
+    item_id: str
+    short_name: str
+    category: Optional[str] = None
+    days: list[int] = Field(default_factory=list)
+
+
+class CapsulePlan(BaseModel):
+    """Day-by-day outfits plus the packing list that covers them."""
+
+    days: list[CapsuleDay]
+    packing_list: list[PackingItem]
+    unique_items: int
+    lower_bound: int = Field(
+        ..., description="No plan packs fewer items (largest per-day minimum outfit)."
+    )
+    repeated_bases: int
+    total_score: float
+    rounds: int
+    solve_ms: float
+
+    def designer_output(self) -> OutfitDesignerOutput:
+        """The plan's outfits as a travel slate, one outfit per day."""
+
+        return TravelDesignerOutput(outfits=[day.outfit for day in self.days])
+
+
+@dataclass(frozen=True)
+class _Option:
+    score: float
+    pieces: tuple[_Scored, ...]
+    # One bit per distinct item on the trip, so set arithmetic is integer arithmetic.
+    mask: int
+    base: int  # bits of the top + bottom (or dress)
+
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        bit = mask & -mask
+        yield bit
+        mask ^= bit
+
+
+class _Plan:
+    """Current assignment of one option per day, with incremental cost counters."""
+
+    def __init__(self, options: Sequence[Sequence[_Option]]) -> None:
+        self.options = options
+        self.choice: list[Optional[int]] = [None] * len(options)
+        # Days wearing each packed item bit / base; entries are dropped at zero.
+        self.items: dict[int, int] = {}
+        self.packed = 0
+        self.single = 0  # items worn on exactly one day
+        self.bases: dict[int, int] = {}
+        self.repeats = 0
+        self.score = 0.0
+
+    def current(self, day: int) -> Optional[_Option]:
+        index = self.choice[day]
+        return None if index is None else self.options[day][index]
+
+    def cost(self) -> Cost:
+        return self.repeats, self.packed.bit_count(), -self.score
+
+    def delta(self, day: int, new: _Option) -> Cost:
+        """Change in `cost` if ``day`` switched to ``new``."""
+
+        old = self.current(day)
+        added = (new.mask & ~self.packed).bit_count()
+        if old is None:
+            return int(new.base in self.bases), added, -new.score
+        repeats = 0
+        if old.base != new.base:
+            repeats = (new.base in self.bases) - (self.bases[old.base] > 1)
+        dropped = (old.mask & self.single & ~new.mask).bit_count()
+        return repeats, added - dropped, old.score - new.score
+
+    def assign(self, day: int, index: Optional[int]) -> None:
+        old = self.current(day)
+        if old is not None:
+            for bit in _bits(old.mask):
+                count = self.items[bit] - 1
+                if count:
+                    self.items[bit] = count
+                    if count == 1:
+                        self.single |= bit
+                else:
+                    del self.items[bit]
+                    self.packed &= ~bit
+                    self.single &= ~bit
+            self.bases[old.base] -= 1
+            if self.bases[old.base]:
+                self.repeats -= 1
+            else:
+                del self.bases[old.base]
+            self.score -= old.score
+        self.choice[day] = index
+        new = self.current(day)
+        if new is not None:
+            for bit in _bits(new.mask):
+                count = self.items.get(bit, 0) + 1
+                self.items[bit] = count
+                if count == 1:
+                    self.packed |= bit
+                    self.single |= bit
+                elif count == 2:
+                    self.single &= ~bit
+            if new.base in self.bases:
+                self.repeats += 1
+            self.bases[new.base] = self.bases.get(new.base, 0) + 1
+            self.score += new.score
+
+    def best(self, day: int, *, without: int = 0) -> Optional[tuple[Cost, int]]:
+        """Cheapest switch for ``day`` (skipping options that wear ``without``).
+
+        Inlines `delta`: this loop is where the search spends its time.
+        """
+
+        old = self.current(day)
+        if old is None:
+            # Only the greedy construction fills empty days.
+            return min(
+                (
+                    (self.delta(day, option), index)
+                    for index, option in enumerate(self.options[day])
+                    if not option.mask & without
+                ),
+                default=None,
+            )
+        packed, single, bases = self.packed, self.single, self.bases
+        old_shared = int(bases[old.base] > 1)
+        best: Optional[tuple[Cost, int]] = None
+        for index, option in enumerate(self.options[day]):
+            mask = option.mask
+            if mask & without:
+                continue
+            repeats = 0 if option.base == old.base else (option.base in bases) - old_shared
+            delta = (
+                repeats,
+                (mask & ~packed).bit_count() - (old.mask & single & ~mask).bit_count(),
+                old.score - option.score,
+            )
+            if best is None or delta < best[0]:
+                best = (delta, index)
+        return best
+
+    def restore(self, choice: Sequence[Optional[int]]) -> None:
+        for day, index in enumerate(choice):
+            if self.choice[day] != index:
+                self.assign(day, index)
+
+
+def _improves(delta: Cost) -> bool:
+    return delta < (0, 0, -_EPSILON)
+
+
+def _better(cost: Cost, than: Cost) -> bool:
+    return _improves((cost[0] - than[0], cost[1] - than[1], cost[2] - than[2]))
+
+
+def _trip_beams(
+    index: WardrobeIndex, days: Sequence[DesignContext]
+) -> dict[str, list[WardrobeItem]]:
+    """Per slot, the items with the best mean score over the whole trip.
+
+    Each day's own beam favours pieces that suit that day; these versatile pieces
+    are added to every day so outfits can share them.
+    """
+
+    beams = {}
+    for slot, width in SLOT_BEAM.items():
+        candidates = index.slot(slot)
+        totals = {
+            item.item_id: sum(_score_item(item, slot, context).score for context in days)
+            for item in candidates
+        }
+        candidates.sort(key=lambda item: (-totals[item.item_id], item.name, item.item_id))
+        beams[slot] = candidates[:width]
+    return beams
+
+
+def _item_bits(index: WardrobeIndex) -> dict[str, tuple[int, int]]:
+    """Map each item to ``(bit, bit if it is a base piece else 0)``."""
+
+    bits = {}
+    for category, items in sorted(index.by_category.items()):
+        for item in items:
+            bit = 1 << len(bits)
+            bits[item.item_id] = (bit, bit if category in BASE_CATEGORIES else 0)
+    return bits
+
+
+def _day_options(
+    index: WardrobeIndex,
+    context: DesignContext,
+    trip_beams: Mapping[str, Sequence[WardrobeItem]],
+    bits: Mapping[str, tuple[int, int]],
+    limit: int,
+    slack: float,
+) -> list[_Option]:
+    def ranked(combos: Iterable[tuple[float, tuple[_Scored, ...]]]) -> list[_Option]:
+        options = []
+        for score, pieces in combos:
+            mask = base = 0
+            for piece in pieces:
+                bit, base_bit = bits[piece.item.item_id]
+                mask |= bit
+                base |= base_bit
+            options.append(_Option(score=score, pieces=pieces, mask=mask, base=base))
+        return sorted(options, key=lambda option: -option.score)
+
+    # Combos of the trip-wide pieces scored for this day, then the day's own best.
+    trip_limit = round(limit * TRIP_SHARE)
+    trip_options = ranked(
+        _combine(
+            {
+                slot: [_score_item(item, slot, context) for item in items]
+                for slot, items in trip_beams.items()
+            },
+            context,
+        )
+    )[:trip_limit]
+    day_options = ranked(_enumerate(index, context))[: limit - len(trip_options)]
+    options: dict[int, _Option] = {}
+    for option in [*trip_options, *day_options]:
+        options.setdefault(option.mask, option)
+    if not options:
+        return []
+    floor = max(option.score for option in options.values()) - slack
+    return sorted(
+        (option for option in options.values() if option.score >= floor),
+        key=lambda option: -option.score,
+    )
+
+
+def _greedy(plan: _Plan) -> None:
+    # Most constrained day first, so flexible days adapt to what is already packed.
+    for day in sorted(range(len(plan.options)), key=lambda d: (len(plan.options[d]), d)):
+        best = plan.best(day)
+        if best is not None:
+            plan.assign(day, best[1])
+
+
+def _drop_item(plan: _Plan, bit: int) -> bool:
+    """Re-dress every day that wears item ``bit`` without it; keep only if cheaper."""
+
+    before, choice = plan.cost(), list(plan.choice)
+    for day in range(len(plan.options)):
+        current = plan.current(day)
+        if current is None or not current.mask & bit:
+            continue
+        best = plan.best(day, without=bit)
+        if best is None:
+            plan.restore(choice)
+            return False
+        plan.assign(day, best[1])
+    if _better(plan.cost(), before):
+        return True
+    plan.restore(choice)
+    return False
+
+
+def _descend(plan: _Plan, deadline: float) -> None:
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for day in range(len(plan.options)):
+            if time.perf_counter() >= deadline:
+                return
+            best = plan.best(day)
+            if best is not None and _improves(best[0]):
+                plan.assign(day, best[1])
+                improved = True
+        # Rarely worn items are the cheapest to drop.
+        for bit in sorted(plan.items, key=lambda bit: (plan.items[bit], bit)):
+            if time.perf_counter() >= deadline:
+                return
+            if bit in plan.items and _drop_item(plan, bit):
+                improved = True
+
+
+def _reuse_note(pieces: Sequence[_Scored], worn_on: Mapping[str, list[int]], day: int) -> str:
+    """Name the pieces already worn earlier in the trip, grouped by their last wear."""
+
+    by_day: dict[int, list[str]] = {}
+    for piece in pieces:
+        earlier = [worn for worn in worn_on[piece.item.item_id] if worn < day]
+        if earlier:
+            by_day.setdefault(earlier[-1], []).append(piece.item.name)
+    if not by_day:
+        return " All pieces are new to the trip."
+    clauses = []
+    for worn, names in sorted(by_day.items()):
+        listed = names[0] if len(names) == 1 else f"{', '.join(names[:-1])} and {names[-1]}"
+        clauses.append(f"the {listed} from day {worn}")
+    return f" Rewear {'; '.join(clauses)}."
+
+
+def plan_capsule(
+    items: Iterable[Any],
+    days: Sequence[DesignContext],
+    *,
+    dates: Optional[Sequence[Optional[str]]] = None,
+    time_budget_s: float = DEFAULT_TIME_BUDGET_S,
+    max_rounds: int = DEFAULT_MAX_ROUNDS,
+    seed: int = 0,
+    candidate_limit: int = CANDIDATE_LIMIT,
+    score_slack: float = SCORE_SLACK,
+) -> CapsulePlan:
+    """Choose one outfit per trip day that packs the fewest unique items.
+
+    Args:
+        items: Wardrobe entries available for the trip (cataloger output).
+        days: One DesignContext per trip day (that day's weather and occasion).
+        dates: Optional ISO date per day, echoed in the plan.
+        time_budget_s: Wall-clock cap for the whole solve, candidate scoring
+            included; the best plan so far is returned. Scoring the days and the
+            greedy plan always complete, even past the budget.
+        max_rounds: Perturbation rounds after the first local-search descent; the
+            search also stops after `PATIENCE` rounds without an improvement.
+        seed: Seed for the perturbations; the plan is deterministic unless the
+            time budget cuts the search short.
+        candidate_limit: Candidates kept per day, `TRIP_SHARE` of them built from
+            the trip-wide pieces.
+        score_slack: How far below a day's best outfit a candidate may score.
+
+    Returns:
+        A CapsulePlan with per-day OutfitCandidates and the packing list.
+
+    Raises:
+        ValueError: If there are no days, or a day has no valid outfit.
+    """
+
+    if not days:
+        raise ValueError("A travel plan needs at least one day.")
+    started = time.perf_counter()
+    deadline = started + max(0.0, time_budget_s - FINISH_RESERVE_S)
+    index = WardrobeIndex(items)
+    trip_beams = _trip_beams(index, days)
+    bits = _item_bits(index)
+    options = [
+        _day_options(index, context, trip_beams, bits, candidate_limit, score_slack)
+        for context in days
+    ]
+    for day, day_options in enumerate(options, start=1):
+        if not day_options:
+            raise ValueError(f"No valid outfit can be built for day {day}.")
+
+    plan = _Plan(options)
+    _greedy(plan)
+    _descend(plan, deadline)
+    best_cost, best_choice = plan.cost(), list(plan.choice)
+    rng = random.Random(seed)
+    rounds = stale = 0
+    while rounds < max_rounds and stale < PATIENCE and time.perf_counter() < deadline:
+        rounds += 1
+        for day in rng.sample(range(len(days)), max(1, round(len(days) * PERTURB_SHARE))):
+            plan.assign(day, rng.randrange(min(PERTURB_TOP, len(options[day]))))
+        _descend(plan, deadline)
+        if _better(plan.cost(), best_cost):
+            best_cost, best_choice, stale = plan.cost(), list(plan.choice), 0
+        else:
+            plan.restore(best_choice)
+            stale += 1
+    plan.restore(best_choice)
+
+    return _build_plan(
+        plan,
+        days,
+        dates=dates,
+        lower_bound=max(min(len(option.pieces) for option in day) for day in options),
+        rounds=rounds,
+        solve_ms=(time.perf_counter() - started) * 1000,
+    )
+
+
+def _build_plan(
+    plan: _Plan,
+    days: Sequence[DesignContext],
+    *,
+    dates: Optional[Sequence[Optional[str]]],
+    lower_bound: int,
+    rounds: int,
+    solve_ms: float,
+) -> CapsulePlan:
+    chosen = [plan.current(day) for day in range(len(days))]
+    worn_on: dict[str, list[int]] = {}
+    packed: dict[str, _Scored] = {}
+    for day, option in enumerate(chosen, start=1):
+        for piece in option.pieces:  # type: ignore[union-attr]
+            worn_on.setdefault(piece.item.item_id, []).append(day)
+            packed.setdefault(piece.item.item_id, piece)
+
+    plan_days = []
+    for day, (context, option) in enumerate(zip(days, chosen, strict=True), start=1):
+        pieces = option.pieces  # type: ignore[union-attr]
+        owner = context.user_id or "anon"
+        plan_days.append(
+            CapsuleDay(
+                day=day,
+                date=dates[day - 1] if dates else None,
+                occasion=context.occasion,
+                outfit=OutfitCandidate(
+                    user_id=context.user_id,
+                    outfit_id=f"{owner}-{day:02d}",
+                    rank=day,
+                    outfit_name=f"Day {day}: {_outfit_name(pieces, context)}",
+                    outfit_description=_outfit_description(pieces, context)
+                    + _reuse_note(pieces, worn_on, day),
+                    outfit_items=[piece.item.item_id for piece in pieces],
+                    outfit_item_details=[
+                        OutfitItemDetail(
+                            item_id=piece.item.item_id, short_name=short_name(piece.item.name)
+                        )
+                        for piece in pieces
+                    ],
+                ),
+            )
+        )
+
+    repeats, unique, negative_score = plan.cost()
+    return CapsulePlan(
+        days=plan_days,
+        packing_list=[
+            PackingItem(
+                item_id=item_id,
+                short_name=short_name(piece.item.name),
+                category=piece.item.category,
+                days=worn_on[item_id],
+            )
+            for item_id, piece in sorted(
+                packed.items(), key=lambda entry: ((entry[1].item.category or ""), entry[0])
+            )
+        ],
+        unique_items=unique,
+        lower_bound=lower_bound,
+        repeated_bases=repeats,
+        total_score=round(-negative_score, 4),
+        rounds=rounds,
+        solve_ms=round(solve_ms, 3),
+    )
+
+
+def trip_contexts(
+    trip_days: Sequence[TripDay],
+    *,
+    occasion: str = "",
+    user_id: Optional[str] = None,
+    temperature_c: Optional[float] = None,
+    precipitation_chance: Optional[float] = None,
+    today: Optional[date] = None,
+) -> list[DesignContext]:
+    """One DesignContext per trip day; unset fields fall back to the request's values."""
+
+    return [
+        DesignContext(
+            occasion=day.occasion or occasion,
+            user_id=user_id,
+            temperature_c=day.temperature_c if day.temperature_c is not None else temperature_c,
+            precipitation_chance=(
+                day.precipitation_chance
+                if day.precipitation_chance is not None
+                else precipitation_chance
+            ),
+            today=today or date.today(),
+        )
+        for day in trip_days
+    ]
+
+
+def trip_length(text: str) -> Optional[int]:
+    """Trip days named in free text; ``N`` nights span ``N + 1`` days."""
+
+    match = TRIP_LENGTH.search(text)
+    if match is None:
+        return None
+    days = int(match.group(1)) + (match.group(2).lower() == "night")
+    return days if 1 <= days <= MAX_TRIP_DAYS else None
+
+
+def _free_text_trip(
+    state: Mapping[str, Any], *, user_id: Optional[str], user_content: Any
+) -> Optional[CapsulePlan]:
+    """Plan a trip whose length is stated in free text, e.g. "packing for a 4-day trip".
+
+    The weather agent resolves a single day, so every trip day reuses that
+    forecast and the request's occasion; dates run on from the forecast date.
+    """
+
+    text = content_text(user_content) or ""
+    days = trip_length(text) if is_travel_request(user_content) else None
+    if days is None:
+        return None
+    context = design_context_from_state(state, user_id=user_id, user_content=user_content)
+    try:
+        start = date.fromisoformat(str(weather_from_state(state).get("date")))
+    except ValueError:
+        start = context.today
+    return plan_capsule(
+        wardrobe_items_from_state(state),
+        [context] * days,
+        dates=[(start + timedelta(days=offset)).isoformat() for offset in range(days)],
+    )
+
+
+def capsule_plan_from_state(
+    state: Mapping[str, Any],
+    *,
+    user_id: Optional[str] = None,
+    user_content: Any = None,
+) -> Optional[CapsulePlan]:
+    """Plan a capsule for a travel request with an itinerary.
+
+    The itinerary is ``trip_days`` in a JSON travel payload, or a trip length in
+    a free-text request (see `_free_text_trip`). Returns ``None`` for daily
+    requests and travel requests without an itinerary.
+
+    Raises:
+        ValueError: If the payload is malformed or a day has no valid outfit.
+    """
+
+    payload = load_payload(content_text(user_content))
+    if not isinstance(payload, dict):
+        return _free_text_trip(state, user_id=user_id, user_content=user_content)
+    if payload.get("daily_or_travel") != "travel":
+        return None
+    if not payload.get("wardrobe_items"):
+        payload = {**payload, "wardrobe_items": wardrobe_items_from_state(state)}
+    request = OutfitDesignerInput.model_validate(payload)
+    if not request.trip_days:
+        return None
+    contexts = trip_contexts(
+        request.trip_days,
+        occasion=request.occasion,
+        user_id=request.user_id or user_id,
+        temperature_c=request.temperature_c,
+        precipitation_chance=request.precipitation_chance,
+    )
+    return plan_capsule(
+        request.wardrobe_items,
+        contexts,
+        dates=[day.date for day in request.trip_days],
+    )
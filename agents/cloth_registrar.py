@@ -1,23 +1,15 @@
 from typing import Literal, Optional
 
 from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
-from google.genai import types
 from pydantic import BaseModel, Field
 
+from agents.models import get_model
 from tools.demo_wardrobe_tool import (
     add_wardrobe_tool,
     delete_wardrobe_tool,
     demo_wardrobe_tool,
 )
-
-retry_config = types.HttpRetryOptions(
-    attempts=5,
-    exp_base=7,
-    initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],
-)
-
+from tools.write_behind import log_worn_items_tool
 
 # --- Cloth Adder Agent ---
 
@@ -70,7 +62,7 @@ def cloth_adder_agent() -> Agent:
         name="cloth_adder",
         description="Adds a new cloth item to the wardrobe from text or image.",
         instruction=ADDER_INSTRUCTION,
-        model=Gemini(model="gemini-2.5-flash", retry_options=retry_config),
+        model=get_model("cloth_adder"),
         tools=[add_wardrobe_tool],
         input_schema=WardrobeItemInput,
     )
@@ -99,13 +91,16 @@ def cloth_deleter_agent() -> Agent:
         name="cloth_deleter",
         description="Deletes a cloth item from the wardrobe by ID or description.",
         instruction=DELETER_INSTRUCTION,
-        model=Gemini(model="gemini-2.5-flash", retry_options=retry_config),
+        model=get_model("cloth_deleter"),
         tools=[demo_wardrobe_tool, delete_wardrobe_tool],
     )
 
 
 # --- Cloth Registrar (Router) Agent ---
 
+REGISTRAR_NAME = "cloth_registrar"
+REGISTRAR_DESCRIPTION = "Manages wardrobe additions, deletions, and wear logs."
+
 REGISTRAR_INSTRUCTION = """You are the FreshFit Cloth Registrar agent.
 
 Task:
@@ -115,6 +110,9 @@ Task:
 2. Route the request to the appropriate sub-agent:
    - If adding: Delegate to `cloth_adder`.
    - If deleting: Delegate to `cloth_deleter`.
+   - If the user reports wearing items ("I wore my navy blazer today"): handle it yourself.
+     Call `demo_wardrobe_tool` to resolve item_ids when needed, then `log_worn_items_tool`
+     so wardrobe rotation stays current.
 3. If the request is unclear, ask for clarification.
 
 """
@@ -125,9 +123,10 @@ def cloth_registrar_agent() -> Agent:
     deleter = cloth_deleter_agent()
 
     return Agent(
-        name="cloth_registrar",
-        description="Manages wardrobe additions and deletions.",
+        name=REGISTRAR_NAME,
+        description=REGISTRAR_DESCRIPTION,
         instruction=REGISTRAR_INSTRUCTION,
-        model=Gemini(model="gemini-2.5-flash", retry_options=retry_config),
+        model=get_model("cloth_registrar"),
+        tools=[demo_wardrobe_tool, log_worn_items_tool],
         sub_agents=[adder, deleter],
     )
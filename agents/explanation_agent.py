@@ -3,16 +3,10 @@
 from typing import Optional
 
 from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
-from google.genai import types
 from pydantic import BaseModel, Field
 
-retry_config = types.HttpRetryOptions(
-    attempts=5,
-    exp_base=7,
-    initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],
-)
+from agents.models import get_model
+from agents.prompt_tables import store_outfit_table
 
 
 class ExplanationItem(BaseModel):
@@ -53,9 +47,11 @@ class ExplanationAgentOutput(BaseModel):
 INSTRUCTION = """You are the FreshFit Explanation agent.
 
 Input:
-- list of outfits: {outfits} (structured list of outfits sourced from OutfitDesigner. Each outfit mirrors the SQLite schema (outfit_id, outfit_name, outfit_description, outfit_items)).
+- list of outfits sourced from OutfitDesigner (outfit_id, rank, outfit_name, outfit_items as item_id:short_name pairs, outfit_description):
+{outfit_table}
 
 - For each outfit, which contains top, bottom, outerwear, shoes, and accessory items etcs., craft a 1-2 sentence rationale referencing weather, occasion, color/fabric mix, and scoring highlights.
+- Write exactly one `explanations` entry per outfit, in the table's order, and mention its `outfit_id`.
 - Keep tone encouraging, note any fallback assumptions, and avoid revealing raw model/tool traces.
 - Close with a concise `selection_prompt` that tells the user exactly how to choose an outfit (use `outfit_id`) and that they will rate every look afterward so Feedback & Learning can log preferences.
 Return JSON strictly matching ExplanationAgentOutput."""
@@ -68,8 +64,9 @@ def explanation_agent() -> Agent:
         name="explanation_agent",
         description="Generates concise rationales for each outfit option.",
         instruction=INSTRUCTION,
-        model=Gemini(model="gemini-2.5-flash", retry_options=retry_config),
+        model=get_model("explanation_agent"),
         input_schema=ExplanationAgentInput,
         output_schema=ExplanationAgentOutput,
         output_key="explanations",
+        before_agent_callback=store_outfit_table,
     )
@@ -0,0 +1,400 @@
+"""Offline stand-in for Gemini, for deterministic load and latency benchmarks.
+
+`FakeLlm` is a ``BaseLlm``, so it plugs in wherever a real model does: pass it to
+a factory's ``model=`` parameter (``outfit_designer_agent(model=...)``) or install
+it on the model registry with `install_fake_llm` before the graph is built. Each
+call sleeps for the configured latency and then answers with, in order of
+preference:
+
+1. a recorded response for the calling agent (``recordings``; see
+   `recordings_from_cache` to replay real Gemini responses saved by the
+   model-call cache), cycled per agent;
+2. the agent's responder (``responders``; `DEFAULT_RESPONDERS` echo the
+   designer's engine drafts, rank and explain the slate by its real outfit_ids,
+   and drive the weather agent through ``lookup_weather``);
+3. a schema-valid synthetic instance of the request's ``response_schema`` (the
+   agent's ``output_schema``), or of ``schemas[agent_name]``;
+4. a short plain-text reply.
+
+With ``stream=True`` (``StreamingMode.SSE``) text answers arrive as partial
+chunks followed by the aggregated response, like Gemini streaming does.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import enum
+import inspect
+import json
+import random
+import re
+import types as pytypes
+from collections import defaultdict
+from collections.abc import AsyncGenerator, Callable, Iterable, Mapping, Sequence
+from typing import Any, Literal, Optional, Union, get_args, get_origin
+
+from google.adk.models import LlmCapabilities
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import BaseModel, Field, PrivateAttr, ValidationError
+from pydantic_core import PydanticUndefined
+
+from agents.models import override_model
+from agents.prompt_tables import decode_outfit_table
+
+# Agent names the graph passes to `get_model`; each gets its own FakeLlm so
+# responders, recordings and latencies can be chosen per agent.
+AGENT_NAMES = (
+    "FreshFit",
+    "weather_agent",
+    "weather_search",
+    "wardrobe_cataloger",
+    "outfit_designer",
+    "preference_ranking",
+    "explanation_agent",
+    "feedback_learning",
+    "metrics_agent",
+    "cloth_registrar",
+    "cloth_adder",
+    "cloth_deleter",
+)
+
+Reply = Union[str, Mapping[str, Any], BaseModel, types.FunctionCall]
+Responder = Callable[[LlmRequest], Optional[Reply]]
+
+
+def _sample(annotation: Any, name: str, index: int, list_size: int) -> Any:
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if origin in (Union, pytypes.UnionType):
+        return _sample(next(a for a in args if a is not type(None)), name, index, list_size)
+    if origin is Literal:
+        return args[0]
+    if origin in (list, tuple, set, frozenset, Sequence):
+        item = args[0] if args else str
+        return [_sample(item, name, i, list_size) for i in range(1, list_size + 1)]
+    if origin is dict or annotation is dict:
+        return {}
+    if inspect.isclass(annotation):
+        if issubclass(annotation, BaseModel):
+            return _sample_fields(annotation, index, list_size)
+        if issubclass(annotation, enum.Enum):
+            return next(iter(annotation)).value
+        if issubclass(annotation, bool):
+            return False
+        if issubclass(annotation, int):
+            return index
+        if issubclass(annotation, float):
+            return 0.5
+    return f"{name}-{index}"
+
+
+def _sample_fields(schema: type[BaseModel], index: int, list_size: int) -> dict[str, Any]:
+    values = {}
+    for name, field in schema.model_fields.items():
+        if field.default not in (None, PydanticUndefined):
+            values[name] = field.default
+        else:
+            values[name] = _sample(field.annotation, name, index, list_size)
+    return values
+
+
+def synthesize(schema: type[BaseModel], *, list_size: int = 5) -> BaseModel:
+    """Build a valid ``schema`` instance with placeholder values.
+
+    Strings become ``"<field>-<n>"``, numbers ``n`` or ``0.5``, lists hold
+    ``list_size`` entries, and fields with a non-null default keep it.
+    """
+
+    data = _sample_fields(schema, 1, list_size)
+    try:
+        return schema.model_validate(data)
+    except ValidationError as exc:
+        raise ValueError(f"Cannot synthesize a valid {schema.__name__}: {exc}") from exc
+
+
+def request_text(llm_request: LlmRequest) -> str:
+    """System instruction plus the text of every content part in the request."""
+
+    config = llm_request.config
+    texts = [str(config.system_instruction)] if config and config.system_instruction else []
+    for content in llm_request.contents or []:
+        texts.extend(part.text for part in content.parts or [] if part.text)
+    return "\n".join(texts)
+
+
+def _function_response(llm_request: LlmRequest, name: str) -> Optional[dict[str, Any]]:
+    for content in reversed(llm_request.contents or []):
+        for part in content.parts or []:
+            if part.function_response and part.function_response.name == name:
+                return part.function_response.response or {}
+    return None
+
+
+def _user_text(llm_request: LlmRequest) -> str:
+    for content in reversed(llm_request.contents or []):
+        if content.role == "user":
+            text = " ".join(part.text for part in content.parts or [] if part.text)
+            if text:
+                return text
+    return ""
+
+
+_LOCATION = re.compile(
+    r"\b(?:in|at|near)\s+([A-Z][\w .'-]*?)(?:\s+(?:today|tomorrow|on|for)\b|[.,?!]|$)"
+)
+
+
+def weather_responder(llm_request: LlmRequest) -> Optional[Reply]:
+    """Call ``lookup_weather`` for the user's city, then return its weather unchanged."""
+
+    result = _function_response(llm_request, "lookup_weather")
+    if result is None:
+        match = _LOCATION.search(_user_text(llm_request))
+        return types.FunctionCall(
+            name="lookup_weather",
+            args={"location": match.group(1) if match else "Seattle, WA", "date": "tomorrow"},
+        )
+    weather = result.get("weather")
+    if result.get("status") != "success" or not isinstance(weather, dict):
+        return None
+    return weather
+
+
+def designer_responder(llm_request: LlmRequest) -> Optional[Reply]:
+    """Return the engine's drafts (``outfit_candidates``) as the polished slate."""
+
+    outfits = decode_outfit_table(str(llm_request.config.system_instruction or ""))
+    if not outfits:
+        return None
+    return {"outfits": outfits}
+
+
+def ranking_responder(llm_request: LlmRequest) -> Optional[Reply]:
+    """Rank the slate in the designer's order."""
+
+    outfits = decode_outfit_table(str(llm_request.config.system_instruction or ""))
+    if not outfits:
+        return None
+    return {
+        "ranked_outfits": [outfit["outfit_id"] for outfit in outfits],
+        "decision_trace": "Synthetic ranking: designer order.",
+    }
+
+
+def explanation_responder(llm_request: LlmRequest) -> Optional[Reply]:
+    """One rationale per outfit, naming its outfit_id."""
+
+    outfits = decode_outfit_table(str(llm_request.config.system_instruction or ""))
+    if not outfits:
+        return None
+    return {
+        "explanations": [
+            f"{outfit['outfit_id']}: {outfit['outfit_name'] or 'This look'} suits the day."
+            for outfit in outfits
+        ],
+    }
+
+
+DEFAULT_RESPONDERS: dict[str, Responder] = {
+    "weather_agent": weather_responder,
+    "outfit_designer": designer_responder,
+    "preference_ranking": ranking_responder,
+    "explanation_agent": explanation_responder,
+}
+
+
+def _weather_schema() -> type[BaseModel]:
+    # Imported lazily: the weather agent module pulls in its provider and tools.
+    from agents.weather_agent import WeatherAgentOutput
+
+    return WeatherAgentOutput
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeLlm(BaseLlm):
+    """Replays recorded or synthetic responses with injected latency.
+
+    Args:
+        agent_name: Agent this instance answers for (see `for_agent`).
+        latency_s: Seconds each call takes; ``agent_latency_s`` overrides it per
+            agent. ``jitter`` spreads it uniformly by that fraction (seeded).
+        recordings: Per-agent responses (``LlmResponse`` or text) replayed in order.
+        responders: Per-agent callables that build a reply from the request.
+        schemas: Per-agent schemas to synthesize when the request has none
+            (agents without ``output_schema`` that still answer in JSON).
+    """
+
+    # Gemini-only tools (e.g. google_search) check the model name.
+    model: str = "gemini-2.5-flash"
+    agent_name: Optional[str] = None
+    latency_s: float = 0.0
+    agent_latency_s: dict[str, float] = Field(default_factory=dict)
+    jitter: float = 0.0
+    seed: int = 0
+    chunk_chars: int = 48
+    list_size: int = 5
+    recordings: dict[str, list[Any]] = Field(default_factory=dict)
+    responders: dict[str, Responder] = Field(default_factory=lambda: dict(DEFAULT_RESPONDERS))
+    schemas: dict[str, Any] = Field(default_factory=dict)
+
+    _rng: random.Random = PrivateAttr()
+    _cursors: dict[str, int] = PrivateAttr(default_factory=lambda: defaultdict(int))
+    _calls: dict[str, int] = PrivateAttr(default_factory=lambda: defaultdict(int))
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._rng = random.Random(self.seed)
+
+    @property
+    def capabilities(self) -> LlmCapabilities:
+        return LlmCapabilities(output_schema_and_tools=True)
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return []
+
+    def for_agent(self, agent_name: str) -> FakeLlm:
+        """A copy answering for ``agent_name`` (copies share counters and the RNG)."""
+
+        return self.model_copy(update={"agent_name": agent_name})
+
+    @property
+    def calls(self) -> dict[str, int]:
+        """Model calls served so far, per agent."""
+
+        return dict(self._calls)
+
+    def _latency(self) -> float:
+        base = self.agent_latency_s.get(self.agent_name or "", self.latency_s)
+        if base <= 0:
+            return 0.0
+        return max(0.0, base * (1 + self._rng.uniform(-self.jitter, self.jitter)))
+
+    def _recorded(self) -> Optional[LlmResponse]:
+        entries = self.recordings.get(self.agent_name or "")
+        if not entries:
+            return None
+        cursor = self._cursors[self.agent_name or ""]
+        self._cursors[self.agent_name or ""] = cursor + 1
+        entry = entries[cursor % len(entries)]
+        if isinstance(entry, LlmResponse):
+            return entry.model_copy(deep=True)
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=entry)]))
+
+    def _reply(self, llm_request: LlmRequest) -> Union[str, types.FunctionCall]:
+        config = llm_request.config
+        schema = config.response_schema if config else None
+        if not (inspect.isclass(schema) and issubclass(schema, BaseModel)):
+            schema = self.schemas.get(self.agent_name or "")
+
+        responder = self.responders.get(self.agent_name or "")
+        reply = responder(llm_request) if responder else None
+        if isinstance(reply, types.FunctionCall):
+            return reply
+        if reply is None:
+            if schema is None:
+                return f"Synthetic response from {self.agent_name or self.model}."
+            reply = synthesize(schema, list_size=self.list_size)
+        if isinstance(reply, BaseModel):
+            return reply.model_dump_json()
+        if isinstance(reply, Mapping):
+            if schema is not None:
+                return schema.model_validate(dict(reply)).model_dump_json()
+            return json.dumps(reply)
+        return str(reply)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self._calls[self.agent_name or ""] += 1
+        latency = self._latency()
+        prompt_tokens = _estimate_tokens(request_text(llm_request))
+
+        recorded = self._recorded()
+        if recorded is not None:
+            await asyncio.sleep(latency)
+            yield recorded
+            return
+
+        reply = self._reply(llm_request)
+        if isinstance(reply, types.FunctionCall):
+            await asyncio.sleep(latency)
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(function_call=reply)]),
+                usage_metadata=types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=prompt_tokens,
+                    candidates_token_count=1,
+                    total_token_count=prompt_tokens + 1,
+                ),
+            )
+            return
+
+        chunks = (
+            [reply[i : i + self.chunk_chars] for i in range(0, len(reply), self.chunk_chars)]
+            if stream and self.chunk_chars > 0
+            else []
+        )
+        for chunk in chunks:
+            await asyncio.sleep(latency / len(chunks))
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(text=chunk)]),
+                partial=True,
+            )
+        if not chunks:
+            await asyncio.sleep(latency)
+        output_tokens = _estimate_tokens(reply)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=reply)]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+            turn_complete=True,
+        )
+
+
+def recordings_from_cache(cache: Any = None) -> dict[str, list[LlmResponse]]:
+    """Real responses saved by the model-call cache, grouped by agent in stored order."""
+
+    if cache is None:
+        from tools.llm_cache import llm_response_cache as cache
+
+    recordings: dict[str, list[LlmResponse]] = defaultdict(list)
+    for agent_name, payload in cache.recorded():
+        try:
+            recordings[agent_name].append(LlmResponse.model_validate_json(payload))
+        except ValidationError:
+            continue
+    return dict(recordings)
+
+
+def install_fake_llm(
+    fake: Optional[FakeLlm] = None, *, agent_names: Iterable[str] = AGENT_NAMES
+) -> FakeLlm:
+    """Install ``fake`` (default: a zero-latency FakeLlm) for every agent.
+
+    Each named agent gets its own `FakeLlm.for_agent` copy; any other agent gets
+    ``fake`` itself. Only agents constructed afterwards pick it up.
+    """
+
+    fake = fake or FakeLlm()
+    fake.schemas.setdefault("weather_agent", _weather_schema())
+    override_model(fake)
+    for agent_name in agent_names:
+        override_model(fake.for_agent(agent_name), agent_name)
+    return fake
+
+
+def remove_fake_llm(agent_names: Iterable[str] = AGENT_NAMES) -> None:
+    """Undo `install_fake_llm`."""
+
+    override_model(None)
+    for agent_name in agent_names:
+        override_model(None, agent_name)
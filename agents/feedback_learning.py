@@ -1,18 +1,15 @@
 """Feedback & Learning agent."""
 
-from typing import Literal, Optional
+from collections.abc import Iterable, Mapping
+from typing import Any, Literal, Optional
 
 from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
+from google.adk.agents.callback_context import CallbackContext
 from google.genai import types
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
-retry_config = types.HttpRetryOptions(
-    attempts=5,
-    exp_base=7,
-    initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],
-)
+from agents.models import get_model
+from agents.state_payloads import content_text, load_payload
 
 
 class FeedbackEvent(BaseModel):
@@ -117,9 +114,132 @@ INSTRUCTION = """You are the FreshFit Feedback & Learning agent.
 - Populate `outfit_feedback` with one entry per outfit, echoing the decision, rating, tags, notes, and whether it was selected.
 - For each selection or rating captured, emit a corresponding `metrics_events` entry so the Metrics agent can record acceptance rate and preference deltas.
 - Highlight if downstream agents need to refresh cached preference features or banned combos based on the new intel.
+Deterministic draft of this output: {feedback_draft?}
+- When a draft is present, keep its `selected_outfit_id`, decisions, ratings, intents, and `metrics_events` unchanged. Your job is only to interpret free-text notes and tags: normalize tags, refine acknowledgements, and set `next_actions`.
 Return JSON that matches FeedbackLearningOutput."""
 
 
+def needs_interpretation(events: Iterable[FeedbackEvent]) -> bool:
+    """True when any event carries free text (notes/tags) that needs the model."""
+
+    return any((event.notes and event.notes.strip()) or event.tags for event in events)
+
+
+def _acknowledgement(record: OutfitFeedbackRecord) -> str:
+    parts = [f"Logged {record.outfit_id}"]
+    if record.was_selected:
+        parts.append("as today's pick")
+    if record.rating is not None:
+        parts.append(f"at {record.rating}/5")
+    text = " ".join(parts)
+    if record.future_intent == "do_not_recommend":
+        return f"{text}; it won't be suggested again."
+    if record.future_intent == "try_again":
+        return f"{text}; we'll bring it back."
+    return f"{text}."
+
+
+def normalize_feedback(
+    events: Iterable[FeedbackEvent | Mapping[str, Any]],
+    *,
+    selected_outfit_id: Optional[str] = None,
+) -> FeedbackLearningOutput:
+    """Build FeedbackLearningOutput from structured events without calling the model.
+
+    Args:
+        events: Feedback events (models or dicts in the FeedbackEvent shape).
+        selected_outfit_id: The outfit the user chose; defaults to the first
+            ``accepted`` event.
+
+    Returns:
+        Output with per-outfit records, acknowledgements, and metrics events. Free-text
+        notes/tags are passed through verbatim (see ``needs_interpretation``).
+    """
+
+    parsed = [
+        event
+        if isinstance(event, FeedbackEvent)
+        else FeedbackEvent.model_validate(event)
+        for event in events
+    ]
+    if selected_outfit_id is None:
+        selected_outfit_id = next(
+            (event.outfit_id for event in parsed if event.decision == "accepted"), None
+        )
+
+    records: list[OutfitFeedbackRecord] = []
+    metrics: list[MetricsLogEvent] = []
+    for event in parsed:
+        record = OutfitFeedbackRecord(
+            outfit_id=event.outfit_id,
+            decision=event.decision,
+            was_selected=event.outfit_id == selected_outfit_id,
+            rating=event.rating,
+            future_intent=event.future_intent,
+            tags=list(event.tags),
+            notes=event.notes,
+        )
+        records.append(record)
+        if record.was_selected:
+            metrics.append(
+                MetricsLogEvent(event_type="selection", outfit_id=event.outfit_id)
+            )
+        if event.rating is not None:
+            metrics.append(
+                MetricsLogEvent(
+                    event_type="rating",
+                    outfit_id=event.outfit_id,
+                    rating=event.rating,
+                    future_intent=event.future_intent,
+                    notes=event.notes,
+                )
+            )
+        if event.future_intent == "do_not_recommend":
+            metrics.append(
+                MetricsLogEvent(
+                    event_type="preference_update",
+                    outfit_id=event.outfit_id,
+                    future_intent=event.future_intent,
+                )
+            )
+
+    banned = [
+        record.outfit_id
+        for record in records
+        if record.future_intent == "do_not_recommend"
+    ]
+    return FeedbackLearningOutput(
+        acknowledgements=[_acknowledgement(record) for record in records],
+        next_actions=(
+            f"Refresh banned combos for: {', '.join(banned)}." if banned else None
+        ),
+        selected_outfit_id=selected_outfit_id,
+        outfit_feedback=records,
+        metrics_events=metrics,
+    )
+
+
+def _normalize_before_agent(
+    callback_context: CallbackContext,
+) -> Optional[types.Content]:
+    """Answer structured-only feedback locally; draft the rest for the model."""
+
+    payload = load_payload(content_text(callback_context.user_content))
+    try:
+        request = FeedbackLearningInput.model_validate(payload)
+    except ValidationError:
+        callback_context.state["feedback_draft"] = ""
+        return None
+
+    draft = normalize_feedback(request.events)
+    if needs_interpretation(request.events):
+        callback_context.state["feedback_draft"] = draft.model_dump_json()
+        return None
+    return types.Content(
+        role="model", parts=[types.Part(text=draft.model_dump_json())]
+    )
+
+
 def feedback_learning_agent() -> Agent:
     """Construct the Feedback & Learning agent."""
 
@@ -127,7 +247,8 @@ def feedback_learning_agent() -> Agent:
         name="feedback_learning",
         description="Processes user feedback, ratings, and 'never again' directives.",
         instruction=INSTRUCTION,
-        model=Gemini(model="gemini-2.5-flash", retry_options=retry_config),
+        model=get_model("feedback_learning"),
         input_schema=FeedbackLearningInput,
         output_schema=FeedbackLearningOutput,
+        before_agent_callback=_normalize_before_agent,
     )
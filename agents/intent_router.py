@@ -0,0 +1,380 @@
+"""Local intent classification in front of the Gemini router.
+
+Weighted keyword/regex rules (and, when one has been trained, a small TF-IDF
+nearest-centroid model) pick between the outfit flow and the cloth registrar.
+Confident decisions are dispatched by a before-model callback that answers the
+router with a ``transfer_to_agent`` call, so the router model never runs; anything
+ambiguous falls through to Gemini. Every routed turn is appended to a JSONL log
+that `scripts/train_intent_model.py` turns into the TF-IDF model.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from agents.state_payloads import content_text
+
+logger = logging.getLogger(__name__)
+
+_DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+Intent = Literal["outfit", "registrar"]
+INTENTS: tuple[Intent, ...] = ("outfit", "registrar")
+RouterMode = Literal["fast", "llm"]
+DEFAULT_MODE: RouterMode = os.getenv("FRESHFIT_ROUTER_MODE", "fast")  # type: ignore[assignment]
+MIN_CONFIDENCE = float(os.getenv("FRESHFIT_ROUTER_MIN_CONFIDENCE", "0.75"))
+TURN_LOG_PATH = os.getenv("FRESHFIT_ROUTER_LOG_PATH", str(_DATA_DIR / "router_turns.jsonl"))
+INTENT_MODEL_PATH = Path(os.getenv("FRESHFIT_INTENT_MODEL_PATH", _DATA_DIR / "intent_model.json"))
+
+TRANSFER_TOOL = "transfer_to_agent"
+
+# (intent, pattern, weight). A weight of 1.0 is enough to route on its own; weaker
+# cues need company, and matches for the other intent eat into the confidence.
+RULES: tuple[tuple[Intent, re.Pattern[str], float], ...] = tuple(
+    (intent, re.compile(pattern, re.IGNORECASE), weight)
+    for intent, pattern, weight in (
+        (
+            "registrar",
+            r"\b(add|adding|register|catalog(ue)?)\b.*\b(closet|wardrobe|inventory)\b",
+            1.0,
+        ),
+        ("registrar", r"\badd (a|an|my|this|these|the|some|two|three)\b", 0.9),
+        ("registrar", r"\b(delete|remove|get rid of|toss|donate|throw (out|away))\b", 0.9),
+        ("registrar", r"\b(i|we) (just )?(bought|purchased|ordered|got (a|an|some) new)\b", 0.8),
+        ("registrar", r"\b(i )?(wore|have worn|was wearing)\b|\blog (what|the|my)\b", 0.9),
+        (
+            "registrar",
+            r"\b(list|show( me)?|what'?s in) (my |the )?(closet|wardrobe|inventory)\b",
+            0.8,
+        ),
+        ("outfit", r"\bwhat (should|can|do|could) i wear\b", 1.0),
+        ("outfit", r"\b(dress(ed)? for|wear (to|for|today|tomorrow|tonight|on))\b", 0.9),
+        ("outfit", r"\b(outfits?|look|fit|ensemble)\b", 0.6),
+        ("outfit", r"\b(recommend|suggest|ideas?|help me (pick|choose))\b", 0.5),
+        ("outfit", r"\b(style|styling|pair with|goes with|match(es|ing)?)\b", 0.5),
+        ("outfit", r"\b(weather|rain(y|ing)?|snow(y|ing)?|cold|chilly|hot|forecast)\b", 0.4),
+        (
+            "outfit",
+            r"\b(wedding|interview|date|party|meeting|office|work|gym|brunch|dinner|trip)\b",
+            0.3,
+        ),
+    )
+)
+
+
+@dataclass(frozen=True)
+class IntentDecision:
+    """Chosen intent (None when nothing matched) and how sure the classifier is."""
+
+    intent: Optional[Intent]
+    confidence: float
+    source: str
+
+
+def classify_by_rules(text: str) -> IntentDecision:
+    """Score ``text`` against RULES.
+
+    Confidence is the winning score (capped at 1) scaled by its margin over the
+    runner-up, so mixed requests ("I wore my boots, what should I wear?") stay
+    below the dispatch threshold.
+    """
+
+    scores = dict.fromkeys(INTENTS, 0.0)
+    for intent, pattern, weight in RULES:
+        if pattern.search(text):
+            scores[intent] += weight
+    best, runner_up = sorted(INTENTS, key=scores.__getitem__, reverse=True)
+    top = scores[best]
+    if top == 0.0:
+        return IntentDecision(None, 0.0, "rules")
+    confidence = min(top, 1.0) * (top - scores[runner_up]) / top
+    return IntentDecision(best, round(confidence, 4), "rules")
+
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+def _features(text: str) -> Counter[str]:
+    tokens = _TOKEN.findall(text.lower())
+    return Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:], strict=False)])
+
+
+def _normalize(vector: Mapping[str, float]) -> dict[str, float]:
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    return {term: value / norm for term, value in vector.items()} if norm else {}
+
+
+class TfidfIntentModel:
+    """Nearest-centroid classifier over TF-IDF unigrams and bigrams."""
+
+    MIN_EXAMPLES_PER_INTENT = 5
+
+    def __init__(
+        self,
+        idf: Mapping[str, float],
+        centroids: Mapping[str, Mapping[str, float]],
+        *,
+        min_similarity: float = 0.15,
+    ) -> None:
+        self.idf = dict(idf)
+        self.centroids = {intent: dict(vector) for intent, vector in centroids.items()}
+        self.min_similarity = min_similarity
+
+    @classmethod
+    def fit(cls, texts: Sequence[str], intents: Sequence[str]) -> TfidfIntentModel:
+        """Train from parallel lists of turn texts and intent labels."""
+
+        counts = Counter(intents)
+        missing = [intent for intent in INTENTS if counts[intent] < cls.MIN_EXAMPLES_PER_INTENT]
+        if missing:
+            raise ValueError(
+                f"Need at least {cls.MIN_EXAMPLES_PER_INTENT} examples per intent; "
+                f"short on {missing}."
+            )
+        features = [_features(text) for text in texts]
+        document_frequency: Counter[str] = Counter()
+        for feature in features:
+            document_frequency.update(feature.keys())
+        total = len(features)
+        idf = {
+            term: math.log((1 + total) / (1 + frequency)) + 1.0
+            for term, frequency in document_frequency.items()
+        }
+
+        sums: dict[str, Counter[str]] = {intent: Counter() for intent in INTENTS}
+        for feature, intent in zip(features, intents, strict=True):
+            if intent in sums:
+                vector = _normalize({term: count * idf[term] for term, count in feature.items()})
+                sums[intent].update(vector)
+        return cls(idf, {intent: _normalize(vector) for intent, vector in sums.items()})
+
+    def classify(self, text: str) -> IntentDecision:
+        vector = _normalize(
+            {
+                term: count * self.idf[term]
+                for term, count in _features(text).items()
+                if term in self.idf
+            }
+        )
+        similarities = {
+            intent: sum(weight * centroid.get(term, 0.0) for term, weight in vector.items())
+            for intent, centroid in self.centroids.items()
+        }
+        best, runner_up = sorted(similarities, key=similarities.__getitem__, reverse=True)[:2]
+        top = similarities[best]
+        if top < self.min_similarity:
+            return IntentDecision(None, 0.0, "tfidf")
+        # Share of the total similarity; 0.5 means the centroids tie.
+        confidence = top / (top + max(similarities[runner_up], 0.0))
+        return IntentDecision(best, round(confidence, 4), "tfidf")  # type: ignore[arg-type]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": 1,
+            "min_similarity": self.min_similarity,
+            "idf": self.idf,
+            "centroids": self.centroids,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Mapping[str, Any]) -> TfidfIntentModel:
+        return cls(
+            payload["idf"],
+            payload["centroids"],
+            min_similarity=payload.get("min_similarity", 0.15),
+        )
+
+    def save(self, path: Path = INTENT_MODEL_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), separators=(",", ":")), encoding="utf-8")
+
+
+_model_lock = threading.Lock()
+_model_cache: dict[Path, Optional[TfidfIntentModel]] = {}
+
+
+def load_intent_model(path: Path = INTENT_MODEL_PATH) -> Optional[TfidfIntentModel]:
+    """Load (once) the trained TF-IDF model, or None when none has been trained."""
+
+    with _model_lock:
+        if path not in _model_cache:
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+                _model_cache[path] = TfidfIntentModel.from_dict(payload)
+            except FileNotFoundError:
+                _model_cache[path] = None
+            except (ValueError, KeyError):
+                logger.warning("Ignoring unreadable intent model at %s", path)
+                _model_cache[path] = None
+        return _model_cache[path]
+
+
+def classify_intent(
+    text: str,
+    *,
+    model: Optional[TfidfIntentModel] = None,
+    min_confidence: float = MIN_CONFIDENCE,
+) -> IntentDecision:
+    """Rules first, then the TF-IDF model; returns the most confident decision."""
+
+    decision = classify_by_rules(text)
+    if decision.intent is not None and decision.confidence >= min_confidence:
+        return decision
+    model = model or load_intent_model()
+    if model is not None:
+        learned = model.classify(text)
+        if learned.intent is not None and learned.confidence > decision.confidence:
+            return learned
+    return decision
+
+
+def read_turn_log(path: Optional[str] = TURN_LOG_PATH) -> list[dict[str, Any]]:
+    """Return logged router turns (oldest first); malformed lines are skipped."""
+
+    if not path or not Path(path).exists():
+        return []
+    turns = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                turn = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if turn.get("text") and turn.get("intent") in INTENTS:
+                turns.append(turn)
+    return turns
+
+
+_log_lock = threading.Lock()
+
+
+def log_turn(text: str, intent: Intent, *, source: str, confidence: Optional[float]) -> None:
+    """Append one routed turn to the JSONL log (disabled when the path is empty)."""
+
+    if not TURN_LOG_PATH:
+        return
+    record = {
+        "ts": round(time.time(), 3),
+        "text": text,
+        "intent": intent,
+        "source": source,
+        "confidence": confidence,
+    }
+    try:
+        with _log_lock:
+            Path(TURN_LOG_PATH).parent.mkdir(parents=True, exist_ok=True)
+            with open(TURN_LOG_PATH, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record) + "\n")
+    except OSError:
+        logger.warning("Could not append to router turn log %s", TURN_LOG_PATH)
+
+
+@dataclass
+class FastPathStats:
+    """How many router turns each path handled."""
+
+    rules: int = 0
+    tfidf: int = 0
+    model: int = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        total = self.rules + self.tfidf + self.model
+        return {
+            "rules": self.rules,
+            "tfidf": self.tfidf,
+            "model": self.model,
+            "fast_path_rate": round((self.rules + self.tfidf) / total, 3) if total else None,
+        }
+
+
+fast_path_stats = FastPathStats()
+
+
+def _turn_text(callback_context: CallbackContext) -> Optional[str]:
+    content = callback_context.user_content
+    # Images (e.g. a photo of a new jacket) are left to the model.
+    if content is None or any(part.inline_data for part in content.parts or []):
+        return None
+    return content_text(content)
+
+
+def fast_route_callback(
+    routes: Mapping[Intent, str],
+    *,
+    min_confidence: float = MIN_CONFIDENCE,
+):
+    """Build a before-model callback that dispatches confident turns locally.
+
+    Args:
+        routes: Sub-agent name to transfer to for each intent.
+        min_confidence: Decisions below this fall through to the router model.
+    """
+
+    def callback(
+        callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        text = _turn_text(callback_context)
+        if not text:
+            return None
+        decision = classify_intent(text, min_confidence=min_confidence)
+        if decision.intent is None or decision.confidence < min_confidence:
+            return None
+
+        setattr(fast_path_stats, decision.source, getattr(fast_path_stats, decision.source) + 1)
+        log_turn(text, decision.intent, source=decision.source, confidence=decision.confidence)
+        call = types.FunctionCall(name=TRANSFER_TOOL, args={"agent_name": routes[decision.intent]})
+        return LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(function_call=call)])
+        )
+
+    return callback
+
+
+def log_model_route_callback(routes: Mapping[Intent, str]):
+    """Build an after-model callback that records the router model's transfers."""
+
+    intents_by_agent = {agent_name: intent for intent, agent_name in routes.items()}
+
+    def callback(
+        callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        parts = llm_response.content.parts if llm_response.content else None
+        for part in parts or []:
+            call = part.function_call
+            if call is None or call.name != TRANSFER_TOOL:
+                continue
+            intent = intents_by_agent.get((call.args or {}).get("agent_name"))
+            text = _turn_text(callback_context)
+            if intent is not None and text:
+                fast_path_stats.model += 1
+                log_turn(text, intent, source="model", confidence=None)
+        return None
+
+    return callback
+
+
+def train_from_log(
+    turns: Iterable[Mapping[str, Any]], *, sources: Optional[set[str]] = None
+) -> TfidfIntentModel:
+    """Fit a TfidfIntentModel from logged turns, optionally filtered by source."""
+
+    selected = [turn for turn in turns if sources is None or turn.get("source") in sources]
+    return TfidfIntentModel.fit(
+        [turn["text"] for turn in selected], [turn["intent"] for turn in selected]
+    )
@@ -0,0 +1,95 @@
+"""Placeholder agents whose sub-tree is built the first time they run.
+
+A `LazyAgent` stands in the agent tree with the real agent's name and
+description, which is all the parent needs to offer it as a transfer target.
+When control first reaches it, it calls its factory, swaps the real agent into
+the parent's ``sub_agents`` (so later turns, `find_agent` lookups and transfers
+between the real agent's own sub-agents see the real tree) and runs it.
+
+ADK clones agents when it runs them, so the build is shared by the placeholder
+and all of its clones: the factory runs once, the result is grafted into the
+tree the placeholder was created in, and a clone running in a copied tree
+grafts a clone of the result into that copy.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import AsyncGenerator, Callable
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from pydantic import Field, PrivateAttr
+
+
+@dataclass
+class _BuildState:
+    """Shared by a placeholder and its clones (copies share private attributes)."""
+
+    origin: Optional[LazyAgent] = None
+    agent: Optional[BaseAgent] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _graft(placeholder: LazyAgent, agent: BaseAgent) -> None:
+    parent = placeholder.parent_agent
+    if parent is None:
+        return
+    for index, sub_agent in enumerate(parent.sub_agents):
+        if sub_agent is placeholder:
+            parent.sub_agents[index] = agent
+            agent.parent_agent = parent
+            return
+
+
+class LazyAgent(BaseAgent):
+    """Builds ``factory()`` on first run and replaces itself with the result.
+
+    The built agent must keep the placeholder's name and description: the parent
+    router's transfer instructions (and so its model-cache keys) are rendered
+    from whichever of the two is in the tree.
+    """
+
+    factory: Callable[[], BaseAgent] = Field(exclude=True)
+
+    _state: _BuildState = PrivateAttr(default_factory=_BuildState)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        if self._state.origin is None:
+            self._state.origin = self
+
+    @property
+    def is_built(self) -> bool:
+        return self._state.agent is not None
+
+    def resolve(self) -> BaseAgent:
+        """Build the real agent (once) and graft it in place of this placeholder."""
+
+        state = self._state
+        with state.lock:
+            if state.agent is None:
+                agent = self.factory()
+                if (agent.name, agent.description) != (self.name, self.description):
+                    raise ValueError(
+                        f"Lazy agent {self.name!r} built {agent.name!r} with a different "
+                        "name or description"
+                    )
+                state.agent = agent
+                _graft(state.origin, agent)
+            if self is state.origin:
+                return state.agent
+            agent = state.agent.clone()
+        _graft(self, agent)
+        return agent
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        async for event in self.resolve().run_async(ctx):
+            yield event
+
+    async def _run_live_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        async for event in self.resolve().run_live(ctx):
+            yield event
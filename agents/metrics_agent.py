@@ -3,16 +3,10 @@
 from typing import Optional
 
 from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
-from google.genai import types
 from pydantic import BaseModel, Field
 
-retry_config = types.HttpRetryOptions(
-    attempts=5,
-    exp_base=7,
-    initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],
-)
+from agents.models import get_model
+from tools.metrics_tool import metrics_tool
 
 
 class MetricsRequest(BaseModel):
@@ -34,8 +28,8 @@ class MetricsResponse(BaseModel):
 
 
 INSTRUCTION = """You are the FreshFit Metrics agent.
-- Summarize FreshFit KPIs (acceptance, average rating, banned combo count, travel coverage) for the requested date range.
-- Call the Metrics Tool when available; otherwise describe fallback assumptions.
+- Call `compute_metrics` once with the request's start_date, end_date and include_travel; it computes every KPI from the feedback database.
+- Copy acceptance_rate, average_rating, banned_combo_count, travel_coverage_ratio and notes from the tool result unchanged; never estimate a figure the tool returned as null.
 Return JSON matching MetricsResponse."""
 
 
@@ -46,7 +40,8 @@ def metrics_agent() -> Agent:
         name="metrics_agent",
         description="Produces KPI snapshots for FreshFit.",
         instruction=INSTRUCTION,
-        model=Gemini(model="gemini-2.5-flash", retry_options=retry_config),
+        model=get_model("metrics_agent"),
         input_schema=MetricsRequest,
         output_schema=MetricsResponse,
+        tools=[metrics_tool],
     )
@@ -0,0 +1,284 @@
+"""Content-addressed model-call cache shared by every FreshFit agent.
+
+`ModelCachePlugin` is an ADK plugin, so one instance registered on the ``App``
+covers every LLM agent in the graph. Before each model call it fingerprints the
+fully resolved request (system instruction with injected session state, the
+conversation including tool calls and results, tool declarations and generation
+config) together with the user's wardrobe and preference version stamps. A
+stored response for that key is replayed without calling the model; fresh
+responses are stored in the on-disk LRU (`tools/llm_cache.py`).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from pydantic import ValidationError
+
+from agents.intent_router import DEFAULT_MODE as ROUTER_MODE
+from tools.demo_wardrobe_tool import wardrobe_data_version
+from tools.llm_cache import LlmResponseCache, llm_response_cache
+from tools.preference_history_tool import preference_data_version
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.getenv("FRESHFIT_LLM_CACHE", "on").lower() not in {"0", "off", "false"}
+KEY_VERSION = 1
+_CONFIG_EXCLUDE = {"http_options", "labels"}
+
+VersionStamps = Callable[[str], Mapping[str, str]]
+# The root router agent; in ``fast`` mode its own before_model callback answers most
+# turns, so a lookup in front of it would only add version-stamp reads.
+ROUTER_AGENT_NAME = "FreshFit"
+
+
+def default_version_stamps(user_id: str) -> dict[str, str]:
+    """Wardrobe and preference stamps for ``user_id`` (see `read_data_version`)."""
+
+    stamps = {}
+    for name, read in (
+        ("wardrobe", wardrobe_data_version),
+        ("preferences", preference_data_version),
+    ):
+        try:
+            stamps[name] = read(user_id)
+        except FileNotFoundError:
+            stamps[name] = "missing"
+    return stamps
+
+
+def _scrub_content(content: dict[str, Any]) -> dict[str, Any]:
+    """Drop per-call ids and thought signatures, which differ between identical turns."""
+
+    for part in content.get("parts") or []:
+        part.pop("thought_signature", None)
+        for field in ("function_call", "function_response"):
+            if field in part:
+                part[field].pop("id", None)
+    return content
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    return repr(value)
+
+
+def request_fingerprint(llm_request: LlmRequest) -> dict[str, Any]:
+    """Canonical, JSON-ready view of everything that shapes the model's answer."""
+
+    contents = []
+    for content in llm_request.contents or []:
+        parts = [part for part in content.parts or [] if not part.thought]
+        dumped = content.model_copy(update={"parts": parts}).model_dump(
+            mode="json", exclude_none=True
+        )
+        contents.append(_scrub_content(dumped))
+    config = llm_request.config
+    return {
+        "model": llm_request.model,
+        "config": (
+            config.model_dump(mode="json", exclude_none=True, exclude=_CONFIG_EXCLUDE)
+            if config is not None
+            else None
+        ),
+        "contents": contents,
+    }
+
+
+def cache_key(llm_request: LlmRequest, stamps: Mapping[str, str]) -> str:
+    """SHA-256 over the request fingerprint and the data version stamps."""
+
+    document = {
+        "v": KEY_VERSION,
+        "request": request_fingerprint(llm_request),
+        "stamps": dict(sorted(stamps.items())),
+    }
+    encoded = json.dumps(document, sort_keys=True, separators=(",", ":"), default=_json_default)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _cacheable(llm_response: LlmResponse) -> bool:
+    return bool(
+        llm_response.content
+        and llm_response.content.parts
+        and not llm_response.partial
+        and not llm_response.interrupted
+        and llm_response.error_code is None
+    )
+
+
+@dataclass
+class AgentCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    bypassed: int = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "bypassed": self.bypassed,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+class ModelCachePlugin(BasePlugin):
+    """Replay stored model responses for identical requests on unchanged data.
+
+    Args:
+        cache: Response store (defaults to the shared on-disk LRU).
+        version_stamps: Returns the data stamps mixed into every key for a user.
+        skip_agents: Agent names that always call the model.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[LlmResponseCache] = None,
+        *,
+        version_stamps: VersionStamps = default_version_stamps,
+        skip_agents: Iterable[str] = (),
+        name: str = "freshfit_model_cache",
+    ) -> None:
+        super().__init__(name=name)
+        self.cache = cache or llm_response_cache
+        self.version_stamps = version_stamps
+        self.skip_agents = frozenset(skip_agents)
+        self._lock = threading.Lock()
+        self._stats: dict[str, AgentCacheStats] = {}
+        # Keys computed before a model call, consumed when its response arrives. An
+        # agent callback that answers instead of the model leaves its key behind, so
+        # the agent's next event and the end of the run drop leftovers.
+        self._pending: dict[tuple[str, str, str], str] = {}
+
+    def _agent_stats(self, agent_name: str) -> AgentCacheStats:
+        with self._lock:
+            return self._stats.setdefault(agent_name, AgentCacheStats())
+
+    @staticmethod
+    def _call_id(callback_context: CallbackContext) -> tuple[str, str, str]:
+        return (
+            callback_context.invocation_id,
+            callback_context.branch or "",
+            callback_context.agent_name,
+        )
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        agent_stats = self._agent_stats(callback_context.agent_name)
+        if (
+            not CACHE_ENABLED
+            or not self.cache.enabled
+            or callback_context.agent_name in self.skip_agents
+        ):
+            agent_stats.bypassed += 1
+            return None
+
+        try:
+            key = cache_key(llm_request, self.version_stamps(callback_context.user_id))
+        except (TypeError, ValueError, sqlite3.Error):
+            logger.debug("Request for %s is not fingerprintable", callback_context.agent_name)
+            agent_stats.bypassed += 1
+            return None
+
+        payload = self.cache.get(key)
+        if payload is not None:
+            try:
+                response = LlmResponse.model_validate_json(payload)
+            except ValidationError:
+                logger.warning("Discarding unreadable cached response for %s", key)
+            else:
+                agent_stats.hits += 1
+                response.custom_metadata = {
+                    **(response.custom_metadata or {}),
+                    "model_cache": "hit",
+                }
+                return response
+
+        # Counted as a miss once the model actually answers (see after_model).
+        with self._lock:
+            self._pending[self._call_id(callback_context)] = key
+        return None
+
+    async def after_model_callback(
+        self, *, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None
+        with self._lock:
+            key = self._pending.pop(self._call_id(callback_context), None)
+        if key is None:
+            return None
+        agent_stats = self._agent_stats(callback_context.agent_name)
+        agent_stats.misses += 1
+        if not _cacheable(llm_response):
+            return None
+        stored = llm_response.model_dump(mode="json", exclude_none=True)
+        stored.pop("usage_metadata", None)
+        _scrub_content(stored["content"])
+        self.cache.put(key, callback_context.agent_name, json.dumps(stored))
+        agent_stats.stores += 1
+        return None
+
+    async def on_model_error_callback(
+        self,
+        *,
+        callback_context: CallbackContext,
+        llm_request: LlmRequest,
+        error: Exception,
+    ) -> Optional[LlmResponse]:
+        # A failed call never reaches after_model; drop its key so it cannot leak.
+        with self._lock:
+            self._pending.pop(self._call_id(callback_context), None)
+        return None
+
+    async def on_event_callback(
+        self, *, invocation_context: InvocationContext, event: Event
+    ) -> None:
+        # after_model runs before the model's event is yielded, so a key still
+        # pending here belongs to a call an agent callback answered instead.
+        if not event.partial and event.author:
+            with self._lock:
+                self._pending.pop((event.invocation_id, event.branch or "", event.author), None)
+        return None
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        invocation_id = invocation_context.invocation_id
+        with self._lock:
+            for call_id in [call_id for call_id in self._pending if call_id[0] == invocation_id]:
+                del self._pending[call_id]
+
+    def stats(self) -> dict[str, Any]:
+        """Per-agent hit/miss counters plus an overall hit ratio."""
+
+        with self._lock:
+            per_agent = {name: stats.snapshot() for name, stats in sorted(self._stats.items())}
+        hits = sum(stats["hits"] for stats in per_agent.values())
+        lookups = hits + sum(stats["misses"] for stats in per_agent.values())
+        return {
+            "agents": per_agent,
+            "hit_ratio": round(hits / lookups, 3) if lookups else None,
+        }
+
+
+model_cache_plugin = ModelCachePlugin(
+    skip_agents=(ROUTER_AGENT_NAME,) if ROUTER_MODE == "fast" else ()
+)
@@ -0,0 +1,121 @@
+"""Shared model clients and retry policy for every FreshFit agent.
+
+Agents ask `get_model` for their model by agent name instead of building their
+own ``Gemini`` instance. Agents that resolve to the same model name share one
+instance (and so one HTTP client and connection pool per event loop), and every
+Gemini client gets the same retry/backoff policy.
+
+Per-agent overrides come from ``FRESHFIT_MODEL_OVERRIDES``, a comma-separated list
+of ``agent_name=model_name`` pairs (e.g. ``outfit_designer=gemini-2.5-pro``);
+``FRESHFIT_MODEL`` changes the default for everyone. Tests and benchmarks can
+install a ready-made ``BaseLlm`` (such as a fake) with `override_model`.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Mapping
+from typing import Any, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.google_llm import Gemini
+from google.genai import types
+
+DEFAULT_MODEL = os.getenv("FRESHFIT_MODEL", "gemini-2.5-flash")
+
+RETRY_OPTIONS = types.HttpRetryOptions(
+    attempts=5,
+    exp_base=7,
+    initial_delay=1,
+    http_status_codes=[429, 500, 503, 504],
+)
+
+
+def parse_model_overrides(spec: Optional[str]) -> dict[str, str]:
+    """Parse ``"agent=model,agent2=model2"`` into a dict (blank entries ignored)."""
+
+    overrides = {}
+    for entry in (spec or "").split(","):
+        agent_name, sep, model_name = entry.partition("=")
+        if sep and agent_name.strip() and model_name.strip():
+            overrides[agent_name.strip()] = model_name.strip()
+    return overrides
+
+
+class ModelRegistry:
+    """Hands out one shared model instance per model name."""
+
+    def __init__(
+        self,
+        *,
+        default_model: str = DEFAULT_MODEL,
+        overrides: Optional[Mapping[str, str]] = None,
+        retry_options: types.HttpRetryOptions = RETRY_OPTIONS,
+    ) -> None:
+        self.default_model = default_model
+        self.overrides = dict(overrides or {})
+        self.retry_options = retry_options
+        self._lock = threading.Lock()
+        self._models: dict[str, BaseLlm] = {}
+        self._installed: dict[Optional[str], BaseLlm] = {}
+        self._assignments: dict[str, str] = {}
+
+    def model_name_for(self, agent_name: Optional[str] = None) -> str:
+        return self.overrides.get(agent_name or "", self.default_model)
+
+    def get(self, agent_name: Optional[str] = None) -> BaseLlm:
+        """Return the shared model for ``agent_name`` (or the default model)."""
+
+        with self._lock:
+            installed = self._installed.get(agent_name) or self._installed.get(None)
+            if installed is not None:
+                if agent_name:
+                    self._assignments[agent_name] = installed.model
+                return installed
+            model_name = self.model_name_for(agent_name)
+            model = self._models.get(model_name)
+            if model is None:
+                model = Gemini(model=model_name, retry_options=self.retry_options)
+                self._models[model_name] = model
+            if agent_name:
+                self._assignments[agent_name] = model_name
+            return model
+
+    def override(self, model: Optional[BaseLlm], agent_name: Optional[str] = None) -> None:
+        """Install ``model`` for one agent (or, with no name, for every agent).
+
+        Only agents constructed afterwards pick it up. Pass ``None`` to remove it.
+        """
+
+        with self._lock:
+            if model is None:
+                self._installed.pop(agent_name, None)
+            else:
+                self._installed[agent_name] = model
+
+    def snapshot(self) -> dict[str, Any]:
+        """Model instances created so far and which agents use which model."""
+
+        with self._lock:
+            return {
+                "instances": sorted(self._models),
+                "agents": dict(sorted(self._assignments.items())),
+            }
+
+
+model_registry = ModelRegistry(
+    overrides=parse_model_overrides(os.getenv("FRESHFIT_MODEL_OVERRIDES"))
+)
+
+
+def get_model(agent_name: Optional[str] = None) -> BaseLlm:
+    """Shared model for ``agent_name`` from the process-wide registry."""
+
+    return model_registry.get(agent_name)
+
+
+def override_model(model: Optional[BaseLlm], agent_name: Optional[str] = None) -> None:
+    """Install (or with ``None`` remove) a model on the process-wide registry."""
+
+    model_registry.override(model, agent_name)
@@ -1,21 +1,26 @@
 """Lightweight Outfit Designer agent builder."""
 
+import asyncio
+import logging
+import os
 from typing import Any, Literal, Optional
 
 from google.adk.agents import Agent
+from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.base_llm import BaseLlm
-from google.adk.models.google_llm import Gemini
 from google.adk.tools import google_search
 from google.genai import types
 from pydantic import BaseModel, Field, model_validator
 
+from agents.models import get_model
+from agents.prompt_tables import store_wardrobe_table
 from agents.wardrobe_cataloger import WardrobeItem
 
-retry_config = types.HttpRetryOptions(
-    attempts=5,
-    exp_base=7,
-    initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],
+logger = logging.getLogger(__name__)
+
+DesignerMode = Literal["llm", "polish", "fast"]
+DEFAULT_MODE: DesignerMode = os.getenv(  # type: ignore[assignment]
+    "FRESHFIT_OUTFIT_DESIGNER_MODE", "polish"
 )
 
 
@@ -23,11 +28,12 @@ INSTRUCTION = """You are the FreshFit Outfit Designer agent.
 
 Input payload (already validated):
 - `weather`: {weather} (normalized weather/context bundle from upstream agents (temp buckets, precipitation, location, notes)).
-- `wardrobe_items`: {wardrobe_items} (structured list of wardrobe entries sourced from WardrobeCataloger. Each entry mirrors the SQLite schema (item_id, name, category, color, warmth_level, formality, body_zone, last_worn_date)).
+- `wardrobe_items` (wardrobe entries sourced from WardrobeCataloger: item_id, name, category, color, warmth_level, formality, body_zone, and days since last worn; a compact table explains its columns and codes in its first two lines):
+{wardrobe_table}
 - Additional scalar fields mirror OutfitDesignerInput (user_id, occasion, temperature_c, precipitation_chance, location, daily_or_travel, optional narrative context).
 
 Core rules:
-1. Parse the wardrobe items and prioritize pieces that have not been worn recently (using `last_worn_date`). If you must reuse something worn in the past day, explain why in the outfit description.
+1. Parse the wardrobe items and prioritize pieces that have not been worn recently (days since last worn). If you must reuse something worn in the past day, explain why in the outfit description.
 2. Never hallucinate clothing that is not present in `wardrobe_items`.
 3. Build each outfit with the FreshFit heuristic: either (top + bottom) or (dress) as the base, plus weather-appropriate outer layer when <18°C or precipitation is likely, shoes, and at least one accessory when available.
 4. Balance color/fabric harmony (complementary palette, avoid clashing formality levels) and respect the stated occasion.
@@ -42,6 +48,7 @@ Daily mode:
 
 Travel mode:
 - Treat `wardrobe_items` as the complete closet for the trip. Generate a capsule plan covering each day while minimizing the total number of unique pieces packed.
+- When the payload includes `trip_days`, emit exactly one outfit per entry in order (rank = day number), dressed for that day's weather and occasion.
 - Mention reuse strategy in the `outfit_description` (e.g., “Rewear the navy chinos on days 2–3; swap the top to keep looks fresh”).
 
 Output:
@@ -81,6 +88,29 @@ Return JSON that strictly matches OutfitDesignerOutput. Do not add prose outside
 }
 """
 
+POLISH_INSTRUCTION = (
+    INSTRUCTION
+    + """
+Engine drafts:
+- `outfit_candidates`:
+{outfit_candidates?}
+- Drafts are only built for daily requests. When present they were built deterministically from `wardrobe_items` and already satisfy rules 1-3, 5 and 8, plus the daily slate size (5-8 outfits) and `outfit_id`/`rank` format from rule 7; rule 4's color harmony is still yours to describe. Keep every `outfit_id`, `rank`, `outfit_items`, and `outfit_item_details` entry exactly as given (each `items` entry is an `item_id:short_name` pair, in order); only rewrite `outfit_name` and `outfit_description` so they read naturally and reference the weather and occasion.
+- When drafts are empty, build the slate yourself following the rules above.
+"""
+)
+
+
+class TripDay(BaseModel):
+    """Weather and occasion for one day of a travel itinerary."""
+
+    date: Optional[str] = Field(default=None, description="ISO date of the trip day.")
+    occasion: str = Field(
+        default="",
+        description="Plans for the day; empty falls back to the request's occasion.",
+    )
+    temperature_c: Optional[float] = None
+    precipitation_chance: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+
 
 class OutfitDesignerInput(BaseModel):
     """Minimal payload consumed by the agent."""
@@ -117,6 +147,13 @@ class OutfitDesignerInput(BaseModel):
     location: Optional[str] = None
     precipitation_chance: Optional[float] = None
     daily_or_travel: Literal["daily", "travel"] = "daily"
+    trip_days: list[TripDay] = Field(
+        default_factory=list,
+        description=(
+            "Travel mode itinerary, one entry per day (date, occasion, temperature_c, "
+            "precipitation_chance). When present the capsule planner answers directly."
+        ),
+    )
 
 
 class OutfitItemDetail(BaseModel):
@@ -171,25 +208,125 @@ class OutfitDesignerOutput(BaseModel):
         return model
 
 
+class TravelDesignerOutput(OutfitDesignerOutput):
+    """Travel slate with one outfit per trip day, so short trips may have fewer than three."""
+
+    @model_validator(mode="after")
+    def ensure_multiple_outfits(
+        cls, model: "TravelDesignerOutput"
+    ) -> "TravelDesignerOutput":
+        """Require at least one trip day."""
+
+        if not model.outfits:
+            raise ValueError("A travel slate needs one outfit per trip day.")
+        return model
+
+
+def _run_outfit_engine(mode: DesignerMode):
+    """Build a before-agent callback that drafts the slate deterministically.
+
+    Travel requests with an itinerary (``trip_days``, or a trip length such as
+    "4-day trip" in free text) are answered by the capsule planner
+    (`agents/capsule_planner.py`) in every mode, with the plan under
+    ``capsule_plan``. Other travel requests, and itineraries the planner
+    rejects, go straight to the model, since the engine only drafts daily
+    slates. In ``fast`` mode a successful draft is returned as the agent's
+    response, so the model is never called. In ``polish`` mode the draft is
+    stored under ``outfit_candidates`` for the model to rename and describe.
+    Either way, a closet that cannot yield five outfits falls through to the
+    full LLM designer.
+    """
+
+    async def callback(callback_context: CallbackContext) -> Optional[types.Content]:
+        # Imported lazily: the engine depends on the schemas defined in this module.
+        from agents.capsule_planner import capsule_plan_from_state
+        from agents.outfit_engine import generate_outfits_from_state, is_travel_request
+        from agents.prompt_tables import outfit_table
+
+        try:
+            # Off the event loop: the search runs for up to its time budget.
+            plan = await asyncio.to_thread(
+                capsule_plan_from_state,
+                callback_context.state,
+                user_id=callback_context.user_id,
+                user_content=callback_context.user_content,
+            )
+        except ValueError:
+            logger.warning("Capsule planner rejected the itinerary", exc_info=True)
+            plan = None
+        if plan is not None:
+            # A solved itinerary is final: polishing would rename the day labels.
+            slate = plan.designer_output()
+            callback_context.state["capsule_plan"] = plan.model_dump()
+            callback_context.state["outfits"] = slate.model_dump()
+            return types.Content(role="model", parts=[types.Part(text=slate.model_dump_json())])
+
+        if is_travel_request(callback_context.user_content):
+            # The engine only drafts daily slates; the model plans the trip.
+            callback_context.state["outfit_candidates"] = ""
+            return None
+
+        try:
+            slate = generate_outfits_from_state(
+                callback_context.state,
+                user_id=callback_context.user_id,
+                user_content=callback_context.user_content,
+            )
+        except ValueError:
+            callback_context.state["outfit_candidates"] = ""
+            return None
+
+        if mode == "polish":
+            callback_context.state["outfit_candidates"] = outfit_table(
+                slate.model_dump()["outfits"]
+            )
+            return None
+
+        callback_context.state["outfits"] = slate.model_dump()
+        return types.Content(
+            role="model", parts=[types.Part(text=slate.model_dump_json())]
+        )
+
+    return callback
+
+
 def outfit_designer_agent(
     *,
     model: Optional[BaseLlm] = None,
     instruction: Optional[str] = None,
+    mode: Optional[DesignerMode] = None,
 ) -> Agent:
-    """Return ADK agent that drafts outfit ideas."""
+    """Return ADK agent that drafts outfit ideas.
 
-    resolved_model = model or Gemini(
-        model="gemini-2.5-flash",
-        retry_options=retry_config,
-    )
+    Args:
+        model: Optional model override (defaults to Gemini 2.5 Flash).
+        instruction: Optional instruction override.
+        mode: ``llm`` lets Gemini enumerate outfits, ``polish`` (default) has the
+            deterministic engine draft them and Gemini only polish names and
+            descriptions, ``fast`` skips the model whenever the engine succeeds.
+    """
+
+    resolved_mode = mode or DEFAULT_MODE
+    if resolved_mode not in ("llm", "polish", "fast"):
+        raise ValueError(f"Unknown outfit designer mode: {resolved_mode!r}")
+
+    resolved_model = model or get_model("outfit_designer")
 
     return Agent(
         name="outfit_designer",
         description="Suggests outfits from a wardrobe summary.",
-        instruction=INSTRUCTION,
+        instruction=instruction
+        or (POLISH_INSTRUCTION if resolved_mode == "polish" else INSTRUCTION),
         model=resolved_model,
         input_schema=OutfitDesignerInput,
         output_schema=OutfitDesignerOutput,
         output_key="outfits",
         tools=[google_search],
+        # The engine runs first: in fast mode its slate ends the turn, so the
+        # wardrobe table is only encoded when the model will read it.
+        before_agent_callback=(
+            [store_wardrobe_table]
+            if resolved_mode == "llm"
+            else [_run_outfit_engine(resolved_mode), store_wardrobe_table]
+        ),
     )
@@ -0,0 +1,444 @@
+"""Deterministic outfit generator that applies the FreshFit designer rules in Python."""
+
+from __future__ import annotations
+
+import functools
+import itertools
+import re
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Optional
+
+from agents.outfit_designer import (
+    OutfitCandidate,
+    OutfitDesignerOutput,
+    OutfitItemDetail,
+)
+from agents.state_payloads import (
+    content_text,
+    load_payload,
+    wardrobe_items_from_state,
+    weather_from_state,
+)
+from agents.wardrobe_cataloger import WardrobeItem
+
+WARMTH_LEVELS = {"light": 0, "medium": 1, "heavy": 2}
+FORMALITY_LEVELS = {"casual": 0, "smart_casual": 1, "business": 2, "formal": 3}
+BUCKET_TEMPS_C = {"cold": 6.0, "cool": 14.0, "mild": 21.0, "warm": 27.0, "hot": 32.0}
+
+OUTERWEAR_BELOW_C = 18.0
+RAIN_LIKELY = 0.5
+RECENT_WEAR_DAYS = 2
+RECENCY_HORIZON_DAYS = 14
+# Daily slates carry 5-10 outfits (designer rule 7).
+MIN_OUTFITS = 5
+DEFAULT_MAX_OUTFITS = 8
+
+# Per-slot beam widths keep enumeration bounded for large closets.
+SLOT_BEAM = {"top": 6, "bottom": 6, "dress": 4, "outerwear": 3, "shoes": 3, "accessory": 3}
+STANDARD_CATEGORIES = frozenset(SLOT_BEAM)
+# Fallback slot assignment for items whose category is missing or non-standard.
+ZONE_SLOTS = {"lower": "bottom", "full_body": "dress", "shoe": "shoes", "accessory": "accessory"}
+
+ITEM_WEIGHTS = {"warmth": 0.4, "formality": 0.35, "recency": 0.25}
+REUSE_PENALTY = 0.08
+
+OCCASION_FORMALITY: tuple[tuple[tuple[str, ...], int], ...] = (
+    (("wedding", "gala", "black tie", "formal", "opera", "ceremony"), 3),
+    (("office", "work", "meeting", "interview", "business", "client", "conference"), 2),
+    (("dinner", "date", "gallery", "brunch", "smart", "party", "theater", "theatre"), 1),
+    (("errand", "weekend", "casual", "gym", "hike", "park", "travel", "lounge"), 0),
+)
+DEFAULT_FORMALITY = 1
+
+FORMALITY_ADJECTIVES = ("Easygoing", "Polished", "Sharp", "Elevated")
+
+# Free-text cues that a request plans a trip rather than a single day. Plural
+# "days" alone is left out so "dinner in 2 days" stays a daily request.
+TRAVEL_REQUEST = re.compile(
+    r"\b(trips?|travel\w*|vacation|getaway|itinerary|packing|pack for|"
+    r"\d+[- ]?(?:day|night)|\d+ nights|for \d+ days)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class DesignContext:
+    """Weather + occasion signals the engine scores against."""
+
+    occasion: str = ""
+    user_id: Optional[str] = None
+    temperature_c: Optional[float] = None
+    precipitation_chance: Optional[float] = None
+    today: date = field(default_factory=date.today)
+
+    @property
+    def rain_likely(self) -> bool:
+        return (self.precipitation_chance or 0.0) >= RAIN_LIKELY
+
+    @property
+    def needs_outerwear(self) -> bool:
+        cold = self.temperature_c is not None and self.temperature_c < OUTERWEAR_BELOW_C
+        return cold or self.rain_likely
+
+    @property
+    def target_warmth(self) -> float:
+        temp = self.temperature_c
+        if temp is None:
+            return 1.0
+        if temp < 10:
+            return 2.0
+        if temp < OUTERWEAR_BELOW_C:
+            return 1.0
+        if temp < 24:
+            return 0.5
+        return 0.0
+
+    @property
+    def target_formality(self) -> float:
+        return float(occasion_formality(self.occasion))
+
+
+@dataclass(frozen=True)
+class _Scored:
+    item: WardrobeItem
+    score: float
+    days_since_worn: Optional[int]
+    formality: int = DEFAULT_FORMALITY
+
+
+@functools.lru_cache(maxsize=256)
+def occasion_formality(occasion: str) -> int:
+    """Map a free-text occasion onto the formality ladder."""
+
+    text = occasion.lower()
+    for keywords, level in OCCASION_FORMALITY:
+        if any(re.search(rf"\b{re.escape(keyword)}", text) for keyword in keywords):
+            return level
+    return DEFAULT_FORMALITY
+
+
+def _days_since(value: Optional[str], today: date) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        return (today - date.fromisoformat(value[:10])).days
+    except ValueError:
+        return None
+
+
+class WardrobeIndex:
+    """Category and body-zone indexes used to prune candidate slots."""
+
+    def __init__(self, items: Iterable[WardrobeItem | Mapping[str, Any]]) -> None:
+        self.by_category: dict[str, list[WardrobeItem]] = defaultdict(list)
+        self.by_zone: dict[str, list[WardrobeItem]] = defaultdict(list)
+        for raw in items:
+            item = raw if isinstance(raw, WardrobeItem) else WardrobeItem.model_validate(raw)
+            self.by_category[(item.category or "").lower()].append(item)
+            self.by_zone[(item.body_zone or "").lower()].append(item)
+
+    def slot(self, slot: str) -> list[WardrobeItem]:
+        """Return items that can fill ``slot`` (a category name)."""
+
+        candidates = list(self.by_category.get(slot, []))
+        for zone, zone_slot in ZONE_SLOTS.items():
+            if zone_slot != slot:
+                continue
+            candidates.extend(
+                item
+                for item in self.by_zone.get(zone, [])
+                if (item.category or "").lower() not in STANDARD_CATEGORIES
+            )
+        return candidates
+
+
+def _score_item(item: WardrobeItem, slot: str, context: DesignContext) -> _Scored:
+    warmth = WARMTH_LEVELS.get(item.warmth_level or "", 1)
+    formality = FORMALITY_LEVELS.get(item.formality or "", 1)
+    days = _days_since(item.last_worn_date, context.today)
+
+    target_warmth = context.target_warmth
+    if slot == "outerwear" and context.rain_likely and target_warmth < 1:
+        target_warmth = 1.0
+    warmth_fit = 1.0 - abs(warmth - target_warmth) / 2.0
+    if slot == "accessory":
+        warmth_fit = 0.5 + warmth_fit / 2.0
+    formality_fit = 1.0 - abs(formality - context.target_formality) / 3.0
+    if days is None:
+        recency = 1.0
+    elif days < RECENT_WEAR_DAYS:
+        recency = 0.0
+    else:
+        recency = min(days, RECENCY_HORIZON_DAYS) / RECENCY_HORIZON_DAYS
+
+    score = (
+        ITEM_WEIGHTS["warmth"] * warmth_fit
+        + ITEM_WEIGHTS["formality"] * formality_fit
+        + ITEM_WEIGHTS["recency"] * recency
+    )
+    return _Scored(item=item, score=score, days_since_worn=days, formality=formality)
+
+
+def _beam(index: WardrobeIndex, slot: str, context: DesignContext) -> list[_Scored]:
+    scored = [_score_item(item, slot, context) for item in index.slot(slot)]
+    scored.sort(key=lambda entry: (-entry.score, entry.item.name, entry.item.item_id))
+    return scored[: SLOT_BEAM[slot]]
+
+
+def _combo_score(pieces: Sequence[_Scored]) -> Optional[float]:
+    """Mean item score minus a formality-clash penalty; ``None`` prunes the combo."""
+
+    levels = [piece.formality for piece in pieces]
+    spread = max(levels) - min(levels)
+    if spread > 2:
+        return None
+    mean = sum(piece.score for piece in pieces) / len(pieces)
+    return mean - 0.1 * max(spread - 1, 0)
+
+
+def _enumerate(
+    index: WardrobeIndex, context: DesignContext
+) -> list[tuple[float, tuple[_Scored, ...]]]:
+    beams = {
+        slot: _beam(index, slot, context)
+        for slot in SLOT_BEAM
+        if slot != "outerwear" or context.needs_outerwear
+    }
+    return _combine(beams, context)
+
+
+def _combine(
+    beams: Mapping[str, Sequence[_Scored]], context: DesignContext
+) -> list[tuple[float, tuple[_Scored, ...]]]:
+    """Score every base/layer/shoe/accessory combination of the per-slot candidates."""
+
+    tops, bottoms, dresses = (beams.get(slot, ()) for slot in ("top", "bottom", "dress"))
+    bases: list[tuple[_Scored, ...]] = [(top, bottom) for top in tops for bottom in bottoms]
+    bases.extend((dress,) for dress in dresses)
+
+    layers: list[tuple[_Scored, ...]] = [()]
+    if context.needs_outerwear and beams.get("outerwear"):
+        layers = [(piece,) for piece in beams["outerwear"]]
+    shoes: list[tuple[_Scored, ...]] = [(piece,) for piece in beams.get("shoes", ())]
+    accessories: list[tuple[_Scored, ...]] = [(piece,) for piece in beams.get("accessory", ())]
+
+    combos: list[tuple[float, tuple[_Scored, ...]]] = []
+    for base, layer, shoe, accessory in itertools.product(
+        bases, layers, shoes or [()], accessories or [()]
+    ):
+        pieces = (*base, *layer, *shoe, *accessory)
+        score = _combo_score(pieces)
+        if score is not None:
+            combos.append((score, pieces))
+    combos.sort(key=lambda entry: (-entry[0], [piece.item.item_id for piece in entry[1]]))
+    return combos
+
+
+def _select_diverse(
+    combos: list[tuple[float, tuple[_Scored, ...]]], max_outfits: int
+) -> list[tuple[float, tuple[_Scored, ...]]]:
+    """Greedy pick that penalizes reusing items and never repeats a base."""
+
+    chosen: list[tuple[float, tuple[_Scored, ...]]] = []
+    usage: dict[str, int] = defaultdict(int)
+    used_bases: set[tuple[str, ...]] = set()
+    remaining = list(combos)
+    while remaining and len(chosen) < max_outfits:
+        best_index, best_value = -1, float("-inf")
+        for position, (score, pieces) in enumerate(remaining):
+            base = _base_key(pieces)
+            if base in used_bases:
+                continue
+            value = score - REUSE_PENALTY * sum(usage[piece.item.item_id] for piece in pieces)
+            if value > best_value:
+                best_index, best_value = position, value
+        if best_index < 0:
+            break
+        score, pieces = remaining.pop(best_index)
+        chosen.append((score, pieces))
+        used_bases.add(_base_key(pieces))
+        for piece in pieces:
+            usage[piece.item.item_id] += 1
+    return chosen
+
+
+def _base_key(pieces: Sequence[_Scored]) -> tuple[str, ...]:
+    return tuple(
+        piece.item.item_id
+        for piece in pieces
+        if (piece.item.category or "").lower() in {"top", "bottom", "dress"}
+    )
+
+
+def short_name(name: str) -> str:
+    """2-4 word label copied verbatim from the wardrobe item name."""
+
+    return " ".join(name.split()[:4])
+
+
+def _outfit_name(pieces: Sequence[_Scored], context: DesignContext) -> str:
+    levels = [FORMALITY_LEVELS.get(piece.item.formality or "", 1) for piece in pieces]
+    adjective = FORMALITY_ADJECTIVES[round(sum(levels) / len(levels))]
+    lead = pieces[0].item
+    color = (lead.color or "").strip().title()
+    if (lead.category or "").lower() == "dress":
+        noun = "Dress Look"
+    elif any((piece.item.category or "").lower() == "outerwear" for piece in pieces):
+        noun = "Rain-Ready Layers" if context.rain_likely else "Layers"
+    else:
+        noun = "Pairing"
+    return " ".join(part for part in (color, adjective, noun) if part)
+
+
+def _outfit_description(pieces: Sequence[_Scored], context: DesignContext) -> str:
+    by_category = {(piece.item.category or "").lower(): piece.item for piece in pieces}
+    if "dress" in by_category:
+        base = f"The {by_category['dress'].name}"
+    else:
+        base = " with ".join(
+            by_category[slot].name for slot in ("top", "bottom") if slot in by_category
+        )
+
+    weather_bits = []
+    if context.temperature_c is not None:
+        weather_bits.append(f"{context.temperature_c:.0f}°C")
+    if context.precipitation_chance is not None:
+        weather_bits.append(f"a {context.precipitation_chance:.0%} chance of rain")
+    weather = " and ".join(weather_bits)
+
+    sentence = base
+    if "outerwear" in by_category:
+        sentence += f", layered under the {by_category['outerwear'].name}"
+        if weather:
+            sentence += f" for {weather}"
+    elif weather:
+        sentence += f" suits {weather}"
+    finishers = [by_category[slot].name for slot in ("shoes", "accessory") if slot in by_category]
+    if finishers:
+        sentence += f"; finished with {' and '.join(finishers)}"
+    sentence += "."
+
+    recent = [
+        piece.item.name
+        for piece in pieces
+        if piece.days_since_worn is not None and piece.days_since_worn < RECENT_WEAR_DAYS
+    ]
+    if recent:
+        sentence += (
+            f" Reuses the {', '.join(recent)} worn in the last day because the closet "
+            "has no fresher match for this slot."
+        )
+    return sentence
+
+
+def generate_outfits(
+    items: Iterable[WardrobeItem | Mapping[str, Any]],
+    context: DesignContext,
+    *,
+    max_outfits: int = DEFAULT_MAX_OUTFITS,
+) -> OutfitDesignerOutput:
+    """Build a ranked outfit slate under the FreshFit designer rules.
+
+    Args:
+        items: Wardrobe entries (cataloger output); nothing outside this list is used.
+        context: Weather/occasion signals used for warmth, formality and rain rules.
+        max_outfits: Upper bound on the slate size (the daily rule caps it at 10).
+
+    Returns:
+        A validated OutfitDesignerOutput with deterministic outfit_ids.
+
+    Raises:
+        ValueError: If the closet cannot produce `MIN_OUTFITS` valid outfits.
+    """
+
+    index = WardrobeIndex(items)
+    chosen = _select_diverse(_enumerate(index, context), max(MIN_OUTFITS, max_outfits))
+    if len(chosen) < MIN_OUTFITS:
+        raise ValueError(f"Only {len(chosen)} valid outfits could be built from this wardrobe.")
+
+    owner = context.user_id or "anon"
+    outfits = []
+    for rank, (_, pieces) in enumerate(chosen, start=1):
+        outfits.append(
+            OutfitCandidate(
+                user_id=context.user_id,
+                outfit_id=f"{owner}-{rank:02d}",
+                rank=rank,
+                outfit_name=_outfit_name(pieces, context),
+                outfit_description=_outfit_description(pieces, context),
+                outfit_items=[piece.item.item_id for piece in pieces],
+                outfit_item_details=[
+                    OutfitItemDetail(
+                        item_id=piece.item.item_id, short_name=short_name(piece.item.name)
+                    )
+                    for piece in pieces
+                ],
+            )
+        )
+    return OutfitDesignerOutput(outfits=outfits)
+
+
+def is_travel_request(user_content: Any) -> bool:
+    """Whether the user's message asks for travel mode rather than a daily slate.
+
+    Accepts a designer payload (``daily_or_travel``) or free text mentioning a
+    trip; the engine only drafts daily slates.
+    """
+
+    text = content_text(user_content)
+    if not text:
+        return False
+    payload = load_payload(text)
+    if isinstance(payload, dict) and payload.get("daily_or_travel"):
+        return payload["daily_or_travel"] == "travel"
+    return bool(TRAVEL_REQUEST.search(text))
+
+
+def design_context_from_state(
+    state: Mapping[str, Any],
+    *,
+    user_id: Optional[str] = None,
+    user_content: Any = None,
+    today: Optional[date] = None,
+) -> DesignContext:
+    """Assemble a DesignContext from the weather bundle and the user's request."""
+
+    weather = weather_from_state(state)
+    temperature = weather.get("average_temp_c")
+    if (
+        temperature is None
+        and weather.get("high_temp_c") is not None
+        and weather.get("low_temp_c") is not None
+    ):
+        temperature = (weather["high_temp_c"] + weather["low_temp_c"]) / 2
+    if temperature is None:
+        temperature = BUCKET_TEMPS_C.get(str(weather.get("temp_bucket", "")).lower())
+
+    occasion = " ".join(
+        part
+        for part in (content_text(user_content), weather.get("dress_code"))
+        if isinstance(part, str) and part
+    )
+    return DesignContext(
+        occasion=occasion,
+        user_id=user_id,
+        temperature_c=temperature,
+        precipitation_chance=weather.get("precipitation_chance"),
+        today=today or date.today(),
+    )
+
+
+def generate_outfits_from_state(
+    state: Mapping[str, Any],
+    *,
+    user_id: Optional[str] = None,
+    user_content: Any = None,
+) -> OutfitDesignerOutput:
+    """Run the engine against the session state written by the parallel stage."""
+
+    items = wardrobe_items_from_state(state)
+    context = design_context_from_state(state, user_id=user_id, user_content=user_content)
+    return generate_outfits(items, context)
@@ -0,0 +1,256 @@
+"""Vectorized outfit scoring over NumPy wardrobe feature matrices."""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Optional
+
+import numpy as np
+
+from agents.outfit_engine import (
+    FORMALITY_LEVELS,
+    RECENCY_HORIZON_DAYS,
+    RECENT_WEAR_DAYS,
+    WARMTH_LEVELS,
+    DesignContext,
+)
+from agents.preference_ranking import CandidateScore
+from agents.wardrobe_cataloger import WardrobeItem
+
+# Ordered color families; "neutral" never counts toward palette clashes.
+COLOR_FAMILIES: tuple[tuple[str, tuple[str, ...]], ...] = (
+    (
+        "neutral",
+        tuple(
+            "black white ivory gray grey charcoal graphite stone cream beige camel "
+            "tan taupe khaki slate heather midnight navy denim indigo".split()
+        ),
+    ),
+    ("blue", ("blue", "sky", "cobalt", "teal", "turquoise", "powder")),
+    ("green", ("green", "olive", "forest", "sage", "emerald", "mint")),
+    ("red", ("red", "burgundy", "rust", "scarlet", "wine", "maroon", "crimson")),
+    ("warm", ("orange", "yellow", "mustard", "gold", "coral", "peach")),
+    ("purple", ("purple", "violet", "lilac", "lavender", "plum")),
+    ("pink", ("pink", "blush", "rose", "fuchsia")),
+    ("brown", ("brown", "espresso", "cognac", "chocolate", "walnut")),
+)
+COLOR_FAMILY_NAMES = tuple(name for name, _ in COLOR_FAMILIES) + ("other",)
+_WORD = re.compile(r"[a-z]+")
+NEVER_WORN_DAYS = 365.0
+
+SCORE_WEIGHTS = {"context_fit": 0.45, "preference": 0.35, "recency": 0.2}
+CLASH_PENALTY = 0.1
+
+
+def color_family(color: Optional[str]) -> str:
+    """Bucket a free-text color into one of COLOR_FAMILY_NAMES."""
+
+    # Whole words only: "tan" must not match "titanium", nor "rose" "primrose".
+    words = set(_WORD.findall((color or "").lower()))
+    for family, keywords in COLOR_FAMILIES:
+        if words.intersection(keywords):
+            return family
+    return "other"
+
+
+@dataclass
+class WardrobeFeatures:
+    """Column-encoded wardrobe: one row per item."""
+
+    item_ids: list[str]
+    warmth: np.ndarray
+    formality: np.ndarray
+    days_since_worn: np.ndarray
+    colors: np.ndarray
+    index: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Stacked ``[warmth, formality, days_since_worn, color one-hot...]`` matrix."""
+
+        return np.column_stack([self.warmth, self.formality, self.days_since_worn, self.colors])
+
+
+@dataclass
+class PreferenceSignals:
+    """Per-item affinity and combo memory distilled from feedback history."""
+
+    item_affinity: dict[str, float] = field(default_factory=dict)
+    loved_combos: set[frozenset[str]] = field(default_factory=set)
+    banned_items: set[str] = field(default_factory=set)
+
+    @property
+    def seen_items(self) -> set[str]:
+        return set(self.item_affinity) | self.banned_items
+
+
+def encode_wardrobe(
+    items: Iterable[WardrobeItem | Mapping[str, Any]], *, today: Optional[date] = None
+) -> WardrobeFeatures:
+    """Encode wardrobe entries as NumPy feature columns."""
+
+    today = today or date.today()
+    parsed = [
+        item if isinstance(item, WardrobeItem) else WardrobeItem.model_validate(item)
+        for item in items
+    ]
+    colors = np.zeros((len(parsed), len(COLOR_FAMILY_NAMES)), dtype=np.float32)
+    days = np.full(len(parsed), NEVER_WORN_DAYS, dtype=np.float32)
+    for row, item in enumerate(parsed):
+        colors[row, COLOR_FAMILY_NAMES.index(color_family(item.color))] = 1.0
+        if item.last_worn_date:
+            try:
+                days[row] = (today - date.fromisoformat(item.last_worn_date[:10])).days
+            except ValueError:
+                pass
+    item_ids = [item.item_id for item in parsed]
+    return WardrobeFeatures(
+        item_ids=item_ids,
+        warmth=np.array(
+            [WARMTH_LEVELS.get(item.warmth_level or "", 1) for item in parsed],
+            dtype=np.float32,
+        ),
+        formality=np.array(
+            [FORMALITY_LEVELS.get(item.formality or "", 1) for item in parsed],
+            dtype=np.float32,
+        ),
+        days_since_worn=days,
+        colors=colors,
+        index={item_id: row for row, item_id in enumerate(item_ids)},
+    )
+
+
+def membership_matrix(
+    outfit_items: Sequence[Sequence[str]], features: WardrobeFeatures
+) -> np.ndarray:
+    """Return an (outfits x items) 0/1 matrix; unknown item_ids are ignored."""
+
+    membership = np.zeros((len(outfit_items), len(features.item_ids)), dtype=np.float32)
+    rows: list[int] = []
+    cols: list[int] = []
+    for row, item_ids in enumerate(outfit_items):
+        for item_id in item_ids:
+            col = features.index.get(str(item_id))
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+    membership[rows, cols] = 1.0
+    return membership
+
+
+def preference_signals_from_history(history: Mapping[str, Any]) -> PreferenceSignals:
+    """Distill `fetch_preference_history` output into item affinities and combos."""
+
+    ratings: dict[str, list[float]] = defaultdict(list)
+    liked_by_outfit: dict[str, set[str]] = defaultdict(set)
+    banned: set[str] = set()
+    for bucket in ("liked_items", "disliked_items"):
+        for row in history.get(bucket) or []:
+            item_id = str(row.get("item_id"))
+            if row.get("rating") is not None:
+                ratings[item_id].append((float(row["rating"]) - 3.0) / 2.0)
+            if row.get("future_intent") == "do_not_recommend":
+                banned.add(item_id)
+            if bucket == "liked_items" and row.get("outfit_id"):
+                liked_by_outfit[str(row["outfit_id"])].add(item_id)
+    return PreferenceSignals(
+        item_affinity={item_id: sum(values) / len(values) for item_id, values in ratings.items()},
+        loved_combos={frozenset(items) for items in liked_by_outfit.values() if len(items) > 1},
+        banned_items=banned,
+    )
+
+
+def preference_signals_from_affinity(affinity: Mapping[str, Any]) -> PreferenceSignals:
+    """Build signals from `fetch_preference_affinity` summary rows."""
+
+    item_affinity = {
+        str(row["item_id"]): (float(row["mean_rating"]) - 3.0) / 2.0
+        for row in affinity.get("items") or []
+        if row.get("mean_rating") is not None
+    }
+    return PreferenceSignals(
+        item_affinity=item_affinity,
+        loved_combos={frozenset(map(str, combo)) for combo in affinity.get("loved_combos") or []},
+        banned_items={str(item_id) for item_id in affinity.get("banned_item_ids") or []},
+    )
+
+
+def score_outfits(
+    outfits: Sequence[Mapping[str, Any]],
+    features: WardrobeFeatures,
+    context: DesignContext,
+    preferences: Optional[PreferenceSignals] = None,
+) -> list[CandidateScore]:
+    """Score every outfit in one batched pass and return CandidateScores in input order.
+
+    ``context_fit`` blends warmth and formality fit with a palette-clash penalty,
+    ``preference_score`` is the mean item affinity mapped onto [0, 1] (0.5 when
+    unknown), and ``recency_penalty`` is the mean freshness deficit of the pieces.
+    """
+
+    preferences = preferences or PreferenceSignals()
+    item_lists = [[str(item) for item in outfit.get("outfit_items") or []] for outfit in outfits]
+    membership = membership_matrix(item_lists, features)
+    counts = np.maximum(membership.sum(axis=1), 1.0)
+
+    warmth_fit = 1.0 - np.abs(features.warmth - context.target_warmth) / 2.0
+    formality_fit = 1.0 - np.abs(features.formality - context.target_formality) / 3.0
+    item_fit = 0.5 * warmth_fit + 0.5 * formality_fit
+    palette = (membership @ features.colors) > 0
+    clashes = np.maximum(palette[:, 1:].sum(axis=1) - 2, 0)
+    context_fit = np.clip(membership @ item_fit / counts - CLASH_PENALTY * clashes, 0.0, 1.0)
+
+    freshness_deficit = np.clip(1.0 - features.days_since_worn / RECENCY_HORIZON_DAYS, 0.0, 1.0)
+    freshness_deficit[features.days_since_worn < RECENT_WEAR_DAYS] = 1.0
+    recency_penalty = membership @ freshness_deficit / counts
+
+    affinity = np.array(
+        [preferences.item_affinity.get(item_id, 0.0) for item_id in features.item_ids],
+        dtype=np.float32,
+    )
+    banned = np.array(
+        [item_id in preferences.banned_items for item_id in features.item_ids],
+        dtype=np.float32,
+    )
+    seen = np.array(
+        [item_id in preferences.seen_items for item_id in features.item_ids],
+        dtype=np.float32,
+    )
+    preference_score = np.clip((membership @ affinity / counts + 1.0) / 2.0, 0.0, 1.0)
+    preference_score[(membership @ banned) > 0] = 0.0
+    is_exploration = (membership @ seen) == 0
+
+    scores = []
+    for row, outfit in enumerate(outfits):
+        scores.append(
+            CandidateScore(
+                outfit_id=str(outfit.get("outfit_id")),
+                summary=str(outfit.get("outfit_name") or outfit.get("outfit_id")),
+                context_fit=round(float(context_fit[row]), 4),
+                preference_score=round(float(preference_score[row]), 4),
+                recency_penalty=round(float(recency_penalty[row]), 4),
+                is_loved_combo=frozenset(item_lists[row]) in preferences.loved_combos,
+                is_exploration=bool(is_exploration[row]),
+            )
+        )
+    return scores
+
+
+def holistic_score(score: CandidateScore) -> float:
+    """Collapse a CandidateScore into the single value used for ordering."""
+
+    return (
+        SCORE_WEIGHTS["context_fit"] * (score.context_fit or 0.0)
+        + SCORE_WEIGHTS["preference"] * (score.preference_score or 0.0)
+        - SCORE_WEIGHTS["recency"] * (score.recency_penalty or 0.0)
+    )
+
+
+def rank_candidates(scores: Sequence[CandidateScore]) -> list[CandidateScore]:
+    """Order scores by holistic value (ties keep designer order)."""
+
+    return sorted(scores, key=holistic_score, reverse=True)
@@ -1,19 +1,19 @@
 """Preference & Ranking agent."""
 
+import asyncio
 from typing import Optional
 
 from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
+from google.adk.agents.callback_context import CallbackContext
 from google.genai import types
 from pydantic import BaseModel, Field
 
-from tools.preference_history_tool import preference_history_tool
-
-retry_config = types.HttpRetryOptions(
-    attempts=5,
-    exp_base=7,
-    initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],
+from agents.models import get_model
+from agents.prompt_tables import store_outfit_table
+from tools.preference_history_tool import (
+    fetch_preference_affinity,
+    preference_affinity_tool,
+    preference_history_tool,
 )
 
 
@@ -50,15 +50,69 @@ class PreferenceRankingOutput(BaseModel):
 
 
 INSTRUCTION = """You are the FreshFit Preference & Ranking agent.
-outfit_designer input is: {outfits}
-
-- Analyze the candidate outfits and their scoring signals.
-- When preference history is missing or stale, call `preference_history_tool` with the user_id to pull outfits/items the user rated 4-5 (liked) and 1 (disliked). Use this data to honor loved combos and avoid banned pieces.
+outfit_designer slate (`items` lists item_id:short_name pairs):
+{outfit_table}
+Precomputed CandidateScores (ordered by holistic score):
+{candidate_scores?}
+
+- Analyze the candidate outfits and their scoring signals. When precomputed CandidateScores are present, treat their `context_fit`, `preference_score`, `recency_penalty`, `is_loved_combo`, and `is_exploration` values as authoritative instead of estimating them yourself.
+- When preference signals are missing or stale, call `preference_affinity_tool` with the user_id (and the slate's item_ids) for precomputed per-item/per-combo affinity: mean ratings, loved combos, and do_not_recommend pieces. Use this data to honor loved combos and avoid banned pieces.
+- Only call `preference_history_tool` when you need the raw feedback notes behind a rating.
 - Enforce guardrails: include one previously loved combo when available and one exploration outfit provided from outfit_designer.
 - Return outfits sorted by holistic score, and include a brief decision trace describing weighting.
 Output JSON that matches PreferenceRankingOutput exactly."""
 
 
+async def _precompute_candidate_scores(
+    callback_context: CallbackContext,
+) -> Optional[types.Content]:
+    """Fill CandidateScore fields numerically before the model reads the slate."""
+
+    # Imported lazily: the scorer depends on CandidateScore defined in this module.
+    from agents.outfit_engine import design_context_from_state
+    from agents.outfit_scoring import (
+        encode_wardrobe,
+        preference_signals_from_affinity,
+        rank_candidates,
+        score_outfits,
+    )
+    from agents.prompt_tables import candidate_score_table
+    from agents.state_payloads import outfits_from_state, wardrobe_items_from_state
+
+    state = callback_context.state
+    outfits = outfits_from_state(state)
+    items = wardrobe_items_from_state(state)
+    if not outfits or not items:
+        state["candidate_scores"] = ""
+        return None
+
+    slate_item_ids = {
+        str(item_id) for outfit in outfits for item_id in outfit.get("outfit_items") or []
+    }
+    try:
+        # Off the event loop so the parallel explanation branch keeps running.
+        affinity = await asyncio.to_thread(
+            fetch_preference_affinity, callback_context.user_id, sorted(slate_item_ids)
+        )
+    except FileNotFoundError:
+        affinity = {}
+    context = design_context_from_state(
+        state,
+        user_id=callback_context.user_id,
+        user_content=callback_context.user_content,
+    )
+    scores = rank_candidates(
+        score_outfits(
+            outfits,
+            encode_wardrobe(items, today=context.today),
+            context,
+            preference_signals_from_affinity(affinity),
+        )
+    )
+    state["candidate_scores"] = candidate_score_table([score.model_dump() for score in scores])
+    return None
+
+
 def preference_ranking_agent() -> Agent:
     """Construct the Preference & Ranking agent."""
 
@@ -66,8 +120,10 @@ def preference_ranking_agent() -> Agent:
         name="preference_ranking",
         description="Ranks outfit candidates with guardrails for exploration and beloved looks.",
         instruction=INSTRUCTION,
-        model=Gemini(model="gemini-2.5-flash", retry_options=retry_config),
+        model=get_model("preference_ranking"),
         input_schema=PreferenceRankingInput,
         output_schema=PreferenceRankingOutput,
-        tools=[preference_history_tool],
+        output_key="ranking",
+        tools=[preference_affinity_tool, preference_history_tool],
+        before_agent_callback=[store_outfit_table, _precompute_candidate_scores],
     )
@@ -0,0 +1,271 @@
+"""Compact tabular encodings of wardrobe and outfit payloads for agent prompts.
+
+ADK injects ``{state_key}`` placeholders with ``str(value)``, so the cataloger
+and designer outputs used to reach the designer, ranking, and explanation prompts
+as full dict reprs: every row repeats every key, ``clean_item_ids`` repeats the
+ids, and ``outfit_item_details`` repeats ``outfit_items``. The encoders here emit
+one header plus one pipe-separated row per entry, with single-letter codes for
+the enum columns and rows grouped by category, and the callbacks store them under
+``wardrobe_table`` / ``outfit_table`` for the instructions to reference.
+
+``FRESHFIT_PROMPT_ENCODING=json`` stores plain JSON under the same keys instead.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from datetime import date
+from typing import Any, Literal, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from agents.state_payloads import load_payload, outfits_from_state, wardrobe_items_from_state
+
+PromptEncoding = Literal["compact", "json"]
+DEFAULT_ENCODING: PromptEncoding = os.getenv(  # type: ignore[assignment]
+    "FRESHFIT_PROMPT_ENCODING", "compact"
+)
+
+WARMTH_CODES = {"light": "L", "medium": "M", "heavy": "H"}
+FORMALITY_CODES = {"casual": "C", "smart_casual": "S", "business": "B", "formal": "F"}
+BODY_ZONE_CODES = {"upper": "U", "lower": "L", "full_body": "F", "shoe": "S", "accessory": "A"}
+CATEGORY_ORDER = ("top", "bottom", "dress", "outerwear", "shoes", "accessory")
+
+MISSING = "-"
+
+WARDROBE_HEADER = "id|name|color|warmth|formality|zone|worn"
+WARDROBE_LEGEND = (
+    "codes: warmth L=light M=medium H=heavy; formality C=casual S=smart_casual "
+    "B=business F=formal; zone U=upper L=lower F=full_body S=shoe A=accessory; "
+    f"worn=days since last worn ({MISSING}=never)"
+)
+OUTFIT_HEADER = "id|rank|name|items|description"
+OUTFIT_LEGEND = 'items: item_id:short_name pairs separated by ";"'
+SCORE_HEADER = "id|context_fit|preference|recency_penalty|flags|summary"
+SCORE_LEGEND = f"flags: L=loved combo, E=exploration ({MISSING}=neither)"
+
+
+def _cell(value: Any) -> str:
+    """One table cell: pipes and newlines would break the row, so flatten them."""
+
+    if value is None or value == "":
+        return MISSING
+    text = str(value)
+    return " ".join(text.replace("|", "/").split())
+
+
+def _code(codes: Mapping[str, str], value: Optional[str]) -> str:
+    if not value:
+        return MISSING
+    return codes.get(str(value).lower(), _cell(value))
+
+
+def _days_since(value: Optional[str], today: date) -> str:
+    if not value:
+        return MISSING
+    try:
+        return str((today - date.fromisoformat(str(value)[:10])).days)
+    except ValueError:
+        return _cell(value)
+
+
+def _score(value: Optional[float]) -> str:
+    return MISSING if value is None else f"{value:.2f}"
+
+
+def encode_wardrobe_table(
+    items: Iterable[Mapping[str, Any]],
+    *,
+    today: Optional[date] = None,
+    summary: Optional[str] = None,
+    missing_categories: Sequence[str] = (),
+    notes: Optional[str] = None,
+) -> str:
+    """Render wardrobe entries as category sections of coded rows."""
+
+    today = today or date.today()
+    sections: dict[str, list[str]] = defaultdict(list)
+    count = 0
+    for item in items:
+        count += 1
+        sections[str(item.get("category") or "other").lower()].append(
+            "|".join(
+                (
+                    _cell(item.get("item_id")),
+                    _cell(item.get("name")),
+                    _cell(item.get("color")),
+                    _code(WARMTH_CODES, item.get("warmth_level")),
+                    _code(FORMALITY_CODES, item.get("formality")),
+                    _code(BODY_ZONE_CODES, item.get("body_zone")),
+                    _days_since(item.get("last_worn_date"), today),
+                )
+            )
+        )
+
+    lines = [f"{count} items, columns {WARDROBE_HEADER}", WARDROBE_LEGEND]
+    ordered = [c for c in CATEGORY_ORDER if c in sections]
+    ordered += sorted(c for c in sections if c not in CATEGORY_ORDER)
+    for category in ordered:
+        lines.append(f"[{category}]")
+        lines.extend(sections[category])
+    if summary:
+        lines.append(f"summary: {_cell(summary)}")
+    if missing_categories:
+        lines.append(f"missing: {', '.join(missing_categories)}")
+    if notes:
+        lines.append(f"notes: {_cell(notes)}")
+    return "\n".join(lines)
+
+
+def encode_outfit_table(outfits: Iterable[Mapping[str, Any]]) -> str:
+    """Render an outfit slate; ``items`` folds outfit_items and their short names."""
+
+    rows = []
+    for outfit in outfits:
+        short_names = {
+            detail.get("item_id"): detail.get("short_name")
+            for detail in outfit.get("outfit_item_details") or []
+            if isinstance(detail, Mapping)
+        }
+        items = ";".join(
+            (
+                f"{_cell(item_id)}:{_cell(short_names.get(item_id))}"
+                if short_names.get(item_id)
+                else _cell(item_id)
+            )
+            for item_id in outfit.get("outfit_items") or []
+        )
+        rows.append(
+            "|".join(
+                (
+                    _cell(outfit.get("outfit_id")),
+                    _cell(outfit.get("rank")),
+                    _cell(outfit.get("outfit_name")),
+                    items or MISSING,
+                    _cell(outfit.get("outfit_description")),
+                )
+            )
+        )
+    return "\n".join([f"{len(rows)} outfits, columns {OUTFIT_HEADER}", OUTFIT_LEGEND, *rows])
+
+
+_OUTFIT_TABLE_START = re.compile(
+    rf"^(\d+) outfits, columns {re.escape(OUTFIT_HEADER)}$", re.MULTILINE
+)
+
+
+def decode_outfit_table(text: str) -> Optional[list[dict[str, Any]]]:
+    """Parse the first `encode_outfit_table` block found in ``text`` (e.g. a prompt).
+
+    Returns outfit dicts with ``outfit_items``/``outfit_item_details`` restored,
+    or ``None`` when ``text`` holds no outfit table. Flattened cells stay flat.
+    """
+
+    match = _OUTFIT_TABLE_START.search(text)
+    if match is None:
+        return None
+    lines = text[match.end() :].splitlines()[2 : 2 + int(match.group(1))]
+    outfits = []
+    for line in lines:
+        cells = line.split("|", 4)
+        if len(cells) != 5:
+            break
+        outfit_id, rank, name, items, description = (
+            None if cell == MISSING else cell for cell in cells
+        )
+        pairs = [entry.partition(":") for entry in (items or "").split(";") if entry]
+        outfits.append(
+            {
+                "outfit_id": outfit_id,
+                "rank": int(rank) if rank and rank.isdigit() else len(outfits) + 1,
+                "outfit_name": name or "",
+                "outfit_description": description or "",
+                "outfit_items": [item_id for item_id, _, _ in pairs],
+                "outfit_item_details": [
+                    {"item_id": item_id, "short_name": short_name or item_id}
+                    for item_id, _, short_name in pairs
+                ],
+            }
+        )
+    return outfits
+
+
+def encode_candidate_scores(scores: Iterable[Mapping[str, Any]]) -> str:
+    """Render precomputed CandidateScores, best first."""
+
+    rows = []
+    for score in scores:
+        flags = ("L" if score.get("is_loved_combo") else "") + (
+            "E" if score.get("is_exploration") else ""
+        )
+        rows.append(
+            "|".join(
+                (
+                    _cell(score.get("outfit_id")),
+                    _score(score.get("context_fit")),
+                    _score(score.get("preference_score")),
+                    _score(score.get("recency_penalty")),
+                    flags or MISSING,
+                    _cell(score.get("summary")),
+                )
+            )
+        )
+    return "\n".join([f"{len(rows)} scores, columns {SCORE_HEADER}", SCORE_LEGEND, *rows])
+
+
+def wardrobe_table_from_state(
+    state: Mapping[str, Any],
+    *,
+    encoding: Optional[PromptEncoding] = None,
+    today: Optional[date] = None,
+) -> str:
+    """Encode the cataloger payload stored under ``state["wardrobe_items"]``."""
+
+    payload = load_payload(state.get("wardrobe_items"))
+    if (encoding or DEFAULT_ENCODING) == "json":
+        return json.dumps(payload, separators=(",", ":"))
+    extras = payload if isinstance(payload, dict) else {}
+    return encode_wardrobe_table(
+        wardrobe_items_from_state(state),
+        today=today,
+        summary=extras.get("wardrobe_summary"),
+        missing_categories=extras.get("missing_categories") or (),
+        notes=extras.get("notes"),
+    )
+
+
+def outfit_table(
+    outfits: Sequence[Mapping[str, Any]], *, encoding: Optional[PromptEncoding] = None
+) -> str:
+    if (encoding or DEFAULT_ENCODING) == "json":
+        return json.dumps(list(outfits), separators=(",", ":"))
+    return encode_outfit_table(outfits)
+
+
+def candidate_score_table(
+    scores: Sequence[Mapping[str, Any]], *, encoding: Optional[PromptEncoding] = None
+) -> str:
+    if (encoding or DEFAULT_ENCODING) == "json":
+        return json.dumps(list(scores), separators=(",", ":"))
+    return encode_candidate_scores(scores)
+
+
+def store_wardrobe_table(callback_context: CallbackContext) -> Optional[types.Content]:
+    """Before-agent callback: encode the cataloger output as ``wardrobe_table``."""
+
+    callback_context.state["wardrobe_table"] = wardrobe_table_from_state(callback_context.state)
+    return None
+
+
+def store_outfit_table(callback_context: CallbackContext) -> Optional[types.Content]:
+    """Before-agent callback: encode the designer's slate as ``outfit_table``."""
+
+    callback_context.state["outfit_table"] = outfit_table(
+        outfits_from_state(callback_context.state)
+    )
+    return None
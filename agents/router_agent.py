@@ -1,25 +1,29 @@
-from typing import List
+from typing import Optional
 
 from google.adk.agents import Agent, ParallelAgent, SequentialAgent
-from google.adk.models.google_llm import Gemini
-from google.genai import types
 
-from agents.cloth_registrar import cloth_registrar_agent
+from agents.cloth_registrar import (
+    REGISTRAR_DESCRIPTION,
+    REGISTRAR_NAME,
+    cloth_registrar_agent,
+)
 from agents.explanation_agent import explanation_agent
+from agents.intent_router import (
+    DEFAULT_MODE,
+    RouterMode,
+    fast_route_callback,
+    log_model_route_callback,
+)
+from agents.lazy_agent import LazyAgent
+from agents.models import get_model
 from agents.outfit_designer import outfit_designer_agent
 from agents.preference_ranking import preference_ranking_agent
+from agents.slate_join import slate_join_agent
 from agents.wardrobe_cataloger import wardrobe_cataloger_agent
 from agents.weather_agent import weather_agent
 
 APP_NAME = "FreshFit"
 
-retry_config = types.HttpRetryOptions(
-    attempts=5,
-    exp_base=7,
-    initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],
-)
-
 
 class OutfitFlowAgent(SequentialAgent):
     """Sequential agent for outfit recommendations."""
@@ -29,8 +33,18 @@ class FreshFitRouter(Agent):
     """Root router for FreshFit."""
 
 
-def create_freshfit_router() -> Agent:
-    """Constructs the main FreshFit router agent with all sub-agents."""
+def create_freshfit_router(*, mode: Optional[RouterMode] = None) -> Agent:
+    """Constructs the main FreshFit router agent with all sub-agents.
+
+    Args:
+        mode: ``fast`` (default) lets the local intent classifier dispatch
+            confident turns without calling the router model, ``llm`` always asks
+            Gemini.
+    """
+
+    resolved_mode = mode or DEFAULT_MODE
+    if resolved_mode not in ("fast", "llm"):
+        raise ValueError(f"Unknown router mode: {resolved_mode!r}")
 
     # Instantiate leaf agents
     weather = weather_agent()
@@ -38,7 +52,13 @@ def create_freshfit_router() -> Agent:
     outfit = outfit_designer_agent()
     ranking = preference_ranking_agent()
     explanation = explanation_agent()
-    registrar = cloth_registrar_agent()
+    join = slate_join_agent()
+    # The registrar branch is only needed for inventory turns; build it on first use.
+    registrar = LazyAgent(
+        name=REGISTRAR_NAME,
+        description=REGISTRAR_DESCRIPTION,
+        factory=cloth_registrar_agent,
+    )
 
     # Parallel branch: fetch context
     parallel_agent = ParallelAgent(
@@ -47,14 +67,23 @@ def create_freshfit_router() -> Agent:
         sub_agents=[weather, wardrobe],
     )
 
-    # Sequential branch: generate and explain
+    # Ranking and explanation both read only the designer's slate, so they run
+    # side by side; the join merges them by outfit_id without a model call.
+    rank_and_explain = ParallelAgent(
+        name="RankAndExplain",
+        description="Runs preference ranking and the explanation agent in parallel.",
+        sub_agents=[ranking, explanation],
+    )
+
+    # Sequential branch: generate, then rank and explain, then join
     sequential_agent = SequentialAgent(
         name="SequentialAgents",
         description=(
-            "A sequential agent that combines the outputs of the outfit designer and "
-            "explanation agent. Feedback is handled interactively via the CLI."
+            "A sequential agent that runs the outfit designer, then ranking and "
+            "explanations in parallel, then merges them. Feedback is handled "
+            "interactively via the CLI."
         ),
-        sub_agents=[outfit, ranking, explanation],
+        sub_agents=[outfit, rank_and_explain, join],
     )
 
     # Outfit Flow: combines parallel and sequential
@@ -64,6 +93,8 @@ def create_freshfit_router() -> Agent:
         sub_agents=[parallel_agent, sequential_agent],
     )
 
+    routes = {"outfit": outfit_flow.name, "registrar": registrar.name}
+
     # Root Router
     root_agent = FreshFitRouter(
         name=APP_NAME,
@@ -73,12 +104,14 @@ def create_freshfit_router() -> Agent:
             "wardrobe and outfit needs.\n"
             "If the user wants outfit recommendations, to dress for the weather, or "
             "general styling advice, route them to `OutfitFlow`.\n"
-            "If the user wants to add clothes, delete items, or manage their wardrobe "
-            "inventory, route them to `cloth_registrar`.\n"
+            "If the user wants to add clothes, delete items, log what they wore, or "
+            "manage their wardrobe inventory, route them to `cloth_registrar`.\n"
             "If the request is unclear, ask for clarification."
         ),
-        model=Gemini(model="gemini-2.5-flash", retry_options=retry_config),
+        model=get_model(APP_NAME),
         sub_agents=[outfit_flow, registrar],
+        before_model_callback=(fast_route_callback(routes) if resolved_mode == "fast" else None),
+        after_model_callback=log_model_route_callback(routes),
     )
 
     return root_agent
@@ -0,0 +1,134 @@
+"""Deterministic join of the ranking and explanation branches.
+
+`preference_ranking` and `explanation_agent` both read only the designer's slate,
+so OutfitFlow runs them side by side once the designer finishes. This agent then
+merges their outputs by ``outfit_id`` into ``state["ranked_slate"]``: outfits in
+the ranking's order (unranked ones keep the designer's order at the end), each
+with the rationale written for it. It makes no model call.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator, Mapping, Sequence
+from typing import Any, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from pydantic import BaseModel, Field
+
+from agents.state_payloads import load_payload, outfits_from_state
+
+
+class RankedOutfit(BaseModel):
+    """One outfit of the merged slate."""
+
+    outfit_id: str
+    rank: int
+    outfit_name: Optional[str] = None
+    outfit_items: list[str] = Field(default_factory=list)
+    explanation: Optional[str] = None
+
+
+class RankedSlate(BaseModel):
+    """Designer slate ordered by ranking, with explanations attached."""
+
+    outfits: list[RankedOutfit] = Field(default_factory=list)
+    decision_trace: Optional[str] = None
+    selection_prompt: Optional[str] = None
+
+
+def _payload_dict(value: Any) -> dict[str, Any]:
+    payload = load_payload(value)
+    return payload if isinstance(payload, dict) else {}
+
+
+def explanations_by_outfit(
+    outfits: Sequence[Mapping[str, Any]], explanations: Sequence[Any]
+) -> dict[str, str]:
+    """Key rationales by ``outfit_id``.
+
+    The explanation agent writes one rationale per row of ``outfit_table``, in
+    table order; a rationale that names exactly one slate ``outfit_id`` is
+    attached to that outfit instead, so a skipped or reordered row doesn't shift
+    every explanation after it.
+    """
+
+    outfit_ids = [str(outfit.get("outfit_id")) for outfit in outfits if outfit.get("outfit_id")]
+    merged: dict[str, str] = {}
+    positional: list[str] = []
+    for text in explanations:
+        if not isinstance(text, str) or not text.strip():
+            continue
+        named = [outfit_id for outfit_id in outfit_ids if outfit_id in text]
+        if len(named) == 1 and named[0] not in merged:
+            merged[named[0]] = text
+        else:
+            positional.append(text)
+    remaining = iter(positional)
+    for outfit_id in outfit_ids:
+        if outfit_id not in merged:
+            text = next(remaining, None)
+            if text is None:
+                break
+            merged[outfit_id] = text
+    return merged
+
+
+def join_slate(
+    outfits: Sequence[Mapping[str, Any]],
+    ranking: Mapping[str, Any],
+    explanation: Mapping[str, Any],
+) -> RankedSlate:
+    """Merge the designer slate, PreferenceRankingOutput and ExplanationAgentOutput."""
+
+    by_id = {str(outfit["outfit_id"]): outfit for outfit in outfits if outfit.get("outfit_id")}
+    order: list[str] = []
+    for outfit_id in ranking.get("ranked_outfits") or []:
+        outfit_id = str(outfit_id)
+        if outfit_id in by_id and outfit_id not in order:
+            order.append(outfit_id)
+    order += [outfit_id for outfit_id in by_id if outfit_id not in order]
+
+    rationales = explanations_by_outfit(list(by_id.values()), explanation.get("explanations") or [])
+    return RankedSlate(
+        outfits=[
+            RankedOutfit(
+                outfit_id=outfit_id,
+                rank=rank,
+                outfit_name=by_id[outfit_id].get("outfit_name"),
+                outfit_items=[str(item) for item in by_id[outfit_id].get("outfit_items") or []],
+                explanation=rationales.get(outfit_id),
+            )
+            for rank, outfit_id in enumerate(order, start=1)
+        ],
+        decision_trace=ranking.get("decision_trace"),
+        selection_prompt=explanation.get("selection_prompt"),
+    )
+
+
+class SlateJoinAgent(BaseAgent):
+    """Writes the merged RankedSlate under ``ranked_slate``; no model call."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        slate = join_slate(
+            outfits_from_state(state),
+            _payload_dict(state.get("ranking")),
+            _payload_dict(state.get("explanations")),
+        )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={"ranked_slate": slate.model_dump()}),
+        )
+
+
+def slate_join_agent() -> SlateJoinAgent:
+    """Construct the slate join step."""
+
+    return SlateJoinAgent(
+        name="slate_join",
+        description="Merges ranking and explanations by outfit_id.",
+    )
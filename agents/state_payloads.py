@@ -0,0 +1,67 @@
+"""Helpers for reading upstream agent payloads out of ADK session state."""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Mapping
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+
+def load_payload(value: Any) -> Any:
+    """Decode a state value that may be a dict, a pydantic model, or (fenced) JSON text."""
+
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (dict, list)):
+        return value
+    if isinstance(value, str):
+        text = _CODE_FENCE.sub("", value.strip())
+        if not text:
+            return None
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return None
+    return None
+
+
+def wardrobe_items_from_state(state: Mapping[str, Any]) -> list[dict[str, Any]]:
+    """Return the cataloger's wardrobe entries (``state["wardrobe_items"]``)."""
+
+    payload = load_payload(state.get("wardrobe_items"))
+    if isinstance(payload, dict):
+        payload = payload.get("wardrobe_items")
+    if not isinstance(payload, list):
+        return []
+    return [item for item in payload if isinstance(item, dict) and item.get("item_id")]
+
+
+def weather_from_state(state: Mapping[str, Any]) -> dict[str, Any]:
+    """Return the weather agent's normalized bundle (``state["weather"]``)."""
+
+    payload = load_payload(state.get("weather"))
+    return payload if isinstance(payload, dict) else {}
+
+
+def outfits_from_state(state: Mapping[str, Any]) -> list[dict[str, Any]]:
+    """Return the designer's outfit slate (``state["outfits"]``)."""
+
+    payload = load_payload(state.get("outfits"))
+    if isinstance(payload, dict):
+        payload = payload.get("outfits")
+    if not isinstance(payload, list):
+        return []
+    return [entry for entry in payload if isinstance(entry, dict)]
+
+
+def content_text(content: Any) -> Optional[str]:
+    """Join the text parts of a ``types.Content`` (e.g., the user's message)."""
+
+    parts = getattr(content, "parts", None) or []
+    texts = [part.text for part in parts if getattr(part, "text", None)]
+    return "\n".join(texts) if texts else None
@@ -0,0 +1,495 @@
+"""Span tracing for agent runs, model calls, tool calls and SQLite work.
+
+`TracingPlugin` is an ADK plugin, so registering it on a runner records a span
+for every agent in the router tree, every model call (token counts, retries and
+time to first streamed chunk) and every FunctionTool call. It also observes the
+SQLite pools (`tools.db_pool.add_query_observer`), so the queries a tool runs
+show up as child spans of that tool. Parents come from a context variable, which
+asyncio copies into ParallelAgent branches and worker threads.
+
+`Tracer.export` writes spans as JSONL, or as a Chrome trace (open it in
+``chrome://tracing`` or Perfetto) when the path ends in ``.json``; `waterfall`
+renders one turn as text for ``main.py --profile``.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import itertools
+import json
+import logging
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from tools.db_pool import QueryTrace, add_query_observer, remove_query_observer
+
+# google-genai logs each tenacity retry here ("Retrying ... in N seconds").
+RETRY_LOGGER = "google_genai._api_client"
+WATERFALL_WIDTH = 40
+_USAGE_FIELDS = {
+    "prompt_token_count": "input_tokens",
+    "candidates_token_count": "output_tokens",
+    "cached_content_token_count": "cached_tokens",
+    "thoughts_token_count": "thinking_tokens",
+}
+
+
+@dataclass
+class Span:
+    """A timed unit of work; ``start``/``end`` are ``time.perf_counter`` values."""
+
+    span_id: int
+    kind: str
+    name: str
+    start: float
+    parent_id: Optional[int] = None
+    invocation_id: Optional[str] = None
+    branch: Optional[str] = None
+    end: Optional[float] = None
+    attrs: dict[str, Any] = field(default_factory=dict)
+    parent: Optional[Span] = field(default=None, repr=False, compare=False)
+
+    @property
+    def duration_s(self) -> Optional[float]:
+        return None if self.end is None else self.end - self.start
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "freshfit_current_span", default=None
+)
+
+
+class _RetryCounter(logging.Handler):
+    """Counts google-genai retries against the model span that is waiting on them."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        span = _current_span.get()
+        if span is not None and span.kind == "model" and record.getMessage().startswith("Retrying"):
+            span.attrs["retries"] = span.attrs.get("retries", 0) + 1
+
+
+def _descends(span: Span, ancestor: Span) -> bool:
+    parent = span.parent
+    while parent is not None:
+        if parent is ancestor:
+            return True
+        parent = parent.parent
+    return False
+
+
+class Tracer:
+    """Thread-safe span store.
+
+    `start` makes the new span current for the calling task (and for tasks or
+    threads it spawns afterwards); `finish` restores its parent.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._spans: list[Span] = []
+        self.origin = time.perf_counter()
+        self.origin_unix = time.time()
+
+    def start(
+        self,
+        kind: str,
+        name: str,
+        *,
+        invocation_id: Optional[str] = None,
+        branch: Optional[str] = None,
+        **attrs: Any,
+    ) -> Span:
+        parent = _current_span.get()
+        # A span closed from another task (or never reset) can still be current here.
+        while parent is not None and parent.end is not None:
+            parent = parent.parent
+        span = Span(
+            span_id=next(self._ids),
+            kind=kind,
+            name=name,
+            start=time.perf_counter(),
+            parent_id=parent.span_id if parent else None,
+            invocation_id=invocation_id or (parent.invocation_id if parent else None),
+            branch=branch or (parent.branch if parent else None),
+            attrs=attrs,
+            parent=parent,
+        )
+        with self._lock:
+            self._spans.append(span)
+        _current_span.set(span)
+        return span
+
+    def finish(self, span: Span, *, end: Optional[float] = None, **attrs: Any) -> None:
+        if span.end is None:
+            span.end = end if end is not None else time.perf_counter()
+        span.attrs.update(attrs)
+        if _current_span.get() is span:
+            _current_span.set(span.parent)
+
+    def record(self, kind: str, name: str, start: float, end: float, **attrs: Any) -> Span:
+        """Add an already finished child of the current span."""
+
+        parent = _current_span.get()
+        span = Span(
+            span_id=next(self._ids),
+            kind=kind,
+            name=name,
+            start=start,
+            end=end,
+            parent_id=parent.span_id if parent else None,
+            invocation_id=parent.invocation_id if parent else None,
+            branch=parent.branch if parent else None,
+            attrs=attrs,
+            parent=parent,
+        )
+        with self._lock:
+            self._spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, kind: str, name: str, **attrs: Any) -> Iterator[Span]:
+        span = self.start(kind, name, **attrs)
+        try:
+            yield span
+        finally:
+            self.finish(span)
+
+    def spans(self) -> list[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def subtree(self, root: Span) -> list[Span]:
+        """``root`` and its descendants, in start order."""
+
+        ids = {root.span_id}
+        tree = [root]
+        for span in sorted(self.spans(), key=lambda s: (s.start, s.span_id)):
+            if span.parent_id in ids:
+                ids.add(span.span_id)
+                tree.append(span)
+        return tree
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def to_dict(self, span: Span) -> dict[str, Any]:
+        return {
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "kind": span.kind,
+            "name": span.name,
+            "invocation_id": span.invocation_id,
+            "branch": span.branch,
+            "start_unix": round(self.origin_unix + span.start - self.origin, 6),
+            "start_ms": round((span.start - self.origin) * 1000, 3),
+            "duration_ms": None if span.duration_s is None else round(span.duration_s * 1000, 3),
+            "attrs": span.attrs,
+        }
+
+    def chrome_trace(self, spans: Iterable[Span]) -> dict[str, Any]:
+        """Chrome trace-event JSON: one track per (invocation, branch)."""
+
+        tracks: dict[tuple[Optional[str], Optional[str]], int] = {}
+        events = []
+        now = time.perf_counter()
+        for span in spans:
+            track = tracks.setdefault((span.invocation_id, span.branch), len(tracks) + 1)
+            end = span.end if span.end is not None else now
+            args = dict(span.attrs)
+            if span.end is None:
+                args["unfinished"] = True
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.kind,
+                    "ph": "X",
+                    "ts": round((span.start - self.origin) * 1e6),
+                    "dur": round((end - span.start) * 1e6),
+                    "pid": 1,
+                    "tid": track,
+                    "args": args,
+                }
+            )
+        events += [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 1,
+                "tid": track,
+                "args": {"name": branch or invocation_id or "untracked"},
+            }
+            for (invocation_id, branch), track in tracks.items()
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: Path | str, spans: Optional[Iterable[Span]] = None) -> None:
+        """Write ``spans`` (default: all) as JSONL, or a Chrome trace for ``*.json``."""
+
+        path = Path(path)
+        spans = self.spans() if spans is None else list(spans)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".json":
+            path.write_text(json.dumps(self.chrome_trace(spans), default=str), encoding="utf-8")
+            return
+        with path.open("w", encoding="utf-8") as handle:
+            for span in spans:
+                handle.write(json.dumps(self.to_dict(span), default=str) + "\n")
+
+
+def _span_note(span: Span) -> str:
+    attrs = span.attrs
+    notes = []
+    if span.kind == "model":
+        if "input_tokens" in attrs or "output_tokens" in attrs:
+            notes.append(f"in={attrs.get('input_tokens', 0)} out={attrs.get('output_tokens', 0)}")
+        if attrs.get("retries"):
+            notes.append(f"retries={attrs['retries']}")
+        if attrs.get("first_chunk_ms") is not None:
+            notes.append(f"first_chunk={attrs['first_chunk_ms']:.0f}ms")
+    elif span.kind == "sql":
+        notes.append(f"{attrs.get('statements', 0)} stmt")
+        if attrs.get("acquire_ms", 0) >= 1:
+            notes.append(f"acquire={attrs['acquire_ms']:.0f}ms")
+    if attrs.get("error"):
+        notes.append(f"error={attrs['error']}")
+    if span.end is None:
+        notes.append("unfinished")
+    return " ".join(notes)
+
+
+def waterfall(spans: list[Span], *, width: int = WATERFALL_WIDTH) -> str:
+    """Text waterfall of one span tree (the first span is the root)."""
+
+    if not spans:
+        return ""
+    root = spans[0]
+    now = time.perf_counter()
+    total = max((span.end or now) for span in spans) - root.start or 1e-9
+    children: dict[Optional[int], list[Span]] = {}
+    for span in spans[1:]:
+        children.setdefault(span.parent_id, []).append(span)
+
+    lines = [f"{'span':<44}{'start ms':>10}{'dur ms':>10}  timeline"]
+
+    def walk(span: Span, depth: int) -> None:
+        end = span.end or now
+        offset = span.start - root.start
+        first = min(width - 1, int(offset / total * width))
+        last = max(first + 1, min(width, round((end - root.start) / total * width)))
+        bar = " " * first + "#" * (last - first) + " " * (width - last)
+        label = f"{'  ' * depth}{span.name} ({span.kind})"
+        lines.append(
+            f"{label[:44]:<44}{offset * 1000:>10.1f}{(end - span.start) * 1000:>10.1f}"
+            f"  |{bar}| {_span_note(span)}".rstrip()
+        )
+        for child in sorted(children.get(span.span_id, []), key=lambda s: s.start):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return "\n".join(lines)
+
+
+class TracingPlugin(BasePlugin):
+    """Record agent, model, tool and SQLite spans into a `Tracer`.
+
+    Register it after the model cache plugin: a cache hit short-circuits the
+    callbacks of later plugins, so only real model calls get a model span.
+    """
+
+    def __init__(self, tracer: Optional[Tracer] = None, *, name: str = "freshfit_tracing") -> None:
+        super().__init__(name=name)
+        self.tracer = tracer or Tracer()
+        self._lock = threading.Lock()
+        self._open: dict[tuple[str, ...], Span] = {}
+        self._retry_counter: Optional[_RetryCounter] = None
+        self._retry_level: Optional[int] = None
+        self.install()
+
+    def install(self) -> None:
+        """Start observing SQLite checkouts and google-genai retries."""
+
+        add_query_observer(self._on_query)
+        if self._retry_counter is None:
+            retry_logger = logging.getLogger(RETRY_LOGGER)
+            self._retry_counter = _RetryCounter()
+            retry_logger.addHandler(self._retry_counter)
+            if not retry_logger.isEnabledFor(logging.INFO):
+                self._retry_level = retry_logger.level
+                retry_logger.setLevel(logging.INFO)
+
+    async def close(self) -> None:
+        remove_query_observer(self._on_query)
+        if self._retry_counter is not None:
+            retry_logger = logging.getLogger(RETRY_LOGGER)
+            retry_logger.removeHandler(self._retry_counter)
+            if self._retry_level is not None:
+                retry_logger.setLevel(self._retry_level)
+            self._retry_counter = None
+            self._retry_level = None
+
+    def _on_query(self, query: QueryTrace) -> None:
+        self.tracer.record(
+            "sql",
+            query.db_path.name,
+            query.started,
+            query.ended,
+            statements=query.statement_count,
+            sql=list(query.statements[:3]),
+            acquire_ms=round(query.acquire_s * 1000, 3),
+        )
+
+    def _open_span(self, key: tuple[str, ...], kind: str, name: str, **kwargs: Any) -> None:
+        span = self.tracer.start(kind, name, **kwargs)
+        with self._lock:
+            self._open[key] = span
+
+    def _close_span(self, key: tuple[str, ...], **attrs: Any) -> Optional[Span]:
+        with self._lock:
+            span = self._open.pop(key, None)
+        if span is None:
+            return None
+        self.tracer.finish(span, **attrs)
+        # Spans skipped by a short-circuiting callback never see an after callback;
+        # they end with their closest finished ancestor.
+        with self._lock:
+            orphans = [key for key, open_span in self._open.items() if _descends(open_span, span)]
+            spans = [self._open.pop(key) for key in orphans]
+        for orphan in spans:
+            self.tracer.finish(orphan, end=span.end, closed_at="parent_end")
+        return span
+
+    def _close_invocation(self, invocation_id: str, **attrs: Any) -> None:
+        with self._lock:
+            keys = [key for key in self._open if key[1] == invocation_id]
+        for key in keys:
+            self._close_span(key, **attrs)
+
+    @staticmethod
+    def _key(kind: str, context: CallbackContext, name: str) -> tuple[str, ...]:
+        return (kind, context.invocation_id, context.branch or "", name)
+
+    async def on_event_callback(
+        self, *, invocation_context: InvocationContext, event: Event
+    ) -> None:
+        # An agent's own before_model callback (e.g. the router fast path) can answer
+        # instead of the model; no after_model callback follows, so close it here.
+        if not event.partial and event.author:
+            self._close_span(
+                ("model", event.invocation_id, event.branch or "", event.author),
+                answered_by="callback",
+            )
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        # Agents left by a transfer or an early exit get no after_agent callback.
+        self._close_invocation(invocation_context.invocation_id, closed_at="run_end")
+
+    async def on_run_error_callback(
+        self, *, invocation_context: InvocationContext, error: Exception
+    ) -> None:
+        self._close_invocation(invocation_context.invocation_id, error=type(error).__name__)
+
+    async def before_agent_callback(
+        self, *, agent: BaseAgent, callback_context: CallbackContext
+    ) -> None:
+        self._open_span(
+            self._key("agent", callback_context, agent.name),
+            "agent",
+            agent.name,
+            invocation_id=callback_context.invocation_id,
+            branch=callback_context.branch,
+        )
+
+    async def after_agent_callback(
+        self, *, agent: BaseAgent, callback_context: CallbackContext
+    ) -> None:
+        self._close_span(self._key("agent", callback_context, agent.name))
+
+    async def on_agent_error_callback(
+        self, *, agent: BaseAgent, callback_context: CallbackContext, error: Exception
+    ) -> None:
+        self._close_span(
+            self._key("agent", callback_context, agent.name), error=type(error).__name__
+        )
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> None:
+        self._open_span(
+            self._key("model", callback_context, callback_context.agent_name),
+            "model",
+            callback_context.agent_name,
+            model=llm_request.model,
+            retries=0,
+        )
+
+    async def after_model_callback(
+        self, *, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> None:
+        key = self._key("model", callback_context, callback_context.agent_name)
+        if llm_response.partial:
+            with self._lock:
+                span = self._open.get(key)
+            if span is not None and "first_chunk_ms" not in span.attrs:
+                span.attrs["first_chunk_ms"] = round((time.perf_counter() - span.start) * 1000, 3)
+            return
+        usage = llm_response.usage_metadata
+        tokens = {
+            name: getattr(usage, field_name)
+            for field_name, name in _USAGE_FIELDS.items()
+            if usage is not None and getattr(usage, field_name, None) is not None
+        }
+        self._close_span(key, **tokens)
+
+    async def on_model_error_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception
+    ) -> None:
+        self._close_span(
+            self._key("model", callback_context, callback_context.agent_name),
+            error=type(error).__name__,
+        )
+
+    @staticmethod
+    def _tool_key(tool: BaseTool, tool_context: ToolContext) -> tuple[str, ...]:
+        return ("tool", tool_context.invocation_id, tool_context.function_call_id or tool.name)
+
+    async def before_tool_callback(
+        self, *, tool: BaseTool, tool_args: dict[str, Any], tool_context: ToolContext
+    ) -> None:
+        self._open_span(self._tool_key(tool, tool_context), "tool", tool.name)
+
+    async def after_tool_callback(
+        self,
+        *,
+        tool: BaseTool,
+        tool_args: dict[str, Any],
+        tool_context: ToolContext,
+        result: dict,
+    ) -> None:
+        self._close_span(self._tool_key(tool, tool_context))
+
+    async def on_tool_error_callback(
+        self,
+        *,
+        tool: BaseTool,
+        tool_args: dict[str, Any],
+        tool_context: ToolContext,
+        error: Exception,
+    ) -> None:
+        self._close_span(self._tool_key(tool, tool_context), error=type(error).__name__)
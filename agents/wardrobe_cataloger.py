@@ -1,21 +1,32 @@
 """Wardrobe Cataloger agent"""
 
-from typing import Optional
+import asyncio
+import os
+from collections import Counter
+from collections.abc import AsyncGenerator, Iterable, Mapping
+from datetime import date, timedelta
+from typing import Any, Literal, Optional
 
-from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
+from google.adk.agents import Agent, BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
 from google.genai import types
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
-from tools.demo_wardrobe_tool import demo_wardrobe_tool
+from agents.models import get_model
+from agents.state_payloads import content_text
+from tools.demo_wardrobe_tool import demo_wardrobe_tool, fetch_rotation_items
 
-retry_config = types.HttpRetryOptions(
-    attempts=5,
-    exp_base=7,
-    initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],
+CatalogerMode = Literal["local", "llm"]
+DEFAULT_MODE: CatalogerMode = os.getenv(  # type: ignore[assignment]
+    "FRESHFIT_WARDROBE_CATALOGER_MODE", "local"
 )
 
+# Items worn within this many days are held back unless a category needs them.
+ROTATION_REST_DAYS = 2
+# Without explicit required_categories, make sure the designer can build a base look.
+DEFAULT_REQUIRED_CATEGORIES = ("top", "bottom", "shoes")
+
 
 class WardrobeItem(BaseModel):
     """Individual wardrobe entry tracked by the cataloger."""
@@ -92,14 +103,176 @@ Workflow:
 Return JSON that strictly follows WardrobeCatalogerOutput."""
 
 
-def wardrobe_cataloger_agent() -> Agent:
-    """Construct the Wardrobe Cataloger agent."""
+def _is_rested(item: Mapping[str, Any], rested_before: str) -> bool:
+    worn = item.get("last_worn_date")
+    return not worn or str(worn) < rested_before
+
+
+def _days_ago(worn: Optional[str], today: date) -> str:
+    try:
+        days = (today - date.fromisoformat(str(worn)[:10])).days
+    except (TypeError, ValueError):
+        return "recently"
+    if days <= 0:
+        return "today"
+    return "yesterday" if days == 1 else f"{days} days ago"
+
+
+def _coverage(items: Iterable[Mapping[str, Any]], field: str) -> str:
+    counts = Counter(str(item.get(field) or "unknown") for item in items)
+    return ", ".join(f"{count} {value}" for value, count in counts.most_common())
+
+
+def _summarize(items: list[dict[str, Any]], held_back: int) -> str:
+    if not items:
+        return "No wardrobe items available."
+    lines = [
+        f"{len(items)} items by category: {_coverage(items, 'category')}.",
+        f"Formality: {_coverage(items, 'formality')}.",
+        f"Warmth: {_coverage(items, 'warmth_level')}.",
+    ]
+    if held_back:
+        lines.append(
+            f"{held_back} item(s) worn in the last {ROTATION_REST_DAYS} days held back for rotation."
+        )
+    return " ".join(lines)
+
+
+def catalog_wardrobe(
+    request: WardrobeCatalogerInput, *, today: Optional[date] = None
+) -> WardrobeCatalogerOutput:
+    """Apply the cataloger rules without a model call.
+
+    Banned items are dropped, items worn within ROTATION_REST_DAYS are held back,
+    and for each required category with no rested item the least recently worn
+    piece is reused (and called out in ``notes``). Closets read from the DB are
+    filtered in SQL; pre-fetched ``items`` are filtered the same way in Python.
+    """
+
+    today = today or date.today()
+    rested_before = (today - timedelta(days=ROTATION_REST_DAYS - 1)).isoformat()
+    required = list(dict.fromkeys(request.required_categories or DEFAULT_REQUIRED_CATEGORIES))
+    banned = {str(item_id) for item_id in request.banned_items}
+
+    if request.items:
+        pool = [item.model_dump() for item in request.items if str(item.item_id) not in banned]
+        rested = [item for item in pool if _is_rested(item, rested_before)]
+        recent = sorted(
+            (item for item in pool if not _is_rested(item, rested_before)),
+            key=lambda item: str(item.get("last_worn_date")),
+        )
+    else:
+        rested = fetch_rotation_items(
+            request.user_id, rested_before=rested_before, exclude_item_ids=sorted(banned)
+        )
+        recent = []
+
+    covered = {item["category"] for item in rested}
+    uncovered = [category for category in required if category not in covered]
+    if uncovered and not request.items:
+        recent = fetch_rotation_items(
+            request.user_id,
+            rested_before=rested_before,
+            categories=uncovered,
+            exclude_item_ids=sorted(banned),
+            recent=True,
+        )
+
+    reused: list[dict[str, Any]] = []
+    missing: list[str] = []
+    for category in uncovered:
+        pick = next((item for item in recent if item["category"] == category), None)
+        if pick is None:
+            missing.append(category)
+        else:
+            reused.append(pick)
+
+    items = rested + reused
+    # Only known for pre-fetched items; the DB path never reads rows it holds back.
+    held_back = len(recent) - len(reused) if request.items else 0
+    notes = [
+        f"Reusing {item['name']} (worn {_days_ago(item.get('last_worn_date'), today)}) "
+        f"because no other clean {item['category']} is available."
+        for item in reused
+    ]
+    if missing:
+        notes.append(f"No {', '.join(missing)} in the wardrobe to cover the request.")
+    return WardrobeCatalogerOutput(
+        wardrobe_items=items,
+        clean_item_ids=[item["item_id"] for item in items],
+        wardrobe_summary=_summarize(items, held_back),
+        missing_categories=missing,
+        notes=" ".join(notes) or None,
+    )
+
+
+def cataloger_request(ctx: InvocationContext) -> WardrobeCatalogerInput:
+    """Read the cataloger input from a JSON user message, falling back to session state."""
+
+    text = content_text(ctx.user_content)
+    if text:
+        try:
+            return WardrobeCatalogerInput.model_validate_json(text)
+        except ValidationError:
+            pass
+    state = ctx.session.state
+    return WardrobeCatalogerInput(
+        user_id=ctx.session.user_id or "123",
+        required_categories=list(state.get("required_categories") or []),
+        banned_items=[str(item_id) for item_id in state.get("banned_items") or []],
+    )
+
+
+class WardrobeCatalogerAgent(BaseAgent):
+    """Deterministic cataloger: a SQL rotation filter, no model call.
+
+    Writes a WardrobeCatalogerOutput under ``wardrobe_items``, exactly where the
+    LLM cataloger's ``output_key`` put it.
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        request = cataloger_request(ctx)
+        try:
+            # Off the event loop so the parallel weather agent keeps streaming.
+            output = await asyncio.to_thread(catalog_wardrobe, request)
+        except FileNotFoundError as exc:
+            output = WardrobeCatalogerOutput(
+                wardrobe_summary="Wardrobe database unavailable.",
+                missing_categories=list(request.required_categories or DEFAULT_REQUIRED_CATEGORIES),
+                notes=str(exc),
+            )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=output.model_dump_json())]),
+            actions=EventActions(state_delta={"wardrobe_items": output.model_dump()}),
+        )
+
+
+def wardrobe_cataloger_agent(*, mode: Optional[CatalogerMode] = None) -> BaseAgent:
+    """Construct the Wardrobe Cataloger agent.
+
+    Args:
+        mode: ``local`` (default) filters the closet deterministically without a
+            model call; ``llm`` restores the Gemini cataloger.
+    """
+
+    resolved_mode = mode or DEFAULT_MODE
+    if resolved_mode not in ("local", "llm"):
+        raise ValueError(f"Unknown wardrobe cataloger mode: {resolved_mode!r}")
+
+    if resolved_mode == "local":
+        return WardrobeCatalogerAgent(
+            name="wardrobe_cataloger",
+            description="Filters wardrobe items to produce a candidate pool.",
+        )
 
     return Agent(
         name="wardrobe_cataloger",
         description="Filters wardrobe items to produce a candidate pool.",
         instruction=INSTRUCTION,
-        model=Gemini(model="gemini-2.5-flash", retry_options=retry_config),
+        model=get_model("wardrobe_cataloger"),
         input_schema=WardrobeCatalogerInput,
         output_schema=WardrobeCatalogerOutput,
         output_key="wardrobe_items",
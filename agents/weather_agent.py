@@ -1,23 +1,27 @@
 """Weather agent responsible for contextual weather capture."""
 
+import asyncio
+import json
+import logging
+import re
+from datetime import date, timedelta
 from typing import Literal, Optional
 
 from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
-from google.adk.tools import google_search
+from google.adk.agents.callback_context import CallbackContext
 from google.genai import types
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, ValidationError, field_validator
 
-from tools.date_tool import date_tool
+from agents.models import get_model
+from agents.state_payloads import content_text, load_payload, weather_from_state
+from tools.date_tool import date_tool, get_current_date
+from tools.weather_cache import DEFAULT_MODE, CacheMode, normalize_location, weather_cache
 
-TEMP_BUCKETS = ("cold", "cool", "mild", "warm", "hot")
+logger = logging.getLogger(__name__)
 
-retry_config = types.HttpRetryOptions(
-    attempts=5,
-    exp_base=7,
-    initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],
-)
+TEMP_BUCKETS = ("cold", "cool", "mild", "warm", "hot")
+# Upper bound (exclusive, °C) of every bucket but the last.
+TEMP_BUCKET_LIMITS_C = (10.0, 18.0, 24.0, 30.0)
 
 
 class WeatherRequest(BaseModel):
@@ -53,6 +57,10 @@ class WeatherAgentOutput(BaseModel):
     high_temp_c: Optional[float] = None
     low_temp_c: Optional[float] = None
     precipitation_chance: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    dress_code: Optional[str] = Field(
+        default=None,
+        description="Carried-through or inferred dress code, plus any stale-data note.",
+    )
 
     @field_validator("temp_bucket")
     def _validate_bucket(cls, bucket: str) -> str:  # noqa: D401
@@ -62,6 +70,15 @@ class WeatherAgentOutput(BaseModel):
         return bucket
 
 
+def temp_bucket_for(average_temp_c: float) -> str:
+    """Map an average temperature onto TEMP_BUCKETS."""
+
+    for bucket, limit in zip(TEMP_BUCKETS[:-1], TEMP_BUCKET_LIMITS_C, strict=True):
+        if average_temp_c < limit:
+            return bucket
+    return TEMP_BUCKETS[-1]
+
+
 INSTRUCTION = """You are the FreshFit Weather agent that feeds the daily intake flow.
 
 - Input payload:
@@ -71,12 +88,10 @@ INSTRUCTION = """You are the FreshFit Weather agent that feeds the daily intake
 
 Task:
 1. When date is missing or represents "today", call `date_tool` (Pacific Time) and log the returned date/assumption before continuing.
-2. Use the google_search tool to fetch weather for the exact location/date in Celsius (average, high, low, precipitation chance). Prefer day-level summaries; if nothing is available, state that you reused the closest recent data.
-2. Map the average temperature into the required bucket:
-   cold <10°C, cool 10-18°C, mild 18-24°C, warm 24-30°C, hot >30°C.
-3. Populate precipitation_chance as a float between 0 and 1 (e.g., 40% → 0.4). If precipitation data is missing, output null.
+2. Call `lookup_weather` with the location and ISO date. On success, copy its `weather` fields (location, date, temp_bucket, °C stats, precipitation_chance) into your output unchanged; the tool already maps temperatures into buckets (cold <10°C, cool 10-18°C, mild 18-24°C, warm 24-30°C, hot >30°C).
+3. If `lookup_weather` returns an error, estimate typical conditions for the location and season, pick the matching bucket, and leave unknown numbers null.
 4. Carry through the provided dress_code if present; otherwise infer a short recommendation aligned with the occasion_tag (e.g., "smart casual", "daily casual").
-5. If you had to fall back to stale data or assumptions, mention it in a brief note inside the dress_code string.
+5. If you had to fall back to estimates, or `source` is "normals" (climate averages rather than a forecast), mention it in a brief note inside the dress_code string.
 
 Output:
 - Return JSON that strictly matches WeatherAgentOutput. Do not add extra keys or prose. Example:
@@ -91,14 +106,225 @@ Output:
   }"""
 
 
-def weather_agent() -> Agent:
-    """Construct the FreshFit Weather agent."""
+WEEKDAYS = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+_ISO_DATE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+_PLACE = r"([A-Z][\w.'-]*(?:[ -][A-Z][\w.'-]*)*(?:,\s*[A-Z][\w.]*(?: [A-Z][\w.]*)*)?)"
+# Tried in order: "in Seattle" is a stronger location cue than "for Work".
+_LOCATION_PATTERNS = tuple(
+    re.compile(rf"\b(?:{prepositions})\s+{_PLACE}")
+    for prepositions in ("in|near|around|visiting", "at|to|for")
+)
+_NOT_PLACES = {"today", "tonight", "tomorrow", "the", "a", "an", "my", *WEEKDAYS}
+# Rule 4's inferred dress_code for each rung of the engine's formality ladder.
+DRESS_CODES = ("daily casual", "smart casual", "business", "formal")
+
+REQUEST_STATE_KEY = "temp:weather_request"
+SERVED_STATE_KEY = "temp:weather_cache_served"
+_refresh_tasks: dict[tuple[str, str], asyncio.Task[None]] = {}
+
+
+def pacific_today() -> date:
+    """Today's date as reported by `date_tool` (Pacific Time)."""
+
+    return date.fromisoformat(get_current_date()["date"])
+
+
+def resolve_request_date(text: str, today: date) -> str:
+    """Resolve an ISO date, "tomorrow", or a weekday mention; defaults to today."""
+
+    match = _ISO_DATE.search(text)
+    if match:
+        return match.group(0)
+    lowered = text.lower()
+    if "tomorrow" in lowered:
+        return (today + timedelta(days=1)).isoformat()
+    for index, weekday in enumerate(WEEKDAYS):
+        if re.search(rf"\b{weekday}\b", lowered):
+            return (today + timedelta(days=(index - today.weekday()) % 7)).isoformat()
+    return today.isoformat()
+
+
+def weather_request_from_content(
+    content: Optional[types.Content], *, today: date
+) -> Optional[WeatherRequest]:
+    """Extract (location, date) from a structured payload or a free-text request."""
+
+    text = content_text(content) or ""
+    payload = load_payload(text)
+    if isinstance(payload, dict) and payload.get("location"):
+        raw_date = payload.get("date") or ""
+        return WeatherRequest(
+            location=str(payload["location"]),
+            date=resolve_request_date(str(raw_date), today),
+        )
+    for pattern in _LOCATION_PATTERNS:
+        for match in pattern.finditer(text):
+            location = match.group(1).strip(" .,")
+            if location.split(",")[0].strip().lower() not in _NOT_PLACES:
+                return WeatherRequest(location=location, date=resolve_request_date(text, today))
+    return None
+
+
+def dress_code_for(content: Optional[types.Content]) -> str:
+    """Carry through the request's dress_code, or infer one from its occasion."""
+
+    # Imported lazily: the engine pulls in the designer and cataloger schemas.
+    from agents.outfit_engine import occasion_formality
+
+    text = content_text(content) or ""
+    payload = load_payload(text)
+    if isinstance(payload, dict):
+        if payload.get("dress_code"):
+            return str(payload["dress_code"])
+        text = str(payload.get("occasion_tag") or "")
+    return DRESS_CODES[occasion_formality(text)]
+
+
+def _stale_note(age_s: float) -> str:
+    return f"Stale data: cached weather from {age_s / 3600:.1f} h ago; refreshing."
+
+
+def _cache_locations(requested: str, resolved: str) -> list[str]:
+    """Cache keys for a lookup: the resolved name, plus the request if it names the same place.
+
+    The request location may come from the free-text regex, so it only becomes an
+    alias when its city matches the resolved one or the climate normals map both
+    to the same entry; "The Office Party" never does.
+    """
+
+    # Imported lazily: the provider module depends on the schemas defined here.
+    from agents.weather_provider import WeatherUnavailable, get_provider
+
+    def city(location: str) -> str:
+        return normalize_location(location).split(",")[0].strip()
+
+    if not requested or city(requested) == city(resolved):
+        return [resolved]
+    normals = get_provider("normals")
+    try:
+        known = normals.find(requested)["name"] == normals.find(resolved)["name"]
+    except (WeatherUnavailable, OSError):
+        known = False
+    return [resolved, requested] if known else [resolved]
+
+
+async def _revalidate(location: str, forecast_date: str) -> None:
+    """Refresh one cache entry straight from the weather provider."""
+
+    # Imported lazily: the provider module depends on the schemas defined here.
+    from agents.weather_provider import WeatherUnavailable, get_provider
+
+    try:
+        output = await get_provider().get_weather(location, forecast_date)
+    except WeatherUnavailable:
+        logger.warning("Weather revalidation found nothing for %s", location)
+        return
+    except Exception:
+        logger.exception("Weather revalidation failed for %s on %s", location, forecast_date)
+        return
+    weather_cache.put(
+        _cache_locations(location, output.location),
+        forecast_date,
+        output.model_dump(exclude={"dress_code"}),
+    )
+
+
+def _schedule_refresh(location: str, forecast_date: str) -> None:
+    key = (location, forecast_date)
+    if key in _refresh_tasks:
+        return
+    task = asyncio.get_running_loop().create_task(_revalidate(location, forecast_date))
+    _refresh_tasks[key] = task
+    task.add_done_callback(lambda _: _refresh_tasks.pop(key, None))
+
+
+def _serve_cached_weather(mode: CacheMode):
+    """Build a before-agent callback that answers from the weather cache.
+
+    A fresh hit becomes the agent's response, so neither the weather lookup nor the
+    model runs; its `dress_code` is re-derived from this request's occasion, since
+    the cache stores weather only. In ``swr`` mode a stale hit is served the same
+    way with a note appended to `dress_code`, while a background run refreshes the
+    entry; ``strict`` treats stale entries as misses.
+    """
+
+    def callback(callback_context: CallbackContext) -> Optional[types.Content]:
+        state = callback_context.state
+        today = pacific_today()
+        request = weather_request_from_content(callback_context.user_content, today=today)
+        state[REQUEST_STATE_KEY] = request.model_dump() if request else None
+        state[SERVED_STATE_KEY] = False
+        if request is None:
+            return None
+
+        cached = weather_cache.get(request.location, request.date, today=today)
+        if cached is None or (not cached.fresh and mode != "swr"):
+            return None
+        dress_code = dress_code_for(callback_context.user_content)
+        if not cached.fresh:
+            dress_code = f"{dress_code}. {_stale_note(cached.age_s)}"
+            _schedule_refresh(request.location, request.date)
+        payload = {**cached.payload, "dress_code": dress_code}
+
+        text = json.dumps(payload)
+        state["weather"] = text
+        state[SERVED_STATE_KEY] = True
+        return types.Content(role="model", parts=[types.Part(text=text)])
+
+    return callback
+
+
+def _store_weather(callback_context: CallbackContext) -> Optional[types.Content]:
+    """Cache the model's WeatherAgentOutput under the requested and resolved names."""
+
+    state = callback_context.state
+    if state.get(SERVED_STATE_KEY):
+        return None
+    try:
+        output = WeatherAgentOutput.model_validate(weather_from_state(state))
+    except ValidationError:
+        return None
+
+    request = state.get(REQUEST_STATE_KEY) or {}
+    requested = request.get("location") if request.get("date") == output.date else None
+    # dress_code depends on the occasion, not the location/day, so it isn't cached.
+    weather_cache.put(
+        _cache_locations(requested or "", output.location),
+        output.date,
+        output.model_dump(exclude={"dress_code"}),
+    )
+    return None
+
+
+def weather_agent(*, cache_mode: Optional[CacheMode] = None) -> Agent:
+    """Construct the FreshFit Weather agent.
+
+    Args:
+        cache_mode: ``swr`` (default) serves fresh and stale cache hits and refreshes
+            stale ones in the background, ``strict`` serves only fresh hits, ``off``
+            bypasses the weather cache entirely.
+    """
+    # Imported lazily: the provider module depends on the schemas defined here.
+    from agents.weather_provider import weather_lookup_tool
+
+    resolved_mode = cache_mode or DEFAULT_MODE
+    caching = resolved_mode != "off"
     return Agent(
         name="weather_agent",
         description="Collects weather and occasion metadata for FreshFit.",
         instruction=INSTRUCTION,
         # input_schema=WeatherAgentInput,
-        model=Gemini(model="gemini-2.5-flash", retry_options=retry_config),
+        model=get_model("weather_agent"),
         output_key="weather",
-        tools=[google_search, date_tool],
+        tools=[weather_lookup_tool, date_tool],
+        before_agent_callback=(_serve_cached_weather(resolved_mode) if caching else None),
+        after_agent_callback=_store_weather if caching else None,
     )
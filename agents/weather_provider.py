@@ -0,0 +1,242 @@
+"""Pluggable weather backends that return `WeatherAgentOutput` directly.
+
+``search`` (the default) grounds a small Gemini call in Google Search for live
+forecasts; ``normals`` answers from a local climate-normals file, so it is
+deterministic and needs no network or model call (useful for demos and load
+tests). The weather agent reaches either one through `weather_lookup_tool`
+instead of searching and parsing results itself.
+"""
+
+from __future__ import annotations
+
+import abc
+import json
+import os
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+from google.adk.agents import Agent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.tools import google_search
+from google.adk.tools.function_tool import FunctionTool
+from google.genai import types
+from pydantic import ValidationError
+
+from agents.models import get_model
+from agents.state_payloads import content_text, load_payload
+from agents.weather_agent import (
+    WeatherAgentOutput,
+    pacific_today,
+    resolve_request_date,
+    temp_bucket_for,
+)
+from tools.weather_cache import normalize_location
+
+ProviderName = Literal["normals", "search"]
+DEFAULT_PROVIDER: ProviderName = os.getenv("FRESHFIT_WEATHER_PROVIDER", "search")  # type: ignore[assignment]
+CLIMATE_NORMALS_PATH = Path(
+    os.getenv(
+        "FRESHFIT_CLIMATE_NORMALS_PATH",
+        Path(__file__).resolve().parents[1] / "data" / "climate_normals.json",
+    )
+)
+
+
+class WeatherUnavailable(LookupError):
+    """Raised when a provider cannot produce weather for a location/date."""
+
+
+def parse_forecast_date(forecast_date: str) -> date:
+    """Parse an ISO date, raising WeatherUnavailable for malformed or impossible ones."""
+
+    try:
+        return date.fromisoformat(forecast_date)
+    except ValueError as exc:
+        raise WeatherUnavailable(f"Invalid forecast date {forecast_date!r}.") from exc
+
+
+class WeatherProvider(abc.ABC):
+    """Resolve weather for one location and ISO date."""
+
+    name: str
+
+    @abc.abstractmethod
+    async def get_weather(self, location: str, forecast_date: str) -> WeatherAgentOutput:
+        """Return weather for ``location`` on ``forecast_date`` or raise WeatherUnavailable."""
+
+
+class ClimateNormalsProvider(WeatherProvider):
+    """Deterministic weather from monthly climate normals.
+
+    Each location lists twelve monthly values (January first) for the mean daily
+    high and low in °C and the fraction of days with measurable precipitation.
+    Values are treated as mid-month points and interpolated linearly, so nearby
+    dates give smoothly varying answers.
+    """
+
+    name = "normals"
+
+    def __init__(self, path: Path = CLIMATE_NORMALS_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._locations: Optional[dict[str, dict[str, Any]]] = None
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            if self._locations is None:
+                with self.path.open(encoding="utf-8") as handle:
+                    document = json.load(handle)
+                locations: dict[str, dict[str, Any]] = {}
+                for entry in document["locations"]:
+                    for alias in (entry["name"], *entry.get("aliases", ())):
+                        locations.setdefault(normalize_location(alias), entry)
+                self._locations = locations
+            return self._locations
+
+    def find(self, location: str) -> dict[str, Any]:
+        """Match a location by full name, alias, or leading city name."""
+
+        locations = self._load()
+        key = normalize_location(location)
+        entry = locations.get(key) or locations.get(key.split(",")[0].strip())
+        if entry is None:
+            raise WeatherUnavailable(f"No climate normals for {location!r}.")
+        return entry
+
+    def lookup(self, location: str, forecast_date: str) -> WeatherAgentOutput:
+        """Synchronous core of `get_weather`."""
+
+        entry = self.find(location)
+        day = parse_forecast_date(forecast_date)
+        high = _interpolate(entry["high_c"], day)
+        low = _interpolate(entry["low_c"], day)
+        average = (high + low) / 2
+        return WeatherAgentOutput(
+            location=entry["name"],
+            date=day.isoformat(),
+            temp_bucket=temp_bucket_for(average),
+            average_temp_c=round(average, 1),
+            high_temp_c=round(high, 1),
+            low_temp_c=round(low, 1),
+            precipitation_chance=round(_interpolate(entry["precipitation_chance"], day), 2),
+        )
+
+    async def get_weather(self, location: str, forecast_date: str) -> WeatherAgentOutput:
+        return self.lookup(location, forecast_date)
+
+
+def _interpolate(monthly: list[float], day: date) -> float:
+    """Linearly interpolate twelve mid-month values at ``day``."""
+
+    midpoint = date(day.year, day.month, 15)
+    neighbour_month = day.month + (1 if day >= midpoint else -1)
+    neighbour_year = day.year + (neighbour_month - 1) // 12
+    neighbour = date(neighbour_year, (neighbour_month - 1) % 12 + 1, 15)
+    span = abs((neighbour - midpoint).days) or 1
+    weight = abs((day - midpoint).days) / span
+    current = monthly[day.month - 1]
+    return current + (monthly[neighbour.month - 1] - current) * weight
+
+
+SEARCH_INSTRUCTION = """Use google_search to find the weather forecast (or, for past
+dates, the observed weather) for the given location and ISO date, in Celsius.
+
+Return only JSON with these keys:
+  {"location": "<City, Region>", "date": "<ISO date>", "temp_bucket": "<bucket>",
+   "average_temp_c": <float>, "high_temp_c": <float>, "low_temp_c": <float>,
+   "precipitation_chance": <0-1 float or null>}
+Buckets by average temperature: cold <10°C, cool 10-18°C, mild 18-24°C,
+warm 24-30°C, hot >30°C."""
+
+
+class SearchWeatherProvider(WeatherProvider):
+    """Weather from a Google Search-grounded Gemini call."""
+
+    name = "search"
+
+    def __init__(self, model: Optional[BaseLlm] = None) -> None:
+        self.model = model or get_model("weather_search")
+
+    async def get_weather(self, location: str, forecast_date: str) -> WeatherAgentOutput:
+        # Imported lazily: only the search backend needs a runner.
+        from google.adk.runners import InMemoryRunner
+
+        forecast_date = parse_forecast_date(forecast_date).isoformat()
+        agent = Agent(
+            name="weather_search",
+            description="Looks up weather with Google Search.",
+            instruction=SEARCH_INSTRUCTION,
+            model=self.model,
+            tools=[google_search],
+        )
+        runner = InMemoryRunner(agent=agent, app_name="FreshFitWeatherSearch")
+        session = await runner.session_service.create_session(
+            app_name="FreshFitWeatherSearch", user_id="weather-search"
+        )
+        request = json.dumps({"location": location, "date": forecast_date})
+        message = types.Content(role="user", parts=[types.Part(text=request)])
+        final_text: Optional[str] = None
+        async for event in runner.run_async(
+            user_id="weather-search", session_id=session.id, new_message=message
+        ):
+            text = content_text(event.content)
+            if text and event.is_final_response():
+                final_text = text
+
+        payload = load_payload(final_text)
+        if not isinstance(payload, dict):
+            raise WeatherUnavailable(f"Search returned no weather for {location!r}.")
+        payload.setdefault("date", forecast_date)
+        if payload.get("temp_bucket") is None and payload.get("average_temp_c") is not None:
+            payload["temp_bucket"] = temp_bucket_for(float(payload["average_temp_c"]))
+        try:
+            return WeatherAgentOutput.model_validate(payload)
+        except ValidationError as exc:
+            raise WeatherUnavailable(f"Search weather for {location!r} is malformed.") from exc
+
+
+_PROVIDERS: dict[str, WeatherProvider] = {}
+
+
+def get_provider(name: Optional[ProviderName] = None) -> WeatherProvider:
+    """Return the shared provider instance for ``name`` (defaults to the env setting)."""
+
+    resolved = name or DEFAULT_PROVIDER
+    if resolved not in _PROVIDERS:
+        if resolved == "normals":
+            _PROVIDERS[resolved] = ClimateNormalsProvider()
+        elif resolved == "search":
+            _PROVIDERS[resolved] = SearchWeatherProvider()
+        else:
+            raise ValueError(f"Unknown weather provider: {resolved!r}")
+    return _PROVIDERS[resolved]
+
+
+async def lookup_weather(location: str, date: Optional[str] = None) -> dict[str, Any]:
+    """Return structured weather for a location and day.
+
+    Args:
+        location: City or place name, e.g. "Seattle, WA".
+        date: ISO date, "today", "tomorrow", or a weekday; defaults to today (Pacific).
+
+    Returns:
+        Dict with `status`, the `source` backend, and a `weather` dict matching
+        WeatherAgentOutput, or an error `message`.
+    """
+
+    provider = get_provider()
+    forecast_date = resolve_request_date(date or "", pacific_today())
+    try:
+        weather = await provider.get_weather(location, forecast_date)
+    except WeatherUnavailable as exc:
+        return {"status": "error", "source": provider.name, "message": str(exc)}
+    return {
+        "status": "success",
+        "source": provider.name,
+        "weather": weather.model_dump(exclude_none=True),
+    }
+
+
+weather_lookup_tool = FunctionTool(lookup_weather)
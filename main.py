@@ -1,45 +1,205 @@
+from __future__ import annotations
+
+import argparse
 import asyncio
+import contextlib
 import json
+import logging
+import os
+import re
+import statistics
 import textwrap
-from typing import Any, Optional
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional
 
 from dotenv import load_dotenv
-from google.adk.memory import InMemoryMemoryService
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
 
-from agents.explanation_agent import explanation_agent
-from agents.feedback_learning import feedback_learning_agent
-from agents.outfit_designer import outfit_designer_agent
-from agents.router_agent import create_freshfit_router
+# google.adk / google.genai and the agent graph take about a second to import, so
+# they are loaded after the banner prints (see `load_runtime`), while the user
+# types their first request.
+if TYPE_CHECKING:
+    from google.adk.runners import Runner
+    from google.adk.sessions import BaseSessionService
+    from google.genai import types
+
+    from agents.tracing import TracingPlugin
+    from tools.write_behind import WriteBehindQueue
 
 load_dotenv()
 
+logger = logging.getLogger("freshfit.cli")
 
 APP_NAME = "FreshFit"
 USER_ID = "123"  # for demo purposes, just use a random id
 
-# Initialize agents
-root_agent = create_freshfit_router()
-feedback_agent = feedback_learning_agent()
-outfit_agent_instance = outfit_designer_agent()
-explanation_agent_instance = explanation_agent()
+OUTFIT_AGENT_NAME = "outfit_designer"
+EXPLANATION_AGENT_NAME = "explanation_agent"
+SUGGESTION_SESSION_ID = "session_slate_1"
+FEEDBACK_SESSION_ID = "session_feedback_1"
+
+# Stream the slate: print the outfit menu as soon as the designer finishes and
+# each explanation as it arrives, instead of waiting for the whole OutfitFlow.
+STREAMING = os.getenv("FRESHFIT_STREAMING", "on").lower() not in {"0", "off", "false"}
+# Raw ADK events go to this file (DEBUG level) instead of the console.
+DEBUG_LOG_PATH = os.getenv("FRESHFIT_DEBUG_LOG")
+# Agent/model/tool/SQLite spans go to this file: JSONL, or a Chrome trace for *.json.
+TRACE_PATH = os.getenv("FRESHFIT_TRACE_PATH")
+
+
+@dataclass
+class CliRuntime:
+    """Agent graph, runners, and services behind the CLI."""
+
+    session_service: BaseSessionService
+    suggestion_runner: Runner
+    feedback_runner: Runner
+    write_behind: WriteBehindQueue
+
+    async def create_sessions(self) -> None:
+        await self.session_service.create_session(
+            app_name=APP_NAME,
+            user_id=USER_ID,
+            session_id=SUGGESTION_SESSION_ID,
+        )
+        await self.session_service.create_session(
+            app_name=f"{APP_NAME}_Feedback",
+            user_id=USER_ID,
+            session_id=FEEDBACK_SESSION_ID,
+        )
 
-memory_service = InMemoryMemoryService()
-session_service = InMemorySessionService()
+
+_runtime: Optional[CliRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def load_runtime() -> CliRuntime:
+    """Import the ADK stack and build the agent graph (once per process)."""
+
+    global _runtime
+    with _runtime_lock:
+        if _runtime is not None:
+            return _runtime
+
+        from google.adk.apps import App
+        from google.adk.memory import InMemoryMemoryService
+        from google.adk.runners import Runner
+        from google.adk.sessions import InMemorySessionService
+
+        from agents.feedback_learning import feedback_learning_agent
+        from agents.model_cache import model_cache_plugin
+        from agents.router_agent import create_freshfit_router
+        from tools.write_behind import WriteBehindQueue
+
+        memory_service = InMemoryMemoryService()
+        session_service = InMemorySessionService()
+        # One cache plugin per app covers every agent's model calls.
+        _runtime = CliRuntime(
+            session_service=session_service,
+            suggestion_runner=Runner(
+                app=App(
+                    name=APP_NAME,
+                    root_agent=create_freshfit_router(),
+                    plugins=[model_cache_plugin],
+                ),
+                session_service=session_service,
+                memory_service=memory_service,
+            ),
+            feedback_runner=Runner(
+                app=App(
+                    name=f"{APP_NAME}_Feedback",
+                    root_agent=feedback_learning_agent(),
+                    plugins=[model_cache_plugin],
+                ),
+                session_service=session_service,
+                memory_service=memory_service,
+            ),
+            write_behind=WriteBehindQueue(),
+        )
+        return _runtime
 
 
 def _content_to_text(content: Optional[types.Content]) -> Optional[str]:
     if content is None:
         return None
     parts = []
-    for part in content.parts:
-        if getattr(part, "text", None):
+    for part in content.parts or []:
+        if getattr(part, "text", None) and not getattr(part, "thought", False):
             parts.append(part.text)
     return "\n".join(parts) if parts else None
 
 
+class _ExplanationStream:
+    """Pull finished ``explanations`` strings out of streamed ExplanationAgentOutput JSON."""
+
+    _ARRAY_START = re.compile(r'"explanations"\s*:\s*\[')
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self.fed = False
+        self._pos: Optional[int] = None
+        self._done = False
+
+    def feed(self, chunk: str) -> list[str]:
+        """Add streamed text; return the explanations completed by it."""
+
+        self.fed = True
+        self.buffer += chunk
+        if self._pos is None:
+            match = self._ARRAY_START.search(self.buffer)
+            if match is None:
+                return []
+            self._pos = match.end()
+        completed = []
+        while not self._done:
+            index = self._pos
+            while index < len(self.buffer) and self.buffer[index] in " \t\r\n,":
+                index += 1
+            if index >= len(self.buffer):
+                break
+            if self.buffer[index] != '"':
+                self._done = True
+                break
+            try:
+                value, end = json.decoder.scanstring(self.buffer, index + 1)
+            except json.JSONDecodeError:
+                break  # The string's closing quote hasn't arrived yet.
+            completed.append(value)
+            self._pos = end
+        return completed
+
+
+def _selection_prompt(explanation_text: Optional[str]) -> Optional[str]:
+    try:
+        payload = json.loads(explanation_text or "")
+    except json.JSONDecodeError:
+        return None
+    return payload.get("selection_prompt") if isinstance(payload, dict) else None
+
+
+@dataclass
+class TurnTiming:
+    """Wall-clock milestones for one suggestion turn (seconds from send)."""
+
+    first_outfit_s: Optional[float] = None
+    total_s: Optional[float] = None
+
+
+turn_timings: list[TurnTiming] = []
+
+
+def _timing_summary() -> dict[str, Any]:
+    firsts = [t.first_outfit_s for t in turn_timings if t.first_outfit_s is not None]
+    totals = [t.total_s for t in turn_timings if t.total_s is not None]
+    return {
+        "turns": len(turn_timings),
+        "first_outfit_p50_s": round(statistics.median(firsts), 3) if firsts else None,
+        "turn_p50_s": round(statistics.median(totals), 3) if totals else None,
+    }
+
+
 def _parse_outfit_payload(
     outfit_text: Optional[str],
 ) -> tuple[list[dict[str, Any]], dict[str, dict[str, Any]]]:
@@ -62,6 +222,43 @@ def _parse_outfit_payload(
     return outfits, lookup
 
 
+def _apply_ranking(
+    outfit_text: Optional[str], ranked_slate: Optional[dict[str, Any]]
+) -> Optional[str]:
+    """Reorder the designer payload to ``ranked_slate`` so menus and ratings follow it."""
+
+    if not outfit_text or not ranked_slate:
+        return outfit_text
+    try:
+        payload = json.loads(outfit_text)
+    except json.JSONDecodeError:
+        return outfit_text
+
+    by_id = {entry.get("outfit_id"): entry for entry in payload.get("outfits") or []}
+    ranked = [
+        {**by_id[entry["outfit_id"]], "rank": entry["rank"]}
+        for entry in ranked_slate.get("outfits") or []
+        if entry.get("outfit_id") in by_id
+    ]
+    if not ranked:
+        return outfit_text
+    return json.dumps({**payload, "outfits": ranked})
+
+
+def _render_ranked_slate(ranked_slate: dict[str, Any]) -> str:
+    """Plain-text slate in ranked order, each outfit followed by its rationale."""
+
+    lines: list[str] = []
+    for entry in ranked_slate.get("outfits") or []:
+        name = entry.get("outfit_name") or "Unnamed Look"
+        lines.append(f"{entry['rank']}. {entry['outfit_id']} - {name}")
+        if entry.get("explanation"):
+            lines.append(f"   {entry['explanation']}")
+    if ranked_slate.get("selection_prompt"):
+        lines.append(f"\n{ranked_slate['selection_prompt']}")
+    return "\n".join(lines)
+
+
 def _display_outfit_menu(indexed_outfits: list[tuple[int, dict[str, Any]]]) -> None:
     if not indexed_outfits:
         return
@@ -73,7 +270,17 @@ def _display_outfit_menu(indexed_outfits: list[tuple[int, dict[str, Any]]]) -> N
         print(f"  {index}. {outfit_id} - {name}")
 
 
-def _prompt_index_choice(
+async def _read_line(prompt: str) -> str:
+    """Read a line of input without blocking the event loop.
+
+    The write-behind queue flushes on a timer that runs on the loop, so a blocking
+    ``input()`` would hold queued feedback until the next turn.
+    """
+
+    return (await asyncio.to_thread(input, prompt)).strip()
+
+
+async def _prompt_index_choice(
     max_index: int,
     prompt: str,
     *,
@@ -83,7 +290,7 @@ def _prompt_index_choice(
         return None
 
     while True:
-        raw = input(prompt).strip()
+        raw = await _read_line(prompt)
         if allow_blank and not raw:
             return None
         if raw.isdigit():
@@ -95,44 +302,70 @@ def _prompt_index_choice(
         )
 
 
-def record_feedback_events(
-    user_id: str, events: list[dict[str, Any]], outfit_lookup: dict[str, Any]
-) -> None:
-    """Log feedback events to the database (Stub)."""
-    # In a real app, this would write to the DB using the schema in tools/preference_history_tool.py
-    print(f"\n[System] Recording {len(events)} feedback events for user {user_id}...")
-    # Example of what might happen:
-    # for event in events:
-    #     outfit = outfit_lookup.get(event["outfit_id"])
-    #     db.insert("outfit_feedback", ...)
-
-
 async def run_agent_turn(
     runner: Runner,
     *,
     session_id: str,
     user_text: str,
+    stream: bool = STREAMING,
 ) -> tuple[Optional[str], Optional[str]]:
-    """Send a single user turn through the orchestrated agent graph."""
+    """Send a single user turn through the orchestrated agent graph.
+
+    With ``stream`` the outfit menu prints the moment the designer's slate lands
+    and explanations print one by one as the explanation agent streams them.
+    Once `slate_join` merges ranking and explanations, the returned slate and the
+    final menu follow ``ranked_slate`` rather than the designer's order.
+    """
+
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+    from google.genai import types
 
     message = types.Content(parts=[types.Part(text=user_text)])
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE if stream else StreamingMode.NONE)
     final_response: Optional[str] = None
     explanation_snapshot: Optional[str] = None
     outfit_snapshot: Optional[str] = None
+    ranked_slate: Optional[dict[str, Any]] = None
+    explanations = _ExplanationStream()
+    timing = TurnTiming()
+    started = time.perf_counter()
+    header_printed = False
+
+    def print_header() -> None:
+        nonlocal header_printed
+        if not header_printed:
+            print("\nFreshFit:\n")
+            header_printed = True
+
+    def print_explanations(texts: list[str]) -> None:
+        for text in texts:
+            print_header()
+            print(f"- {text}")
 
     async for event in runner.run_async(
         user_id=USER_ID,
         session_id=session_id,
         new_message=message,
+        run_config=run_config,
     ):
-        # Print each event for visibility/debugging.
-        print(f"\n[Agent Event] {event}")
+        logger.debug("Agent event: %s", event)
+        author = getattr(event, "author", None)
+        event_text = _content_to_text(getattr(event, "content", None))
+
+        if getattr(event, "partial", False):
+            # Partial chunks are deltas; only explanations are worth showing early.
+            if stream and event_text and author == EXPLANATION_AGENT_NAME:
+                print_explanations(explanations.feed(event_text))
+            continue
+
+        state_delta = getattr(getattr(event, "actions", None), "state_delta", None) or {}
+        if state_delta.get("ranked_slate"):
+            ranked_slate = state_delta["ranked_slate"]
 
         if hasattr(event, "response") and event.response:
             final_response = event.response
             continue
 
-        event_text = _content_to_text(getattr(event, "content", None))
         if not event_text:
             continue
 
@@ -141,26 +374,97 @@ async def run_agent_turn(
 
         # Capture the explanation agent payload so we can always show the slate.
         # We check against the names of the agents we care about.
-        if getattr(event, "author", None) == outfit_agent_instance.name:
+        if author == OUTFIT_AGENT_NAME:
             outfit_snapshot = event_text
-        if getattr(event, "author", None) == explanation_agent_instance.name:
+            outfits, _ = _parse_outfit_payload(event_text)
+            if stream and outfits:
+                timing.first_outfit_s = time.perf_counter() - started
+                print_header()
+                _display_outfit_menu(list(enumerate(outfits, start=1)))
+                print("")
+        if author == EXPLANATION_AGENT_NAME:
             explanation_snapshot = event_text
-
-    if final_response is None:
-        final_response = explanation_snapshot
-
-    if final_response:
-        print("\nFreshFit:\n")
+            if stream and not explanations.fed:
+                # Not streamed (e.g., a cached response): show it all at once.
+                print_explanations(explanations.feed(event_text))
+
+    designer_outfits, _ = _parse_outfit_payload(outfit_snapshot)
+    designer_order = [outfit.get("outfit_id") for outfit in designer_outfits]
+    if ranked_slate and ranked_slate.get("outfits"):
+        outfit_snapshot = _apply_ranking(outfit_snapshot, ranked_slate)
+        final_response = _render_ranked_slate(ranked_slate)
+    else:
+        # No join (e.g. the designer fell through): the explanations are the response.
+        final_response = explanation_snapshot or final_response
+
+    timing.total_s = time.perf_counter() - started
+    if outfit_snapshot:
+        if timing.first_outfit_s is None:
+            timing.first_outfit_s = timing.total_s
+        turn_timings.append(timing)
+
+    if stream and explanations.fed:
+        ranked_outfits, _ = _parse_outfit_payload(outfit_snapshot)
+        if [outfit.get("outfit_id") for outfit in ranked_outfits] != designer_order:
+            # The early menu used the designer's order; ratings use this one.
+            print("\nRanked for you:")
+            _display_outfit_menu(list(enumerate(ranked_outfits, start=1)))
+        prompt = _selection_prompt(explanation_snapshot)
+        if prompt:
+            print(f"\n{prompt}")
+    elif final_response:
+        print_header()
         print(final_response)
 
     return final_response, outfit_snapshot
 
 
+def enable_tracing(runtime: CliRuntime) -> TracingPlugin:
+    """Register one tracing plugin on both runners (after the model cache plugin)."""
+
+    from agents.tracing import TracingPlugin
+
+    tracing = TracingPlugin()
+    runtime.suggestion_runner.plugin_manager.register_plugin(tracing)
+    runtime.feedback_runner.plugin_manager.register_plugin(tracing)
+    return tracing
+
+
+async def run_traced_turn(
+    runner: Runner,
+    tracing: Optional[TracingPlugin],
+    *,
+    profile: bool = False,
+    trace_path: Optional[str] = None,
+    **turn_kwargs: Any,
+) -> tuple[Optional[str], Optional[str]]:
+    """`run_agent_turn` under a turn span; print its waterfall and/or export spans."""
+
+    if tracing is None:
+        return await run_agent_turn(runner, **turn_kwargs)
+
+    from agents.tracing import waterfall
+
+    with tracing.tracer.span("turn", runner.app_name) as turn:
+        result = await run_agent_turn(runner, **turn_kwargs)
+    if profile:
+        print(f"\n[Profile]\n{waterfall(tracing.tracer.subtree(turn))}")
+    if trace_path:
+        tracing.tracer.export(trace_path)
+    return result
+
+
 async def collect_feedback_from_user(
     explanations_response: str | None,
     outfits: list[dict[str, Any]] | None = None,
+    *,
+    show_menu: bool = True,
 ) -> tuple[str, list[dict[str, str]]]:
-    """Prompt the user to pick an outfit and to rate each one in the slate."""
+    """Prompt the user to pick an outfit and to rate each one in the slate.
+
+    When the slate was already streamed, pass ``explanations_response=None`` and
+    ``show_menu=False`` so it isn't printed twice.
+    """
 
     if explanations_response:
         print("\n--- Outfit Slate ---")
@@ -168,8 +472,9 @@ async def collect_feedback_from_user(
 
     indexed_outfits = list(enumerate(outfits or [], start=1))
     if indexed_outfits:
-        _display_outfit_menu(indexed_outfits)
-        selection_index = _prompt_index_choice(
+        if show_menu:
+            _display_outfit_menu(indexed_outfits)
+        selection_index = await _prompt_index_choice(
             len(indexed_outfits),
             "\nEnter the number of the outfit you want to wear (press Enter to skip): ",
             allow_blank=True,
@@ -181,7 +486,7 @@ async def collect_feedback_from_user(
         )
     else:
         selected_outfit = (
-            input("\nEnter the outfit_id you want to wear (or type 'skip'): ").strip()
+            await _read_line("\nEnter the outfit_id you want to wear (or type 'skip'): ")
             or "skip"
         )
 
@@ -191,7 +496,7 @@ async def collect_feedback_from_user(
     )
     while True:
         if indexed_outfits:
-            rating_index = _prompt_index_choice(
+            rating_index = await _prompt_index_choice(
                 len(indexed_outfits),
                 "  Outfit number (blank to finish): ",
                 allow_blank=True,
@@ -200,18 +505,17 @@ async def collect_feedback_from_user(
                 break
             outfit_id = indexed_outfits[rating_index - 1][1]["outfit_id"]
         else:
-            outfit_id = input("  Outfit ID (blank to finish): ").strip()
+            outfit_id = await _read_line("  Outfit ID (blank to finish): ")
             if not outfit_id:
                 break
-        rating = input("  Rating 1-5 (blank if n/a): ").strip()
-        intent = input(
-            "  Future intent [try_again/maybe_later/do_not_recommend]: "
-        ).strip()
-        notes = input("  Notes or tags: ").strip()
+        # Re-prompt here: the feedback writer rejects ratings outside 1-5.
+        rating = await _prompt_index_choice(5, "  Rating 1-5 (blank if n/a): ", allow_blank=True)
+        intent = await _read_line("  Future intent [try_again/maybe_later/do_not_recommend]: ")
+        notes = await _read_line("  Notes or tags: ")
         ratings.append(
             {
                 "outfit_id": outfit_id,
-                "rating": rating,
+                "rating": str(rating) if rating else "",
                 "future_intent": intent or "maybe_later",
                 "notes": notes,
             }
@@ -220,32 +524,69 @@ async def collect_feedback_from_user(
     return selected_outfit, ratings
 
 
-async def main() -> None:
-    suggestion_runner = Runner(
-        app_name=APP_NAME,
-        agent=root_agent,
-        session_service=session_service,
-        memory_service=memory_service,
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="FreshFit smart wardrobe assistant.")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a per-turn waterfall of agent, model, tool and SQLite spans.",
     )
-    feedback_runner = Runner(
-        app_name=f"{APP_NAME}_Feedback",
-        agent=feedback_agent,
-        session_service=session_service,
-        memory_service=memory_service,
+    parser.add_argument(
+        "--trace-path",
+        default=TRACE_PATH,
+        help="Write spans to this file (JSONL, or a Chrome trace if it ends in .json).",
     )
-
-    suggestion_session_id = "session_slate_1"
-    feedback_session_id = "session_feedback_1"
-    await session_service.create_session(
-        app_name=APP_NAME,
-        user_id=USER_ID,
-        session_id=suggestion_session_id,
+    commands = parser.add_subparsers(dest="command")
+    metrics = commands.add_parser(
+        "metrics", help="Print KPIs computed from the feedback DB and exit (no model call)."
     )
-    await session_service.create_session(
-        app_name=f"{APP_NAME}_Feedback",
-        user_id=USER_ID,
-        session_id=feedback_session_id,
+    metrics.add_argument("--start-date", help="First day, YYYY-MM-DD (default: 30 days back).")
+    metrics.add_argument("--end-date", help="Last day, YYYY-MM-DD (default: today).")
+    metrics.add_argument("--user-id", default=USER_ID)
+    metrics.add_argument(
+        "--no-travel", dest="include_travel", action="store_false", help="Skip travel coverage."
     )
+    return parser.parse_args(argv)
+
+
+def print_metrics(args: argparse.Namespace) -> None:
+    """`main.py metrics`: the Metrics agent's tool, run directly."""
+
+    from agents.metrics_agent import MetricsResponse
+    from tools.metrics_tool import compute_metrics
+
+    try:
+        result = compute_metrics(
+            user_id=args.user_id,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            include_travel=args.include_travel,
+        )
+    except (ValueError, FileNotFoundError) as exc:
+        raise SystemExit(f"metrics: {exc}") from None
+    snapshot = MetricsResponse.model_validate(result)
+    print(
+        json.dumps(
+            {
+                "user_id": result["user_id"],
+                "start_date": result["start_date"],
+                "end_date": result["end_date"],
+                **snapshot.model_dump(),
+                "counts": result["counts"],
+            },
+            indent=2,
+        )
+    )
+
+
+async def main(profile: bool = False, trace_path: Optional[str] = TRACE_PATH) -> None:
+    if DEBUG_LOG_PATH:
+        logging.basicConfig(filename=DEBUG_LOG_PATH, level=logging.DEBUG)
+
+    # Build the agent graph on a worker thread while the banner and prompt show.
+    warmup = asyncio.get_running_loop().run_in_executor(None, load_runtime)
+    runtime: Optional[CliRuntime] = None
+    tracing: Optional[TracingPlugin] = None
 
     banner_art = textwrap.dedent(
         """
@@ -268,94 +609,165 @@ async def main() -> None:
 
     print(f"{banner_art}\n\n{tagline}\n\n{instructions}")
 
-    while True:
-        user_text = input("\nYou: ").strip()
-        if not user_text:
-            continue
-        if user_text.lower() in {"exit", "quit"}:
-            print("Ending FreshFit session. See you next time!")
-            break
-
-        response, outfit_snapshot = await run_agent_turn(
-            suggestion_runner,
-            session_id=suggestion_session_id,
-            user_text=user_text,
-        )
+    async with contextlib.AsyncExitStack() as stack:
+        while True:
+            user_text = await _read_line("\nYou: ")
+            if not user_text:
+                continue
+            if user_text.lower() in {"exit", "quit"}:
+                print("Ending FreshFit session. See you next time!")
+                break
 
-        outfits, outfit_lookup = _parse_outfit_payload(outfit_snapshot)
+            if runtime is None:
+                runtime = await warmup
+                await runtime.create_sessions()
+                await stack.enter_async_context(runtime.write_behind)
+                if profile or trace_path:
+                    tracing = enable_tracing(runtime)
+            write_behind = runtime.write_behind
+
+            response, outfit_snapshot = await run_traced_turn(
+                runtime.suggestion_runner,
+                tracing,
+                profile=profile,
+                trace_path=trace_path,
+                session_id=SUGGESTION_SESSION_ID,
+                user_text=user_text,
+            )
 
-        if response is None:
-            continue
+            outfits, outfit_lookup = _parse_outfit_payload(outfit_snapshot)
+            # Outfit ids repeat across turns ({user_id}-{rank}), so key feedback writes
+            # by slate; retries of the same slate reuse this id and are deduplicated.
+            slate_session_id = f"{SUGGESTION_SESSION_ID}:{uuid.uuid4().hex[:12]}"
 
-        if not outfits:
-            continue
+            if response is None:
+                continue
 
-        # Collect structured feedback and send it to the Feedback & Learning agent.
-        selection, ratings = await collect_feedback_from_user(
-            response,
-            outfits,
-        )
-        if not ratings and selection.lower() == "skip":
-            print("No selection or ratings captured; skipping the feedback agent call.")
-            continue
+            if not outfits:
+                continue
 
-        feedback_events: list[dict[str, object]] = []
-        valid_intents = {"try_again", "maybe_later", "do_not_recommend"}
-        for rating_entry in ratings:
-            try:
-                rating_value = (
-                    int(rating_entry["rating"]) if rating_entry["rating"] else None
+            # Collect structured feedback and send it to the Feedback & Learning agent.
+            selection, ratings = await collect_feedback_from_user(
+                None if STREAMING else response,
+                outfits,
+                show_menu=not STREAMING,
+            )
+            if not ratings and selection.lower() == "skip":
+                print(
+                    "No selection or ratings captured; skipping the feedback agent call."
                 )
-            except ValueError:
-                rating_value = None
-
-            intent_value = rating_entry["future_intent"].lower()
-            if intent_value not in valid_intents:
-                intent_value = "maybe_later"
-
-            feedback_events.append(
-                {
-                    "outfit_id": rating_entry["outfit_id"],
-                    "decision": (
-                        "accepted"
-                        if rating_entry["outfit_id"] == selection
-                        else "rejected"
-                    ),
-                    "rating": rating_value,
-                    "future_intent": intent_value,
-                    "notes": rating_entry["notes"] or None,
-                    "tags": [],
-                }
+                continue
+
+            feedback_events: list[dict[str, object]] = []
+            valid_intents = {"try_again", "maybe_later", "do_not_recommend"}
+            for rating_entry in ratings:
+                try:
+                    rating_value = (
+                        int(rating_entry["rating"]) if rating_entry["rating"] else None
+                    )
+                except ValueError:
+                    rating_value = None
+                if rating_value is not None and not 1 <= rating_value <= 5:
+                    rating_value = None
+
+                intent_value = rating_entry["future_intent"].lower()
+                if intent_value not in valid_intents:
+                    intent_value = "maybe_later"
+
+                feedback_events.append(
+                    {
+                        "outfit_id": rating_entry["outfit_id"],
+                        "decision": (
+                            "accepted"
+                            if rating_entry["outfit_id"] == selection
+                            else "rejected"
+                        ),
+                        "rating": rating_value,
+                        "future_intent": intent_value,
+                        "notes": rating_entry["notes"] or None,
+                        "tags": [],
+                    }
+                )
+
+            if selection.lower() != "skip" and not any(
+                entry["outfit_id"] == selection for entry in feedback_events
+            ):
+                feedback_events.append(
+                    {
+                        "outfit_id": selection,
+                        "decision": "accepted",
+                        "rating": None,
+                        "future_intent": "try_again",
+                        "notes": None,
+                        "tags": [],
+                    }
+                )
+
+            feedback_payload = {
+                "events": feedback_events,
+                "presented_outfits": [str(response)],
+            }
+
+            if feedback_events:
+                # Persisted in the background; the feedback agent call doesn't wait.
+                await write_behind.submit_feedback(
+                    USER_ID,
+                    feedback_events,
+                    outfit_lookup,
+                    session_id=slate_session_id,
+                )
+            selected = outfit_lookup.get(selection)
+            if selected and selected.get("outfit_items"):
+                await write_behind.submit_wear(USER_ID, selected["outfit_items"])
+
+            from agents.feedback_learning import (
+                FeedbackEvent,
+                needs_interpretation,
+                normalize_feedback,
             )
 
-        if selection.lower() != "skip" and not any(
-            entry["outfit_id"] == selection for entry in feedback_events
-        ):
-            feedback_events.append(
-                {
-                    "outfit_id": selection,
-                    "decision": "accepted",
-                    "rating": None,
-                    "future_intent": "try_again",
-                    "notes": None,
-                    "tags": [],
-                }
+            if not needs_interpretation(
+                FeedbackEvent.model_validate(event) for event in feedback_events
+            ):
+                # Structured-only feedback: normalize locally, no model round-trip.
+                summary = normalize_feedback(
+                    feedback_events,
+                    selected_outfit_id=(
+                        None if selection.lower() == "skip" else selection
+                    ),
+                )
+                print("\nFreshFit:\n")
+                print("\n".join(summary.acknowledgements))
+                if summary.next_actions:
+                    print(summary.next_actions)
+                continue
+
+            await run_traced_turn(
+                runtime.feedback_runner,
+                tracing,
+                profile=profile,
+                trace_path=trace_path,
+                session_id=FEEDBACK_SESSION_ID,
+                user_text=json.dumps(feedback_payload, indent=2),
             )
 
-        feedback_payload = {
-            "events": feedback_events,
-            "presented_outfits": [str(response)],
-        }
+    if runtime is None:
+        return
 
-        if feedback_events:
-            record_feedback_events(USER_ID, feedback_events, outfit_lookup)
+    from agents.intent_router import fast_path_stats
+    from agents.model_cache import model_cache_plugin
+    from agents.models import model_registry
 
-        await run_agent_turn(
-            feedback_runner,
-            session_id=feedback_session_id,
-            user_text=json.dumps(feedback_payload, indent=2),
-        )
+    print(f"[System] Slate latency: {_timing_summary()}")
+    print(f"[System] Saved feedback: {runtime.write_behind.snapshot()}")
+    print(f"[System] Router fast path: {fast_path_stats.snapshot()}")
+    print(f"[System] Model cache: {model_cache_plugin.stats()}")
+    print(f"[System] Models: {model_registry.snapshot()}")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    if args.command == "metrics":
+        print_metrics(args)
+    else:
+        asyncio.run(main(profile=args.profile, trace_path=args.trace_path))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Benchmark the travel capsule planner on a synthetic closet and itinerary.
+
+Plans an N-day trip with varied weather and occasions, then compares the packed
+item count against a baseline that takes each day's top engine outfit on its
+own (skipping outfits whose top + bottom was already worn). The script exits
+non-zero when the planner exceeds its time budget or does worse than the baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+from datetime import date
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from agents.capsule_planner import plan_capsule  # noqa: E402
+from agents.outfit_engine import DesignContext, generate_outfits  # noqa: E402
+from tools.synthetic_data import SyntheticSpec, closet_rows  # noqa: E402
+
+COLUMNS = (
+    "item_id",
+    "user_id",
+    "name",
+    "category",
+    "color",
+    "warmth_level",
+    "formality",
+    "body_zone",
+    "last_worn_date",
+)
+BASE_CATEGORIES = frozenset({"top", "bottom", "dress"})
+OCCASIONS = ("sightseeing", "business meeting", "dinner out", "beach day", "museum", "hiking")
+
+
+def synthetic_closet(items: int, seed: int) -> list[dict[str, object]]:
+    spec = SyntheticSpec(users=1, items_per_user=items, seed=seed)
+    rows = closet_rows("bench", 1, spec, random.Random(seed))
+    return [{**dict(zip(COLUMNS, row, strict=True)), "item_id": str(row[0])} for row in rows]
+
+
+def itinerary(days: int, seed: int) -> list[DesignContext]:
+    rng = random.Random(seed)
+    today = date.today()
+    base_temp = rng.uniform(5, 28)
+    return [
+        DesignContext(
+            occasion=rng.choice(OCCASIONS),
+            user_id="bench",
+            temperature_c=round(base_temp + rng.uniform(-6, 6), 1),
+            precipitation_chance=round(rng.random(), 2),
+            today=today,
+        )
+        for _ in range(days)
+    ]
+
+
+def baseline(closet: list[dict[str, object]], days: list[DesignContext]) -> tuple[int, int]:
+    """Plan day by day: each day's top engine outfit whose base was not worn yet.
+
+    Returns ``(unique items packed, days repeating an earlier base)``.
+    """
+
+    categories = {item["item_id"]: item["category"] for item in closet}
+    packed: set[str] = set()
+    worn_bases: set[tuple[str, ...]] = set()
+    repeats = 0
+    for context in days:
+        slate = generate_outfits(closet, context).outfits
+        outfit_bases = [
+            (
+                outfit,
+                tuple(item for item in outfit.outfit_items if categories[item] in BASE_CATEGORIES),
+            )
+            for outfit in slate
+        ]
+        fresh = [entry for entry in outfit_bases if entry[1] not in worn_bases]
+        outfit, base = (fresh or outfit_bases)[0]
+        repeats += not fresh
+        worn_bases.add(base)
+        packed.update(outfit.outfit_items)
+    return len(packed), repeats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--trips", type=int, default=5, help="Itineraries to plan.")
+    parser.add_argument("--budget-ms", type=float, default=500.0)
+    args = parser.parse_args()
+
+    closet = synthetic_closet(args.items, seed=42)
+    solve_ms, failures = [], 0
+    for trip in range(args.trips):
+        days = itinerary(args.days, seed=trip)
+        plan = plan_capsule(closet, days, time_budget_s=args.budget_ms / 1000, seed=trip)
+        packed, repeats = baseline(closet, days)
+        solve_ms.append(plan.solve_ms)
+        ok = (plan.repeated_bases, plan.unique_items) <= (repeats, packed) and (
+            plan.solve_ms <= args.budget_ms
+        )
+        failures += not ok
+        print(
+            f"trip {trip}: {plan.unique_items} items packed "
+            f"(baseline {packed}, lower bound {plan.lower_bound}), "
+            f"{plan.repeated_bases} repeated bases (baseline {repeats}), {plan.rounds} rounds, "
+            f"{plan.solve_ms:.1f} ms{'' if ok else '  FAIL'}"
+        )
+
+    print(f"solve p50={statistics.median(solve_ms):.1f} ms max={max(solve_ms):.1f} ms")
+    if failures:
+        raise SystemExit(f"{failures} trip(s) over budget or worse than the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Guard CLI startup: time `import main` with ``-X importtime`` against a budget.
+
+`main.py` must reach the banner without importing the ADK/GenAI stack or the
+agent graph; those load on a worker thread while the user types. This script
+imports ``main`` in fresh interpreters, reports the median cumulative import
+time and the slowest modules, and exits non-zero when the median exceeds the
+budget or a deferred package was imported eagerly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Packages that must only be imported by `load_runtime`, never by `import main`.
+DEFERRED_PACKAGES = ("google.adk", "google.genai", "agents", "tools", "numpy")
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """Map module name -> (self_us, cumulative_us) from ``-X importtime`` output."""
+    timings: dict[str, tuple[int, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        timings[module.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def measure(module: str) -> dict[str, tuple[int, int]]:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list.")
+    args = parser.parse_args()
+
+    # Warm the bytecode caches so the first sample isn't a compile.
+    measure(args.module)
+    runs = [measure(args.module) for _ in range(args.rounds)]
+    totals = [run[args.module][1] / 1000 for run in runs]
+    median_ms = statistics.median(totals)
+    print(
+        f"import {args.module}: median={median_ms:.1f} ms  "
+        f"min={min(totals):.1f} ms  max={max(totals):.1f} ms  n={len(totals)}"
+    )
+
+    last = runs[-1]
+    print(f"slowest modules (self time, last run of {len(last)}):")
+    for name, (self_us, cumulative_us) in sorted(
+        last.items(), key=lambda item: item[1][0], reverse=True
+    )[: args.top]:
+        print(f"  {self_us / 1000:8.2f} ms  (cum {cumulative_us / 1000:8.2f} ms)  {name}")
+
+    eager = sorted(
+        name
+        for name in last
+        if any(name == pkg or name.startswith(f"{pkg}.") for pkg in DEFERRED_PACKAGES)
+    )
+    if eager:
+        raise SystemExit(f"import {args.module} eagerly imported deferred modules: {eager[:10]}")
+    if median_ms > args.budget_ms:
+        raise SystemExit(f"median {median_ms:.1f} ms exceeds the {args.budget_ms} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Benchmark OutfitFlow end to end against the offline fake model.
+
+Installs `FakeLlm` (``agents/fake_llm.py``) for every agent, builds the CLI
+runtime, and drives `main.run_agent_turn` through ``--turns`` fresh sessions
+(``--concurrency`` at a time). The tracing plugin (``agents/tracing.py``) records
+every agent run, model call, tool call and SQLite checkout; the report lists
+p50/p95/p99 per stage plus time-to-first-outfit and the whole turn, and
+``--profile`` prints the span waterfall of the median turn.
+
+With the default zero model latency the numbers are pure orchestration, tool
+and SQLite overhead; ``--latency-ms``/``--agent-latency`` inject model latency
+to see the critical path, and ``--replay`` answers with the real responses
+stored in the model-call cache instead of synthetic ones. The script exits
+non-zero when the turn p50 exceeds ``--budget-ms``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import math
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("GOOGLE_API_KEY", "unused-by-this-benchmark")
+# Never write fake responses into the real model-call cache.
+os.environ["FRESHFIT_LLM_CACHE"] = "off"
+# Exercise the weather tool on every turn, offline.
+os.environ.setdefault("FRESHFIT_WEATHER_PROVIDER", "normals")
+os.environ.setdefault("FRESHFIT_WEATHER_CACHE_MODE", "off")
+# Keep benchmark turns out of the router training log.
+os.environ.setdefault(
+    "FRESHFIT_ROUTER_LOG_PATH", str(Path(tempfile.gettempdir()) / "freshfit_bench_turns.jsonl")
+)
+
+import main  # noqa: E402
+from agents.fake_llm import FakeLlm, install_fake_llm, recordings_from_cache  # noqa: E402
+from agents.models import parse_model_overrides  # noqa: E402
+from agents.tracing import Tracer, TracingPlugin, waterfall  # noqa: E402
+
+DEFAULT_PROMPT = "What should I wear to a gallery opening in Seattle tomorrow evening?"
+
+
+def stage_samples(tracer: Tracer) -> dict[str, list[float]]:
+    """Finished span durations keyed ``kind:name`` (e.g. ``model:outfit_designer``)."""
+
+    samples: dict[str, list[float]] = defaultdict(list)
+    for span in tracer.spans():
+        if span.duration_s is not None:
+            samples[f"{span.kind}:{span.name}"].append(span.duration_s)
+    return samples
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def report(samples: dict[str, list[float]]) -> None:
+    print(f"{'stage':<36}{'n':>6}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}")
+    for stage, values in samples.items():
+        if not values:
+            continue
+        ordered = sorted(values)
+        print(
+            f"{stage:<36}{len(ordered):>6}"
+            + "".join(f"{percentile(ordered, q) * 1000:>11.1f}" for q in (0.5, 0.95, 0.99))
+        )
+
+
+async def run_turns(
+    runtime: main.CliRuntime,
+    *,
+    turns: int,
+    concurrency: int,
+    prompt: str,
+    stream: bool,
+    prefix: str,
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_turn(index: int) -> None:
+        session_id = f"{prefix}_{index}"
+        async with semaphore:
+            await runtime.session_service.create_session(
+                app_name=main.APP_NAME, user_id=main.USER_ID, session_id=session_id
+            )
+            await main.run_agent_turn(
+                runtime.suggestion_runner,
+                session_id=session_id,
+                user_text=prompt,
+                stream=stream,
+            )
+
+    # run_agent_turn prints the slate; keep the report readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(one_turn(index) for index in range(turns)))
+
+
+def build_fake(args: argparse.Namespace) -> FakeLlm:
+    agent_latency = {
+        agent_name: float(ms) / 1000
+        for agent_name, ms in parse_model_overrides(args.agent_latency).items()
+    }
+    return FakeLlm(
+        latency_s=args.latency_ms / 1000,
+        agent_latency_s=agent_latency,
+        jitter=args.jitter,
+        seed=args.seed,
+        recordings=recordings_from_cache() if args.replay else {},
+    )
+
+
+async def run(args: argparse.Namespace) -> Optional[float]:
+    fake = install_fake_llm(build_fake(args))
+    runtime = main.load_runtime()
+    tracing = TracingPlugin()
+    runtime.suggestion_runner.plugin_manager.register_plugin(tracing)
+
+    await run_turns(
+        runtime,
+        turns=args.warmup,
+        concurrency=1,
+        prompt=args.prompt,
+        stream=args.stream,
+        prefix="warmup",
+    )
+    tracing.tracer.clear()
+    main.turn_timings.clear()
+
+    started = time.perf_counter()
+    await run_turns(
+        runtime,
+        turns=args.turns,
+        concurrency=args.concurrency,
+        prompt=args.prompt,
+        stream=args.stream,
+        prefix="bench",
+    )
+    elapsed = time.perf_counter() - started
+
+    timings = list(main.turn_timings)
+    stages = {
+        "turn": [timing.total_s for timing in timings],
+        "first_outfit": [
+            timing.first_outfit_s for timing in timings if timing.first_outfit_s is not None
+        ],
+        **dict(sorted(stage_samples(tracing.tracer).items())),
+    }
+    print(
+        f"{args.turns} turns, concurrency {args.concurrency}, "
+        f"model latency {args.latency_ms:.0f} ms (jitter {args.jitter:.0%}), "
+        f"stream={'on' if args.stream else 'off'}, "
+        f"responses={'replayed' if args.replay else 'synthetic'}"
+    )
+    report(stages)
+    print(f"throughput: {args.turns / elapsed:.1f} turns/s")
+    print(
+        "model calls:", ", ".join(f"{name}={count}" for name, count in sorted(fake.calls.items()))
+    )
+    if args.profile:
+        roots = sorted(
+            (
+                span
+                for span in tracing.tracer.spans()
+                if span.kind == "agent" and span.parent_id is None and span.end is not None
+            ),
+            key=lambda span: span.duration_s,
+        )
+        if roots:
+            print(waterfall(tracing.tracer.subtree(roots[len(roots) // 2])))
+    if not stages["turn"]:
+        return None
+    return percentile(sorted(stages["turn"]), 0.5) * 1000
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fake model latency.")
+    parser.add_argument(
+        "--agent-latency",
+        default="",
+        help="Per-agent latency overrides, e.g. outfit_designer=900,explanation_agent=1200.",
+    )
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latency spread (fraction).")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--replay", action="store_true", help="Replay responses stored in data/llm_cache.db."
+    )
+    parser.add_argument("--stream", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument(
+        "--profile", action="store_true", help="Print the median turn's span waterfall."
+    )
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="Turn p50 budget.")
+    args = parser.parse_args()
+
+    turn_p50 = asyncio.run(run(args))
+    if turn_p50 is None:
+        raise SystemExit("no outfit turns completed; check the router and the demo wardrobe DB")
+    if turn_p50 > args.budget_ms:
+        raise SystemExit(f"turn p50 {turn_p50:.1f} ms exceeds the {args.budget_ms} ms budget")
+
+
+if __name__ == "__main__":
+    main_cli()
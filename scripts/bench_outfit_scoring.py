@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Benchmark batched outfit scoring on a large synthetic closet."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from agents.outfit_engine import DesignContext  # noqa: E402
+from agents.outfit_scoring import (  # noqa: E402
+    PreferenceSignals,
+    encode_wardrobe,
+    rank_candidates,
+    score_outfits,
+)
+
+CATEGORIES = ("top", "bottom", "outerwear", "shoes", "accessory")
+COLORS = ("black", "navy", "olive", "rust", "sky blue", "camel", "white", "burgundy")
+
+
+def synthetic_closet(size: int, rng: random.Random) -> list[dict[str, str]]:
+    today = date.today()
+    return [
+        {
+            "item_id": str(index),
+            "name": f"Item {index}",
+            "category": CATEGORIES[index % len(CATEGORIES)],
+            "color": rng.choice(COLORS),
+            "warmth_level": rng.choice(("light", "medium", "heavy")),
+            "formality": rng.choice(("casual", "smart_casual", "business", "formal")),
+            "last_worn_date": (today - timedelta(days=rng.randrange(60))).isoformat(),
+        }
+        for index in range(size)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--outfits", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    closet = synthetic_closet(args.items, rng)
+    by_category: dict[str, list[str]] = {}
+    for item in closet:
+        by_category.setdefault(item["category"], []).append(item["item_id"])
+    outfits = [
+        {
+            "outfit_id": f"bench-{index:05d}",
+            "outfit_items": [rng.choice(by_category[category]) for category in CATEGORIES],
+        }
+        for index in range(args.outfits)
+    ]
+    preferences = PreferenceSignals(
+        item_affinity={item["item_id"]: rng.uniform(-1, 1) for item in closet[::7]},
+        banned_items={item["item_id"] for item in closet[::53]},
+    )
+    context = DesignContext(occasion="office", temperature_c=12.0, precipitation_chance=0.6)
+
+    started = time.perf_counter()
+    features = encode_wardrobe(closet)
+    encode_ms = (time.perf_counter() - started) * 1000
+
+    samples = []
+    for _ in range(args.rounds):
+        started = time.perf_counter()
+        rank_candidates(score_outfits(outfits, features, context, preferences))
+        samples.append((time.perf_counter() - started) * 1000)
+
+    print(f"encode {args.items} items: {encode_ms:.2f} ms")
+    print(
+        f"score+rank {args.outfits} outfits: p50={statistics.median(samples):.2f} ms "
+        f"max={max(samples):.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
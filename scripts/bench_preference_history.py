@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Benchmark `fetch_preference_history` on a synthetic 1M-event feedback history.
+
+Builds a throwaway preference DB at schema v1, times the original four-query
+path (liked/disliked x outfits/items), upgrades the file in place to the latest
+schema, and times the consolidated query plus a full keyset-paginated walk.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.migrations import PREFERENCE_MIGRATIONS, apply_migrations  # noqa: E402
+
+DECISIONS = ("accepted", "rejected", "skipped")
+INTENTS = ("try_again", "maybe_later", "do_not_recommend", None)
+FOUR_QUERY_SQL = (
+    "SELECT * FROM outfit_feedback WHERE user_id = ? AND rating IS NOT NULL "
+    "AND rating >= ? ORDER BY created_at DESC LIMIT ?",
+    "SELECT * FROM outfit_feedback WHERE user_id = ? AND rating IS NOT NULL "
+    "AND rating <= ? ORDER BY created_at DESC LIMIT ?",
+    "SELECT * FROM item_feedback WHERE user_id = ? AND rating IS NOT NULL "
+    "AND rating >= ? ORDER BY created_at DESC LIMIT ?",
+    "SELECT * FROM item_feedback WHERE user_id = ? AND rating IS NOT NULL "
+    "AND rating <= ? ORDER BY created_at DESC LIMIT ?",
+)
+
+
+def build_db(db_path: Path, events: int, users: int, items_per_event: int) -> None:
+    """Create a v1 preference DB holding ``events`` outfit feedback rows."""
+    rng = random.Random(42)
+    start = datetime(2023, 1, 1)
+    with sqlite3.connect(db_path) as conn:
+        apply_migrations(conn, PREFERENCE_MIGRATIONS[:1])
+        outfit_rows = []
+        item_rows = []
+        for event_id in range(1, events + 1):
+            user_id = str(100 + event_id % users)
+            outfit_id = f"{user_id}-{event_id:07d}"
+            rating = rng.choice((None, 1, 2, 3, 4, 5))
+            created_at = (start + timedelta(seconds=rng.randrange(63_072_000))).isoformat(" ")
+            decision = rng.choice(DECISIONS)
+            intent = rng.choice(INTENTS)
+            outfit_rows.append(
+                (
+                    event_id,
+                    user_id,
+                    outfit_id,
+                    f"Outfit {event_id}",
+                    decision,
+                    rating,
+                    intent,
+                    created_at,
+                )
+            )
+            item_rows.extend(
+                (
+                    event_id,
+                    user_id,
+                    outfit_id,
+                    str(rng.randrange(500)),
+                    decision,
+                    rating,
+                    intent,
+                    created_at,
+                )
+                for _ in range(items_per_event)
+            )
+        conn.executemany(
+            """
+            INSERT INTO outfit_feedback (
+                event_id, user_id, outfit_id, outfit_name, decision, rating,
+                future_intent, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            outfit_rows,
+        )
+        conn.executemany(
+            """
+            INSERT INTO item_feedback (
+                event_id, user_id, outfit_id, item_id, decision, rating,
+                future_intent, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            item_rows,
+        )
+
+
+def time_calls(call, rounds: int) -> list[float]:
+    """Return per-call latencies in milliseconds."""
+    samples: list[float] = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def summarize(label: str, samples: list[float]) -> float:
+    ordered = sorted(samples)
+    p50 = statistics.median(ordered)
+    p95 = ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+    print(f"{label:<16} p50={p50:.2f} ms  p95={p95:.2f} ms  n={len(ordered)}")
+    return p50
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--items-per-event", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=25)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench_preferences.db"
+        started = time.perf_counter()
+        build_db(db_path, args.events, args.users, args.items_per_event)
+        print(f"built {args.events:,} events in {time.perf_counter() - started:.1f} s")
+        os.environ["PREFERENCE_DB_PATH"] = str(db_path)
+
+        from tools import preference_history_tool  # noqa: E402  (reads PREFERENCE_DB_PATH)
+
+        user_id = "101"
+        with sqlite3.connect(db_path) as conn:
+            # Time the v1 schema directly; the tool pool would migrate it on open.
+            def four_queries() -> None:
+                for sql, threshold in zip(FOUR_QUERY_SQL, (4, 1, 4, 1), strict=True):
+                    conn.execute(sql, [user_id, threshold, args.limit]).fetchall()
+
+            baseline = summarize(
+                "v1 (4 queries)", time_calls(four_queries, max(args.rounds // 10, 3))
+            )
+
+        # First tool call opens the pool, which upgrades the DB in place.
+        preference_history_tool.fetch_preference_history(user_id, limit=1)
+        consolidated = summarize(
+            "latest",
+            time_calls(
+                lambda: preference_history_tool.fetch_preference_history(user_id, limit=args.limit),
+                args.rounds,
+            ),
+        )
+        print(f"speedup: {baseline / consolidated:.1f}x")
+
+        def walk_pages() -> int:
+            rows = 0
+            cursor = None
+            while True:
+                page = preference_history_tool.fetch_preference_history_page(
+                    user_id, "liked_items", cursor=cursor, page_size=500
+                )
+                rows += len(page["rows"])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    return rows
+
+        started = time.perf_counter()
+        total = walk_pages()
+        print(f"paged {total:,} liked items in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""Measure prompt tokens for the designer, ranking and explanation agents per encoding.
+
+Builds synthetic closets of increasing size, runs the deterministic engine and
+scorer to get a realistic slate, and renders each agent's instruction with the
+payloads injected three ways: ``legacy`` (``str()`` of the state dicts, which is
+what ADK injected before the prompt tables), ``json`` and ``compact``
+(``FRESHFIT_PROMPT_ENCODING``). The script exits non-zero when the compact
+designer prompt for the budget closet is not at least ``--min-reduction``
+smaller than legacy.
+
+Token counts use a SentencePiece-like estimate by default (words split into
+~5-character pieces, digits and punctuation one token each). ``--tokenizer local``
+uses the Gemini local tokenizer (``pip install sentencepiece``; downloads the
+vocabulary on first use).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+from collections.abc import Callable
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("GOOGLE_API_KEY", "unused-by-this-benchmark")
+
+from agents.explanation_agent import INSTRUCTION as EXPLANATION_INSTRUCTION  # noqa: E402
+from agents.outfit_designer import POLISH_INSTRUCTION  # noqa: E402
+from agents.outfit_engine import DesignContext, generate_outfits  # noqa: E402
+from agents.outfit_scoring import (  # noqa: E402
+    encode_wardrobe,
+    preference_signals_from_affinity,
+    rank_candidates,
+    score_outfits,
+)
+from agents.preference_ranking import INSTRUCTION as RANKING_INSTRUCTION  # noqa: E402
+from agents.prompt_tables import (  # noqa: E402
+    candidate_score_table,
+    outfit_table,
+    wardrobe_table_from_state,
+)
+from agents.wardrobe_cataloger import WardrobeCatalogerOutput  # noqa: E402
+
+TODAY = date(2025, 11, 21)
+ENCODINGS = ("legacy", "json", "compact")
+PROMPTS = {
+    "designer": POLISH_INSTRUCTION,
+    "ranking": RANKING_INSTRUCTION,
+    "explanation": EXPLANATION_INSTRUCTION,
+}
+PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\??\}")
+
+CATEGORY_ZONES = {
+    "top": "upper",
+    "bottom": "lower",
+    "dress": "full_body",
+    "outerwear": "upper",
+    "shoes": "shoe",
+    "accessory": "accessory",
+}
+CATEGORY_WEIGHTS = (30, 22, 8, 12, 14, 14)
+NOUNS = {
+    "top": ("Oxford Shirt", "Silk Blouse", "Merino Sweater", "Graphic Tee", "Mock-Neck Top"),
+    "bottom": ("Chinos", "Tailored Trousers", "Dark Wash Denim", "Pleated Skirt", "Joggers"),
+    "dress": ("Wrap Dress", "Slip Dress", "Knit Midi Dress", "Shirt Dress"),
+    "outerwear": ("Wool Coat", "Denim Jacket", "Rain Shell", "Puffer Jacket", "Blazer"),
+    "shoes": ("Court Sneakers", "Chelsea Boots", "Loafers", "Ankle Boots", "Running Shoes"),
+    "accessory": ("Wool Scarf", "Leather Belt", "Statement Necklace", "Canvas Tote"),
+}
+COLORS = ("black", "navy", "ivory", "camel", "charcoal", "olive", "burgundy", "white", "grey")
+
+
+def build_state(items_count: int, seed: int = 42) -> dict[str, Any]:
+    """Session state as the cataloger, designer and ranking callbacks leave it."""
+
+    rng = random.Random(seed)
+    categories = rng.choices(tuple(CATEGORY_ZONES), weights=CATEGORY_WEIGHTS, k=items_count)
+    items = []
+    for index, category in enumerate(categories):
+        color = rng.choice(COLORS)
+        items.append(
+            {
+                "item_id": f"{category[:3]}_{index:04d}",
+                "user_id": "123",
+                "name": f"{color.title()} {rng.choice(NOUNS[category])}",
+                "category": category,
+                "color": color,
+                "warmth_level": rng.choice(("light", "medium", "heavy")),
+                "formality": rng.choice(("casual", "smart_casual", "business", "formal")),
+                "body_zone": CATEGORY_ZONES[category],
+                "last_worn_date": (
+                    (TODAY - timedelta(days=rng.randrange(60))).isoformat()
+                    if rng.random() < 0.8
+                    else None
+                ),
+            }
+        )
+    cataloger = WardrobeCatalogerOutput(
+        wardrobe_items=items,
+        clean_item_ids=[item["item_id"] for item in items],
+        wardrobe_summary=f"{items_count} items across all categories; outerwear available.",
+    ).model_dump()
+
+    context = DesignContext(
+        occasion="gallery opening", user_id="123", temperature_c=12.0, today=TODAY
+    )
+    slate = generate_outfits(items, context).model_dump()
+    scores = [
+        score.model_dump()
+        for score in rank_candidates(
+            score_outfits(
+                slate["outfits"],
+                encode_wardrobe(items, today=TODAY),
+                context,
+                preference_signals_from_affinity({}),
+            )
+        )
+    ]
+    return {"wardrobe_items": cataloger, "outfits": slate, "scores": scores}
+
+
+def payloads(state: dict[str, Any], encoding: str) -> dict[str, str]:
+    """Values injected for each instruction placeholder under ``encoding``."""
+
+    slate = state["outfits"]
+    if encoding == "legacy":
+        return {
+            "wardrobe_table": str(state["wardrobe_items"]),
+            "outfit_candidates": json.dumps(slate),
+            "outfit_table": str(slate),
+            "candidate_scores": json.dumps(state["scores"]),
+        }
+    return {
+        "wardrobe_table": wardrobe_table_from_state(state, encoding=encoding, today=TODAY),
+        "outfit_candidates": outfit_table(slate["outfits"], encoding=encoding),
+        "outfit_table": outfit_table(slate["outfits"], encoding=encoding),
+        "candidate_scores": candidate_score_table(state["scores"], encoding=encoding),
+    }
+
+
+def render(template: str, values: dict[str, str]) -> str:
+    return PLACEHOLDER.sub(lambda match: values.get(match.group(1), match.group(0)), template)
+
+
+_PIECE = re.compile(r"[A-Za-z]+|\d|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    return sum(
+        math.ceil(len(piece) / 5) if piece[0].isalpha() else 1 for piece in _PIECE.findall(text)
+    )
+
+
+def token_counter(name: str) -> Callable[[str], int]:
+    if name == "estimate":
+        return estimate_tokens
+    from google.genai.local_tokenizer import LocalTokenizer
+
+    tokenizer = LocalTokenizer(model_name="gemini-2.5-flash")
+    return lambda text: tokenizer.count_tokens(text).total_tokens
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="50,200,500", help="Comma-separated closet sizes.")
+    parser.add_argument("--tokenizer", choices=("estimate", "local"), default="estimate")
+    parser.add_argument("--budget-size", type=int, default=200)
+    parser.add_argument("--min-reduction", type=float, default=0.5)
+    args = parser.parse_args()
+
+    count = token_counter(args.tokenizer)
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    budget_reduction = None
+    print(f"{'items':>6} {'prompt':<12}" + "".join(f"{name:>10}" for name in ENCODINGS) + "  saved")
+    for size in sizes:
+        state = build_state(size)
+        rendered = {encoding: payloads(state, encoding) for encoding in ENCODINGS}
+        for prompt, template in PROMPTS.items():
+            tokens = {
+                encoding: count(render(template, rendered[encoding])) for encoding in ENCODINGS
+            }
+            reduction = 1 - tokens["compact"] / tokens["legacy"]
+            print(
+                f"{size:>6} {prompt:<12}"
+                + "".join(f"{tokens[encoding]:>10,}" for encoding in ENCODINGS)
+                + f"  {reduction:.0%}"
+            )
+            if size == args.budget_size and prompt == "designer":
+                budget_reduction = reduction
+
+    if budget_reduction is not None and budget_reduction < args.min_reduction:
+        raise SystemExit(
+            f"compact designer prompt for {args.budget_size} items is only "
+            f"{budget_reduction:.0%} smaller than legacy (need {args.min_reduction:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Benchmark `fetch_demo_wardrobe_items` on a 100k-item closet, before and after indexing.
+
+Builds a throwaway wardrobe DB at schema v1 (no secondary indexes), times the fetch
+path, upgrades the same file in place to the latest schema, and times it again. The
+script exits non-zero when the indexed p50 exceeds the budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.migrations import WARDROBE_MIGRATIONS, apply_migrations  # noqa: E402
+
+CATEGORIES = ("top", "bottom", "dress", "outerwear", "shoes", "accessory")
+QUERIES = (
+    {"categories": ["top", "bottom", "dress"], "limit": 50},
+    {"categories": ["shoes"], "limit": 25},
+    {"categories": ["outerwear", "accessory"], "limit": 50},
+)
+
+
+def build_db(db_path: Path, items_per_user: int, users: int) -> None:
+    """Create a v1 wardrobe DB and bulk-load synthetic items."""
+    rng = random.Random(42)
+    start = date(2023, 1, 1)
+    with sqlite3.connect(db_path) as conn:
+        apply_migrations(conn, WARDROBE_MIGRATIONS[:1])
+        conn.executemany(
+            """
+            INSERT INTO wardrobe_items (
+                user_id, name, category, color, warmth_level,
+                formality, body_zone, last_worn_date
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    str(user),
+                    f"Item {index:06d}",
+                    rng.choice(CATEGORIES),
+                    "black",
+                    "medium",
+                    "casual",
+                    "upper",
+                    (start + timedelta(days=rng.randrange(730))).isoformat(),
+                )
+                for user in range(100, 100 + users)
+                for index in range(items_per_user)
+            ),
+        )
+
+
+def time_fetch(fetch, user_id: str, rounds: int) -> list[float]:
+    """Return per-call latencies in milliseconds."""
+    samples: list[float] = []
+    for _ in range(rounds):
+        for query in QUERIES:
+            started = time.perf_counter()
+            fetch(user_id=user_id, **query)
+            samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def summarize(label: str, samples: list[float]) -> float:
+    ordered = sorted(samples)
+    p50 = statistics.median(ordered)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{label:<12} p50={p50:.3f} ms  p95={p95:.3f} ms  n={len(ordered)}")
+    return p50
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items-per-user", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--budget-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench_wardrobe.db"
+        build_db(db_path, args.items_per_user, args.users)
+        os.environ["WARDROBE_DB_PATH"] = str(db_path)
+        # Measure the SQL path, not the in-process snapshot cache.
+        os.environ["FRESHFIT_WARDROBE_CACHE_TTL_S"] = "0"
+
+        from tools import demo_wardrobe_tool  # noqa: E402  (reads WARDROBE_DB_PATH)
+
+        with sqlite3.connect(db_path) as conn:
+            # Time the v1 schema directly; the tool pool would migrate it on open.
+            def fetch_unindexed(user_id: str, categories: list[str], limit: int):
+                placeholders = ",".join("?" for _ in categories)
+                return conn.execute(
+                    "SELECT * FROM wardrobe_items WHERE user_id = ? "
+                    f"AND category IN ({placeholders}) ORDER BY category, name LIMIT ?",
+                    [user_id, *categories, limit],
+                ).fetchall()
+
+            baseline = summarize(
+                "v1 (scan)", time_fetch(fetch_unindexed, "101", max(args.rounds // 20, 3))
+            )
+
+        # First tool call opens the pool, which upgrades the DB in place.
+        demo_wardrobe_tool.fetch_demo_wardrobe_items(user_id="101", limit=1)
+        with sqlite3.connect(db_path) as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM wardrobe_items WHERE user_id = ? "
+                "AND category IN (?, ?) ORDER BY category, name LIMIT ?",
+                ["101", "top", "shoes", 50],
+            ).fetchall()
+        print("plan:", "; ".join(row[-1] for row in plan))
+
+        indexed = summarize(
+            "latest",
+            time_fetch(demo_wardrobe_tool.fetch_demo_wardrobe_items, "101", args.rounds),
+        )
+        print(f"speedup: {baseline / indexed:.1f}x")
+
+    if indexed > args.budget_ms:
+        raise SystemExit(f"p50 {indexed:.3f} ms exceeds the {args.budget_ms} ms budget")
+
+
+if __name__ == "__main__":
+    main()
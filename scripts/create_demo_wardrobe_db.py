@@ -4,10 +4,15 @@
 from __future__ import annotations
 
 import sqlite3
+import sys
 from pathlib import Path
 from typing import Iterable
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.migrations import migrate_wardrobe_db  # noqa: E402
+
 DB_PATH = PROJECT_ROOT / "data" / "demo_wardrobe.db"
 DEMO_USER_ID = "123"
 
@@ -306,26 +311,17 @@ WARDROBE_ITEMS: list[dict[str, str | int]] = [
 
 
 def reset_database() -> None:
-    """Drop and recreate the wardrobe_items table."""
-    if DB_PATH.exists():
-        DB_PATH.unlink()
+    """Drop the DB and rebuild it at the latest schema version."""
+    # Tools open the DB in WAL mode, so clear the -wal/-shm sidecars as well.
+    for path in (
+        DB_PATH,
+        DB_PATH.with_name(f"{DB_PATH.name}-wal"),
+        DB_PATH.with_name(f"{DB_PATH.name}-shm"),
+    ):
+        path.unlink(missing_ok=True)
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
     with sqlite3.connect(DB_PATH) as conn:
-        conn.execute(
-            """
-            CREATE TABLE wardrobe_items (
-                item_id INTEGER PRIMARY KEY,
-                user_id TEXT NOT NULL,
-                name TEXT NOT NULL,
-                category TEXT NOT NULL,
-                color TEXT,
-                warmth_level TEXT,
-                formality TEXT,
-                body_zone TEXT,
-                last_worn_date TEXT
-            )
-            """
-        )
+        migrate_wardrobe_db(conn)
 
 
 def seed_items(items: Iterable[dict[str, str | int]]) -> None:
@@ -4,9 +4,16 @@
 from __future__ import annotations
 
 import sqlite3
+import sys
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.affinity import apply_feedback_events  # noqa: E402
+from tools.metrics_rollup import apply_metrics_events  # noqa: E402
+from tools.migrations import migrate_preference_db  # noqa: E402
+
 DB_PATH = PROJECT_ROOT / "data" / "demo_preferences.db"
 USER_ID = "123"
 
@@ -62,50 +69,16 @@ def reset_preference_db() -> None:
     """Drop and recreate the demo preference database schema."""
 
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    if DB_PATH.exists():
-        DB_PATH.unlink()
+    # Tools open the DB in WAL mode, so clear the -wal/-shm sidecars as well.
+    for path in (
+        DB_PATH,
+        DB_PATH.with_name(f"{DB_PATH.name}-wal"),
+        DB_PATH.with_name(f"{DB_PATH.name}-shm"),
+    ):
+        path.unlink(missing_ok=True)
 
     with sqlite3.connect(DB_PATH) as conn:
-        conn.executescript(
-            """
-            CREATE TABLE outfit_feedback (
-                event_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                outfit_id TEXT NOT NULL,
-                outfit_name TEXT,
-                outfit_description TEXT,
-                decision TEXT NOT NULL CHECK (
-                    decision IN ('accepted', 'rejected', 'skipped')
-                ),
-                rating INTEGER CHECK (rating BETWEEN 1 AND 5),
-                future_intent TEXT CHECK (
-                    future_intent IN ('try_again', 'maybe_later', 'do_not_recommend')
-                ),
-                notes TEXT,
-                tags TEXT,
-                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-            );
-
-            CREATE TABLE item_feedback (
-                item_feedback_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                event_id INTEGER NOT NULL,
-                user_id TEXT NOT NULL,
-                outfit_id TEXT NOT NULL,
-                item_id TEXT NOT NULL,
-                item_short_name TEXT,
-                decision TEXT NOT NULL CHECK (
-                    decision IN ('accepted', 'rejected', 'skipped')
-                ),
-                rating INTEGER CHECK (rating BETWEEN 1 AND 5),
-                future_intent TEXT CHECK (
-                    future_intent IN ('try_again', 'maybe_later', 'do_not_recommend')
-                ),
-                notes TEXT,
-                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (event_id) REFERENCES outfit_feedback (event_id) ON DELETE CASCADE
-            );
-            """
-        )
+        migrate_preference_db(conn)
 
 
 def seed_preferences() -> None:
@@ -181,6 +154,8 @@ def seed_preferences() -> None:
                     for item in outfit["outfit_item_details"]
                 ],
             )
+            apply_feedback_events(conn, [event_id])
+            apply_metrics_events(conn, [event_id])
 
         outfit_count = conn.execute("SELECT COUNT(*) FROM outfit_feedback").fetchone()[
             0
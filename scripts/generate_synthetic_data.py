@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Generate large synthetic wardrobe and preference DBs for scale testing.
+
+Writes ``wardrobe.db`` and ``preferences.db`` for ``--users`` users with
+``--items-per-user`` closet items and ``--events-per-user`` feedback events each
+(see `tools/synthetic_data.py` for the distributions), then prints the row
+counts, the ingest rate, and the environment variables that point the CLI and
+benchmarks at the new files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.synthetic_data import SyntheticSpec, generate_synthetic_dbs  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--out-dir", type=Path, default=PROJECT_ROOT / "data" / "synthetic")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--items-per-user", type=int, default=500)
+    parser.add_argument("--events-per-user", type=int, default=2000)
+    parser.add_argument("--history-days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--force", action="store_true", help="Replace existing DBs.")
+    args = parser.parse_args()
+
+    spec = SyntheticSpec(
+        users=args.users,
+        items_per_user=args.items_per_user,
+        events_per_user=args.events_per_user,
+        history_days=args.history_days,
+        seed=args.seed,
+        batch_size=args.batch_size,
+    )
+    try:
+        dataset = generate_synthetic_dbs(args.out_dir, spec, overwrite=args.force)
+    except FileExistsError as exc:
+        raise SystemExit(f"{exc} Use --force.") from exc
+
+    rows = dataset.wardrobe_rows + dataset.outfit_rows + dataset.item_rows
+    print(
+        f"wardrobe_items={dataset.wardrobe_rows:,}  outfit_feedback={dataset.outfit_rows:,}  "
+        f"item_feedback={dataset.item_rows:,}"
+    )
+    print(f"loaded {rows:,} rows in {dataset.seconds:.1f} s ({rows / dataset.seconds:,.0f} rows/s)")
+    print(f"users {spec.user_ids()[0]}..{spec.user_ids()[-1]}; point the tools at the data with:")
+    for name, value in dataset.environ().items():
+        print(f"  export {name}={value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Upgrade the FreshFit SQLite databases in place (no reset, no reseed)."""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.migrations import (  # noqa: E402
+    current_version,
+    migrate_preference_db,
+    migrate_wardrobe_db,
+)
+
+DATABASES = {
+    PROJECT_ROOT / "data" / "demo_wardrobe.db": migrate_wardrobe_db,
+    PROJECT_ROOT / "data" / "demo_preferences.db": migrate_preference_db,
+}
+
+
+def main() -> None:
+    """Apply pending migrations to every existing FreshFit database."""
+    for db_path, migrate in DATABASES.items():
+        if not db_path.exists():
+            print(f"Skipping {db_path} (not found)")
+            continue
+        with sqlite3.connect(db_path) as conn:
+            applied = migrate(conn)
+            version = current_version(conn)
+        if applied:
+            print(f"Migrated {db_path} -> v{version} (applied {applied})")
+        else:
+            print(f"{db_path} already at v{version}")
+
+
+if __name__ == "__main__":
+    main()
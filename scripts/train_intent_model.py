@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Train the router's TF-IDF intent model from logged router turns.
+
+Every routed turn is appended to ``data/router_turns.jsonl`` (see
+``agents/intent_router.py``). Turns the Gemini router labelled (``source=model``)
+are the ones the rules could not settle, so they carry the most signal; rule
+decisions can be included to bulk out a small log.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from agents.intent_router import (  # noqa: E402
+    INTENT_MODEL_PATH,
+    MIN_CONFIDENCE,
+    TURN_LOG_PATH,
+    TfidfIntentModel,
+    read_turn_log,
+    train_from_log,
+)
+
+
+def _holdout_report(turns: list[dict], sources: set[str] | None, seed: int) -> None:
+    """Print accuracy and coverage at MIN_CONFIDENCE on a 20% holdout."""
+
+    shuffled = turns[:]
+    random.Random(seed).shuffle(shuffled)
+    split = max(1, len(shuffled) // 5)
+    holdout, train = shuffled[:split], shuffled[split:]
+    try:
+        model = train_from_log(train, sources=sources)
+    except ValueError as exc:
+        print(f"Skipping holdout evaluation: {exc}")
+        return
+    dispatched = correct = 0
+    for turn in holdout:
+        decision = model.classify(turn["text"])
+        if decision.intent is not None and decision.confidence >= MIN_CONFIDENCE:
+            dispatched += 1
+            correct += decision.intent == turn["intent"]
+    print(
+        f"Holdout: {len(holdout)} turns, {dispatched} dispatched locally "
+        f"({dispatched / len(holdout):.0%}), accuracy when dispatched "
+        f"{(correct / dispatched if dispatched else 0.0):.1%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--log", default=TURN_LOG_PATH, help="Router turn log (JSONL).")
+    parser.add_argument("--output", type=Path, default=INTENT_MODEL_PATH)
+    parser.add_argument(
+        "--sources",
+        default="model,rules,tfidf",
+        help="Comma-separated turn sources to train on (default: all).",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    sources = {source.strip() for source in args.sources.split(",") if source.strip()}
+    turns = read_turn_log(args.log)
+    print(f"Read {len(turns)} logged turns from {args.log}")
+    _holdout_report(turns, sources, args.seed)
+
+    try:
+        model: TfidfIntentModel = train_from_log(turns, sources=sources)
+    except ValueError as exc:
+        raise SystemExit(f"Not enough data to train: {exc}") from exc
+    model.save(args.output)
+    print(f"Saved intent model ({len(model.idf)} terms) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
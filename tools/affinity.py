@@ -0,0 +1,200 @@
+"""Incremental maintenance of the item/combo affinity summary tables.
+
+``item_affinity`` and ``combo_affinity`` fold raw ``outfit_feedback`` /
+``item_feedback`` events into one row per (user, item) and (user, outfit combo),
+so ranking reads precomputed counts instead of replaying the whole history.
+Writers call :func:`apply_feedback_events` in the same transaction that inserts
+the feedback rows; :func:`rebuild_affinity` replays everything from scratch.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterable, Sequence
+from typing import Any, Optional
+
+DO_NOT_RECOMMEND = "do_not_recommend"
+
+# Counters accumulate. The intent/flag follow the newest event that carried an
+# explicit future_intent (by created_at, not arrival order), so an event without
+# one never clears an earlier intent.
+_ITEM_UPSERT = """
+INSERT INTO item_affinity (
+    user_id, item_id, item_short_name, feedback_count, accepted_count,
+    rating_count, rating_sum, last_seen_at, last_intent, last_intent_at,
+    do_not_recommend
+) VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (user_id, item_id) DO UPDATE SET
+    item_short_name = COALESCE(excluded.item_short_name, item_short_name),
+    feedback_count = feedback_count + 1,
+    accepted_count = accepted_count + excluded.accepted_count,
+    rating_count = rating_count + excluded.rating_count,
+    rating_sum = rating_sum + excluded.rating_sum,
+    last_intent = CASE
+        WHEN excluded.last_intent_at >= COALESCE(last_intent_at, '')
+        THEN excluded.last_intent ELSE last_intent END,
+    do_not_recommend = CASE
+        WHEN excluded.last_intent_at >= COALESCE(last_intent_at, '')
+        THEN excluded.do_not_recommend ELSE do_not_recommend END,
+    last_intent_at = CASE
+        WHEN excluded.last_intent_at >= COALESCE(last_intent_at, '')
+        THEN excluded.last_intent_at ELSE last_intent_at END,
+    last_seen_at = MAX(last_seen_at, excluded.last_seen_at)
+"""
+
+_COMBO_UPSERT = """
+INSERT INTO combo_affinity (
+    user_id, combo_key, outfit_id, outfit_name, item_count, feedback_count,
+    accepted_count, rating_count, rating_sum, last_seen_at, last_intent,
+    last_intent_at, do_not_recommend
+) VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (user_id, combo_key) DO UPDATE SET
+    outfit_id = CASE
+        WHEN excluded.last_seen_at >= last_seen_at THEN excluded.outfit_id ELSE outfit_id END,
+    outfit_name = CASE
+        WHEN excluded.last_seen_at >= last_seen_at
+        THEN COALESCE(excluded.outfit_name, outfit_name) ELSE outfit_name END,
+    feedback_count = feedback_count + 1,
+    accepted_count = accepted_count + excluded.accepted_count,
+    rating_count = rating_count + excluded.rating_count,
+    rating_sum = rating_sum + excluded.rating_sum,
+    last_intent = CASE
+        WHEN excluded.last_intent_at >= COALESCE(last_intent_at, '')
+        THEN excluded.last_intent ELSE last_intent END,
+    do_not_recommend = CASE
+        WHEN excluded.last_intent_at >= COALESCE(last_intent_at, '')
+        THEN excluded.do_not_recommend ELSE do_not_recommend END,
+    last_intent_at = CASE
+        WHEN excluded.last_intent_at >= COALESCE(last_intent_at, '')
+        THEN excluded.last_intent_at ELSE last_intent_at END,
+    last_seen_at = MAX(last_seen_at, excluded.last_seen_at)
+"""
+
+_EVENT_SELECT = """
+SELECT
+    o.event_id,
+    o.user_id,
+    o.outfit_id,
+    o.outfit_name,
+    o.decision,
+    o.rating,
+    o.future_intent,
+    o.created_at,
+    GROUP_CONCAT(i.item_id, char(31)) AS item_ids
+FROM outfit_feedback AS o
+LEFT JOIN item_feedback AS i ON i.event_id = o.event_id
+{where}
+GROUP BY o.event_id
+ORDER BY o.created_at, o.event_id
+"""
+
+_ITEM_SELECT = """
+SELECT
+    user_id,
+    item_id,
+    item_short_name,
+    decision,
+    rating,
+    future_intent,
+    created_at
+FROM item_feedback
+{where}
+ORDER BY created_at, item_feedback_id
+"""
+
+
+def combo_key(item_ids: Iterable[Any]) -> str:
+    """Canonical, order-independent key for a set of wardrobe item ids."""
+
+    return ",".join(sorted({str(item_id) for item_id in item_ids}))
+
+
+def _signal_columns(
+    decision: Optional[str],
+    rating: Optional[int],
+    future_intent: Optional[str],
+    created_at: str,
+) -> tuple[Any, ...]:
+    """(accepted, rated, rating_sum, last_seen_at, intent, intent_at, banned) values."""
+
+    return (
+        int(decision == "accepted"),
+        int(rating is not None),
+        int(rating or 0),
+        created_at,
+        future_intent,
+        created_at if future_intent else None,
+        int(future_intent == DO_NOT_RECOMMEND),
+    )
+
+
+def _item_params(row: sqlite3.Row | Sequence[Any]) -> tuple[Any, ...]:
+    user_id, item_id, short_name, decision, rating, intent, created_at = row
+    return (
+        user_id,
+        str(item_id),
+        short_name,
+        *_signal_columns(decision, rating, intent, created_at),
+    )
+
+
+def _combo_params(row: sqlite3.Row) -> Optional[tuple[Any, ...]]:
+    item_ids = row["item_ids"].split(chr(31)) if row["item_ids"] else []
+    if not item_ids:
+        return None
+    key = combo_key(item_ids)
+    return (
+        row["user_id"],
+        key,
+        row["outfit_id"],
+        row["outfit_name"],
+        key.count(",") + 1,
+        *_signal_columns(row["decision"], row["rating"], row["future_intent"], row["created_at"]),
+    )
+
+
+def _fold(
+    conn: sqlite3.Connection,
+    item_where: str,
+    event_where: str,
+    params: Sequence[Any],
+) -> None:
+    # Reads stream from the raw tables while the upserts write the summaries.
+    item_rows = conn.execute(_ITEM_SELECT.format(where=item_where), params)
+    conn.executemany(_ITEM_UPSERT, (_item_params(tuple(row)) for row in item_rows))
+    event_rows = conn.cursor()
+    event_rows.row_factory = sqlite3.Row
+    event_rows.execute(_EVENT_SELECT.format(where=event_where), params)
+    combos = (_combo_params(row) for row in event_rows)
+    conn.executemany(_COMBO_UPSERT, (combo for combo in combos if combo is not None))
+
+
+def apply_feedback_events(conn: sqlite3.Connection, event_ids: Sequence[int]) -> None:
+    """Fold newly inserted feedback events (and their item rows) into the summaries.
+
+    Call inside the transaction that wrote the events so the raw rows and the
+    summaries commit together. Each event must be applied exactly once.
+    """
+
+    if not event_ids:
+        return
+    placeholders = ",".join("?" for _ in event_ids)
+    _fold(
+        conn,
+        f"WHERE event_id IN ({placeholders})",
+        f"WHERE o.event_id IN ({placeholders})",
+        list(event_ids),
+    )
+
+
+def rebuild_affinity(conn: sqlite3.Connection, user_id: Optional[str] = None) -> None:
+    """Recompute the summaries from raw feedback for one user (or everyone)."""
+
+    if user_id is None:
+        conn.execute("DELETE FROM item_affinity")
+        conn.execute("DELETE FROM combo_affinity")
+        _fold(conn, "", "", [])
+        return
+    conn.execute("DELETE FROM item_affinity WHERE user_id = ?", [user_id])
+    conn.execute("DELETE FROM combo_affinity WHERE user_id = ?", [user_id])
+    _fold(conn, "WHERE user_id = ?", "WHERE o.user_id = ?", [user_id])
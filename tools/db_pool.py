@@ -0,0 +1,359 @@
+"""Shared SQLite connection pool for FreshFit tools."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+DEFAULT_POOL_SIZE = int(os.getenv("FRESHFIT_DB_POOL_SIZE", "4"))
+DEFAULT_CACHE_KIB = 8192  # negative PRAGMA cache_size => KiB, so ~8 MiB per connection
+STATEMENT_CACHE_SIZE = 256
+BUSY_TIMEOUT_S = 30.0
+# Statements kept per checkout for query observers (the count covers all of them).
+TRACED_STATEMENTS = 20
+
+
+def _owner_key() -> tuple[int, Optional[int]]:
+    """Identify the current thread (and asyncio task, when one is running)."""
+
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return threading.get_ident(), id(task) if task is not None else None
+
+
+@dataclass(frozen=True)
+class QueryTrace:
+    """One connection checkout as seen by a query observer."""
+
+    db_path: Path
+    statements: tuple[str, ...]
+    statement_count: int
+    started: float
+    ended: float
+    acquire_s: float
+
+
+QueryObserver = Callable[[QueryTrace], None]
+_query_observers: tuple[QueryObserver, ...] = ()
+_observers_lock = threading.Lock()
+
+
+def add_query_observer(observer: QueryObserver) -> None:
+    """Call ``observer`` with a `QueryTrace` after every outermost checkout.
+
+    Observers run on the thread that used the connection. With none registered,
+    connections are not traced at all.
+    """
+
+    global _query_observers
+    with _observers_lock:
+        if observer not in _query_observers:
+            _query_observers = (*_query_observers, observer)
+
+
+def remove_query_observer(observer: QueryObserver) -> None:
+    global _query_observers
+    with _observers_lock:
+        _query_observers = tuple(o for o in _query_observers if o != observer)
+
+
+class PoolStats:
+    """Thread-safe counters used to size the pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reentrant = 0
+        self.waits = 0
+        self.wait_time_s = 0.0
+        self.max_wait_s = 0.0
+
+    def record(self, *, hit: bool, waited_s: float = 0.0) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if waited_s > 0:
+                self.waits += 1
+                self.wait_time_s += waited_s
+                self.max_wait_s = max(self.max_wait_s, waited_s)
+
+    def record_reentrant(self) -> None:
+        with self._lock:
+            self.reentrant += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            acquisitions = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reentrant": self.reentrant,
+                "hit_rate": self.hits / acquisitions if acquisitions else None,
+                "waits": self.waits,
+                "wait_time_s": round(self.wait_time_s, 6),
+                "max_wait_s": round(self.max_wait_s, 6),
+            }
+
+
+class ConnectionPool:
+    """Bounded pool of long-lived SQLite connections for a single database file.
+
+    Connections are opened lazily in WAL mode with ``synchronous=NORMAL``, a larger
+    page cache, and a generous prepared-statement cache. ``initializer`` (typically a
+    schema migration) runs once, on the first connection. A thread (or asyncio task)
+    that already holds a connection gets the same one back when it re-enters
+    :meth:`connection`, so nested tool helpers never deadlock on the pool. Seeded
+    databases raise ``FileNotFoundError`` when absent; caches pass
+    ``create_missing=True`` to have the file created instead.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        max_size: int = DEFAULT_POOL_SIZE,
+        cache_kib: int = DEFAULT_CACHE_KIB,
+        missing_hint: Optional[str] = None,
+        initializer: Optional[Callable[[sqlite3.Connection], Any]] = None,
+        create_missing: bool = False,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.db_path = Path(db_path)
+        self.max_size = max_size
+        self.cache_kib = cache_kib
+        self.missing_hint = missing_hint
+        self.initializer = initializer
+        self.create_missing = create_missing
+        self._initialized = initializer is None
+        self._init_lock = threading.Lock()
+        self.stats = PoolStats()
+        self._idle: list[sqlite3.Connection] = []
+        self._opened = 0
+        self._held: dict[tuple[int, Optional[int]], list[Any]] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        if self.create_missing:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        elif not self.db_path.exists():
+            message = f"Database not found at {self.db_path}."
+            if self.missing_hint:
+                message = f"{message} {self.missing_hint}"
+            raise FileNotFoundError(message)
+
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_S,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_kib}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized and self.initializer is not None:
+                    try:
+                        self.initializer(conn)
+                    except Exception:
+                        conn.close()
+                        raise
+                    self._initialized = True
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        waited_s = 0.0
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"Connection pool for {self.db_path} is closed.")
+            if self._idle:
+                conn = self._idle.pop()
+                self.stats.record(hit=True)
+                return conn
+            if self._opened >= self.max_size:
+                started = time.perf_counter()
+                while not self._idle:
+                    self._cond.wait()
+                    if self._closed:
+                        raise RuntimeError(f"Connection pool for {self.db_path} is closed.")
+                waited_s = time.perf_counter() - started
+                conn = self._idle.pop()
+                self.stats.record(hit=True, waited_s=waited_s)
+                return conn
+            self._opened += 1
+
+        try:
+            conn = self._open()
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._cond.notify()
+            raise
+        self.stats.record(hit=False)
+        return conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        with self._cond:
+            if self._closed:
+                conn.close()
+                self._opened -= 1
+                return
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Yield a pooled connection; commit on success and roll back on error.
+
+        Mirrors ``with sqlite3.connect(...) as conn`` semantics so call sites can
+        swap over without changing their transaction handling.
+        """
+
+        owner = _owner_key()
+        with self._cond:
+            held = self._held.get(owner)
+            if held is not None:
+                held[1] += 1
+        if held is not None:
+            self.stats.record_reentrant()
+            try:
+                yield held[0]
+            finally:
+                with self._cond:
+                    held[1] -= 1
+            return
+
+        observers = _query_observers
+        if observers:
+            with self._traced(owner, observers) as conn:
+                yield conn
+            return
+
+        conn = self._acquire()
+        with self._cond:
+            self._held[owner] = [conn, 1]
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            with self._cond:
+                del self._held[owner]
+            self._release(conn)
+
+    @contextmanager
+    def _traced(
+        self, owner: tuple[int, Optional[int]], observers: tuple[QueryObserver, ...]
+    ) -> Iterator[sqlite3.Connection]:
+        """`connection` with statement capture for query observers."""
+
+        statements: list[str] = []
+        count = 0
+
+        def trace(statement: str) -> None:
+            nonlocal count
+            count += 1
+            if len(statements) < TRACED_STATEMENTS:
+                statements.append(statement)
+
+        started = time.perf_counter()
+        conn = self._acquire()
+        acquire_s = time.perf_counter() - started
+        with self._cond:
+            self._held[owner] = [conn, 1]
+        conn.set_trace_callback(trace)
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.set_trace_callback(None)
+            with self._cond:
+                del self._held[owner]
+            self._release(conn)
+            query = QueryTrace(
+                db_path=self.db_path,
+                statements=tuple(statements),
+                statement_count=count,
+                started=started,
+                ended=time.perf_counter(),
+                acquire_s=acquire_s,
+            )
+            for observer in observers:
+                observer(query)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return counters plus current pool occupancy."""
+
+        with self._cond:
+            occupancy = {
+                "open": self._opened,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+            }
+        return {"db_path": str(self.db_path), **occupancy, **self.stats.snapshot()}
+
+    def close(self) -> None:
+        """Close idle connections; in-flight ones close when released."""
+
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._opened -= 1
+            self._cond.notify_all()
+
+
+_POOLS: dict[Path, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(db_path: Path, **kwargs: Any) -> ConnectionPool:
+    """Return the process-wide pool for ``db_path``, creating it on first use."""
+
+    key = Path(db_path).resolve()
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = ConnectionPool(key, **kwargs)
+            _POOLS[key] = pool
+        return pool
+
+
+def pool_stats() -> dict[str, dict[str, Any]]:
+    """Return hit/miss/wait counters for every pool opened in this process."""
+
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+    return {str(pool.db_path): pool.snapshot() for pool in pools}
+
+
+def close_all_pools() -> None:
+    """Close and forget every pool (e.g., after a seed script recreates a DB)."""
+
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
@@ -2,13 +2,30 @@
 
 from __future__ import annotations
 
+import os
 import sqlite3
+from collections.abc import Sequence
+from datetime import date
 from pathlib import Path
 from typing import Any, Optional
 
 from google.adk.tools.function_tool import FunctionTool
 
-DB_PATH = Path(__file__).resolve().parents[1] / "data" / "demo_wardrobe.db"
+from tools.db_pool import get_pool
+from tools.migrations import migrate_wardrobe_db, read_data_version
+from tools.wardrobe_cache import wardrobe_cache
+
+DB_PATH = Path(
+    os.getenv(
+        "WARDROBE_DB_PATH",
+        Path(__file__).resolve().parents[1] / "data" / "demo_wardrobe.db",
+    )
+)
+_POOL = get_pool(
+    DB_PATH,
+    missing_hint="Run scripts/create_demo_wardrobe_db.py first.",
+    initializer=migrate_wardrobe_db,
+)
 
 
 def _row_to_dict(row: sqlite3.Row) -> dict[str, Any]:
@@ -41,11 +58,11 @@ def fetch_demo_wardrobe_items(
         Dict containing an `items` list with wardrobe item dicts.
     """
 
-    if not DB_PATH.exists():
-        raise FileNotFoundError(
-            f"Demo wardrobe database not found at {DB_PATH}. "
-            "Run scripts/create_demo_wardrobe_db.py first."
-        )
+    cache_key = (tuple(sorted(set(categories))) if categories else None, limit or None)
+    cached = wardrobe_cache.get(user_id, cache_key)
+    if cached is not None:
+        return cached
+    generation = wardrobe_cache.generation(user_id)
 
     query = """
         SELECT
@@ -62,7 +79,6 @@ def fetch_demo_wardrobe_items(
         WHERE user_id = ?
     """
     params: list[Any] = [user_id]
-    params: list[Any] = [user_id]
 
     if categories:
         placeholders = ",".join("?" for _ in categories)
@@ -75,11 +91,89 @@ def fetch_demo_wardrobe_items(
         query += " LIMIT ?"
         params.append(limit)
 
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
+    with _POOL.connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+
+    result = {"items": [_row_to_dict(row) for row in rows]}
+    wardrobe_cache.put(user_id, cache_key, result, generation=generation)
+    return result
+
+
+def fetch_rotation_items(
+    user_id: str,
+    *,
+    rested_before: str,
+    categories: Optional[Sequence[str]] = None,
+    exclude_item_ids: Sequence[str] = (),
+    recent: bool = False,
+) -> list[dict[str, Any]]:
+    """Return wardrobe rows split by the rotation rule, filtered in SQL.
+
+    Args:
+        user_id: Wardrobe owner.
+        rested_before: ISO date; items never worn or last worn before it are rested.
+        categories: Optional category filter.
+        exclude_item_ids: Item ids to leave out (e.g., banned items).
+        recent: Return the complement instead: items worn on or after
+            ``rested_before``, least recently worn first.
+
+    Returns:
+        Wardrobe item dicts (rested items ordered by category, name).
+    """
+
+    cache_key = (
+        "rotation",
+        rested_before,
+        tuple(sorted(set(categories))) if categories else None,
+        tuple(sorted(set(exclude_item_ids))),
+        recent,
+    )
+    cached = wardrobe_cache.get(user_id, cache_key)
+    if cached is not None:
+        return cached["items"]
+    generation = wardrobe_cache.generation(user_id)
+
+    # Rested rows come back in (user_id, category, name) index order; the recent
+    # fallback is a range scan on (user_id, last_worn_date).
+    if recent:
+        where = "last_worn_date >= ?"
+        order = "last_worn_date, category, name"
+    else:
+        where = "(last_worn_date IS NULL OR last_worn_date < ?)"
+        order = "category, name"
+    query = f"""
+        SELECT
+            item_id,
+            user_id,
+            name,
+            category,
+            color,
+            warmth_level,
+            formality,
+            body_zone,
+            last_worn_date
+        FROM wardrobe_items
+        WHERE user_id = ? AND {where}
+    """
+    params: list[Any] = [user_id, rested_before]
+
+    if categories:
+        placeholders = ",".join("?" for _ in categories)
+        query += f" AND category IN ({placeholders})"
+        params.extend(categories)
+    if exclude_item_ids:
+        placeholders = ",".join("?" for _ in exclude_item_ids)
+        query += f" AND CAST(item_id AS TEXT) NOT IN ({placeholders})"
+        params.extend(str(item_id) for item_id in exclude_item_ids)
+
+    query += f" ORDER BY {order}"
+
+    with _POOL.connection() as conn:
         rows = conn.execute(query, params).fetchall()
 
-    return {"items": [_row_to_dict(row) for row in rows]}
+    items = [_row_to_dict(row) for row in rows]
+    wardrobe_cache.put(user_id, cache_key, {"items": items}, generation=generation)
+    return items
 
 
 def add_wardrobe_item(
@@ -107,10 +201,7 @@ def add_wardrobe_item(
     Returns:
         Confirmation dict with the new item_id.
     """
-    if not DB_PATH.exists():
-        raise FileNotFoundError(f"DB not found at {DB_PATH}")
-
-    with sqlite3.connect(DB_PATH) as conn:
+    with _POOL.connection() as conn:
         cursor = conn.execute(
             """
             INSERT INTO wardrobe_items (
@@ -131,6 +222,7 @@ def add_wardrobe_item(
         )
         new_id = cursor.lastrowid
 
+    wardrobe_cache.invalidate(user_id)
     return {"status": "success", "item_id": str(new_id), "name": name}
 
 
@@ -143,10 +235,10 @@ def delete_wardrobe_item(item_id: str) -> dict[str, Any]:
     Returns:
         Success or error message.
     """
-    if not DB_PATH.exists():
-        raise FileNotFoundError(f"DB not found at {DB_PATH}")
-
-    with sqlite3.connect(DB_PATH) as conn:
+    with _POOL.connection() as conn:
+        owner = conn.execute(
+            "SELECT user_id FROM wardrobe_items WHERE item_id = ?", (item_id,)
+        ).fetchone()
         cursor = conn.execute(
             "DELETE FROM wardrobe_items WHERE item_id = ?", (item_id,)
         )
@@ -154,9 +246,71 @@ def delete_wardrobe_item(item_id: str) -> dict[str, Any]:
 
     if deleted_count == 0:
         return {"status": "error", "message": f"Item {item_id} not found."}
+    wardrobe_cache.invalidate(owner["user_id"] if owner else None)
     return {"status": "success", "message": f"Item {item_id} deleted."}
 
 
+def parse_worn_date(worn_date: Optional[str]) -> str:
+    """Return ``worn_date`` as an ISO date string, defaulting to today.
+
+    Raises:
+        ValueError: If ``worn_date`` is not an ISO date or lies in the future.
+    """
+
+    if not worn_date:
+        return date.today().isoformat()
+    try:
+        worn = date.fromisoformat(worn_date.strip())
+    except ValueError:
+        raise ValueError(
+            f"worn_date must be an ISO date (YYYY-MM-DD), got {worn_date!r}."
+        ) from None
+    if worn > date.today():
+        raise ValueError(f"worn_date {worn.isoformat()} is in the future.")
+    return worn.isoformat()
+
+
+def record_wear_events(
+    events: Sequence[tuple[str, Sequence[str], Optional[str]]],
+) -> int:
+    """Apply (user_id, item_ids, worn_date) wear events in a single transaction.
+
+    ``last_worn_date`` only moves forward, so replayed or out-of-order events are
+    harmless; dates are checked with :func:`parse_worn_date` first so a bad one
+    cannot pin an item. Returns the number of item rows updated.
+    """
+
+    params = [
+        (parse_worn_date(worn_date), user_id, str(item_id))
+        for user_id, item_ids, worn_date in events
+        for item_id in item_ids
+    ]
+    if not params:
+        return 0
+    with _POOL.connection() as conn:
+        updated = conn.executemany(
+            """
+            UPDATE wardrobe_items
+            SET last_worn_date = ?1
+            WHERE user_id = ?2
+              AND item_id = ?3
+              AND (last_worn_date IS NULL OR last_worn_date < ?1)
+            """,
+            params,
+        ).rowcount
+
+    for user_id in {user_id for user_id, _, _ in events}:
+        wardrobe_cache.invalidate(user_id)
+    return updated
+
+
+def wardrobe_data_version(user_id: str) -> str:
+    """Stamp that changes whenever any of ``user_id``'s wardrobe rows change."""
+
+    with _POOL.connection() as conn:
+        return read_data_version(conn, user_id)
+
+
 demo_wardrobe_tool = FunctionTool(fetch_demo_wardrobe_items)
 add_wardrobe_tool = FunctionTool(add_wardrobe_item)
 delete_wardrobe_tool = FunctionTool(delete_wardrobe_item)
@@ -0,0 +1,230 @@
+"""Batched persistence for CLI feedback events into the preference DB."""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from tools.affinity import apply_feedback_events
+from tools.db_pool import get_pool
+from tools.metrics_rollup import apply_metrics_events
+from tools.migrations import migrate_preference_db
+from tools.preference_history_tool import DB_PATH
+
+VALID_DECISIONS = {"accepted", "rejected", "skipped"}
+VALID_INTENTS = {"try_again", "maybe_later", "do_not_recommend"}
+
+_POOL = get_pool(
+    DB_PATH,
+    missing_hint="Run scripts/create_preference_db.py first.",
+    initializer=migrate_preference_db,
+)
+
+
+def _validate_event(event: Mapping[str, Any]) -> None:
+    if not event.get("outfit_id"):
+        raise ValueError("Feedback events require an outfit_id.")
+    if event.get("decision") not in VALID_DECISIONS:
+        raise ValueError(f"decision must be one of {sorted(VALID_DECISIONS)}.")
+    rating = event.get("rating")
+    if rating is not None and not 1 <= int(rating) <= 5:
+        raise ValueError("rating must be between 1 and 5.")
+    intent = event.get("future_intent")
+    if intent is not None and intent not in VALID_INTENTS:
+        raise ValueError(f"future_intent must be one of {sorted(VALID_INTENTS)}.")
+
+
+def _item_details(outfit: Mapping[str, Any]) -> list[tuple[str, Optional[str]]]:
+    """Return (item_id, short_name) pairs for an outfit from the designer payload."""
+
+    details = outfit.get("outfit_item_details") or []
+    if details:
+        return [(str(detail["item_id"]), detail.get("short_name")) for detail in details]
+    return [(str(item_id), None) for item_id in outfit.get("outfit_items") or []]
+
+
+@dataclass(frozen=True)
+class FeedbackBatch:
+    """One presented slate's worth of feedback awaiting persistence."""
+
+    user_id: str
+    session_id: str
+    events: Sequence[Mapping[str, Any]]
+    outfit_lookup: Mapping[str, Mapping[str, Any]] = field(default_factory=dict)
+
+
+def _latest_events(events: Sequence[Mapping[str, Any]]) -> dict[str, Mapping[str, Any]]:
+    latest: dict[str, Mapping[str, Any]] = {}
+    for event in events:
+        _validate_event(event)
+        latest[str(event["outfit_id"])] = event
+    return latest
+
+
+def _write_slate(
+    conn: sqlite3.Connection,
+    batch: FeedbackBatch,
+    latest: Mapping[str, Mapping[str, Any]],
+) -> dict[str, Any]:
+    """Insert one slate's new rows; the caller owns the (immediate) transaction."""
+
+    user_id, session_id, outfit_lookup = batch.user_id, batch.session_id, batch.outfit_lookup
+    existing = {
+        row["outfit_id"]
+        for row in conn.execute(
+            f"""
+            SELECT outfit_id
+            FROM outfit_feedback
+            WHERE user_id = ?
+              AND session_id = ?
+              AND outfit_id IN ({",".join("?" for _ in latest)})
+            """,
+            [user_id, session_id, *latest],
+        )
+    }
+    pending = {outfit_id: event for outfit_id, event in latest.items() if outfit_id not in existing}
+    if not pending:
+        return {"inserted": 0, "skipped": len(latest), "item_rows": 0, "event_ids": []}
+
+    conn.executemany(
+        """
+        INSERT INTO outfit_feedback (
+            user_id,
+            session_id,
+            outfit_id,
+            outfit_name,
+            outfit_description,
+            decision,
+            rating,
+            future_intent,
+            notes,
+            tags
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                user_id,
+                session_id,
+                outfit_id,
+                outfit_lookup.get(outfit_id, {}).get("outfit_name"),
+                outfit_lookup.get(outfit_id, {}).get("outfit_description"),
+                event["decision"],
+                event.get("rating"),
+                event.get("future_intent"),
+                event.get("notes"),
+                ",".join(event.get("tags") or []) or None,
+            )
+            for outfit_id, event in pending.items()
+        ],
+    )
+    event_ids = {
+        row["outfit_id"]: row["event_id"]
+        for row in conn.execute(
+            f"""
+            SELECT event_id, outfit_id
+            FROM outfit_feedback
+            WHERE user_id = ?
+              AND session_id = ?
+              AND outfit_id IN ({",".join("?" for _ in pending)})
+            """,
+            [user_id, session_id, *pending],
+        )
+    }
+
+    item_rows = [
+        (
+            event_ids[outfit_id],
+            user_id,
+            outfit_id,
+            item_id,
+            short_name,
+            event["decision"],
+            event.get("rating"),
+            event.get("future_intent"),
+            event.get("notes"),
+        )
+        for outfit_id, event in pending.items()
+        for item_id, short_name in _item_details(outfit_lookup.get(outfit_id, {}))
+    ]
+    conn.executemany(
+        """
+        INSERT INTO item_feedback (
+            event_id,
+            user_id,
+            outfit_id,
+            item_id,
+            item_short_name,
+            decision,
+            rating,
+            future_intent,
+            notes
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        item_rows,
+    )
+    apply_feedback_events(conn, list(event_ids.values()))
+    apply_metrics_events(conn, list(event_ids.values()))
+    return {
+        "inserted": len(pending),
+        "skipped": len(latest) - len(pending),
+        "item_rows": len(item_rows),
+        "event_ids": sorted(event_ids.values()),
+    }
+
+
+def record_feedback_batches(batches: Sequence[FeedbackBatch]) -> list[dict[str, Any]]:
+    """Persist several slates with a single commit (group commit).
+
+    Every batch is validated before anything is written, so one malformed event
+    rejects the whole group without partial writes.
+
+    Returns:
+        One result dict per batch, in order (see `record_feedback_events`).
+    """
+
+    latest = [_latest_events(batch.events) for batch in batches]
+    empty = {"inserted": 0, "skipped": 0, "item_rows": 0, "event_ids": []}
+    if not any(latest):
+        return [dict(empty) for _ in batches]
+
+    with _POOL.connection() as conn:
+        # Take the write lock before the duplicate checks so concurrent retries of
+        # the same slate serialize instead of racing on the unique index.
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        return [
+            _write_slate(conn, batch, events) if events else dict(empty)
+            for batch, events in zip(batches, latest, strict=True)
+        ]
+
+
+def record_feedback_events(
+    user_id: str,
+    events: Sequence[Mapping[str, Any]],
+    outfit_lookup: Mapping[str, Mapping[str, Any]],
+    *,
+    session_id: str,
+) -> dict[str, Any]:
+    """Persist a slate's feedback (outfit rows + expanded item rows) in one transaction.
+
+    Writes are idempotent on ``(user_id, session_id, outfit_id)``: resubmitting the
+    same slate skips outfits that already have a row. When one batch rates the same
+    outfit twice, the last entry wins.
+
+    Args:
+        user_id: Wearer identifier.
+        events: Feedback dicts with outfit_id, decision, rating, future_intent, notes, tags.
+        outfit_lookup: Designer payload keyed by outfit_id, used for names and item details.
+        session_id: Identifier for the presented slate; retries must reuse it.
+
+    Returns:
+        Dict with `inserted`, `skipped`, and `item_rows` counts plus the new `event_ids`.
+    """
+
+    batch = FeedbackBatch(user_id, session_id, events, outfit_lookup)
+    return record_feedback_batches([batch])[0]
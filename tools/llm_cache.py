@@ -0,0 +1,161 @@
+"""Size-bounded on-disk LRU store for serialized model responses."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Optional
+
+from tools.db_pool import ConnectionPool, get_pool
+from tools.migrations import migrate_llm_cache_db
+
+DB_PATH = Path(
+    os.getenv(
+        "FRESHFIT_LLM_CACHE_PATH",
+        Path(__file__).resolve().parents[1] / "data" / "llm_cache.db",
+    )
+)
+MAX_BYTES = int(float(os.getenv("FRESHFIT_LLM_CACHE_MAX_MB", "64")) * 1024 * 1024)
+# Evict down to this fraction of MAX_BYTES so eviction doesn't run on every put.
+EVICT_TO = 0.9
+
+
+class LlmResponseCache:
+    """SQLite-backed LRU keyed by request fingerprint.
+
+    Payloads are opaque strings (serialized ``LlmResponse`` objects). Reads bump
+    ``last_used_at``; once stored payloads exceed ``max_bytes`` the least recently
+    used entries are deleted. ``max_bytes <= 0`` disables the cache.
+    """
+
+    def __init__(
+        self,
+        db_path: Path = DB_PATH,
+        *,
+        max_bytes: int = MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _pool(self) -> ConnectionPool:
+        # Looked up per call so close_all_pools() (e.g. after a reseed) is honoured.
+        return get_pool(self.db_path, initializer=migrate_llm_cache_db, create_missing=True)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the payload stored under ``key`` and mark it recently used."""
+
+        if not self.enabled:
+            return None
+        with self._pool().connection() as conn:
+            row = conn.execute(
+                "SELECT payload FROM llm_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE llm_cache SET last_used_at = ? WHERE cache_key = ?",
+                (self._clock(), key),
+            )
+        return row["payload"]
+
+    def put(self, key: str, agent_name: str, payload: str) -> None:
+        """Store ``payload`` and evict least recently used entries if over budget."""
+
+        size = len(payload.encode("utf-8"))
+        if not self.enabled or size > self.max_bytes:
+            return
+        now = self._clock()
+        with self._pool().connection() as conn:
+            previous = conn.execute(
+                "SELECT size_bytes FROM llm_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            conn.execute(
+                """
+                INSERT INTO llm_cache (
+                    cache_key, agent_name, payload, size_bytes, created_at, last_used_at
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (cache_key) DO UPDATE SET
+                    agent_name = excluded.agent_name,
+                    payload = excluded.payload,
+                    size_bytes = excluded.size_bytes,
+                    created_at = excluded.created_at,
+                    last_used_at = excluded.last_used_at
+                """,
+                (key, agent_name, payload, size, now, now),
+            )
+            with self._lock:
+                if self._total_bytes is None:
+                    self._total_bytes = self._stored_bytes(conn)
+                else:
+                    self._total_bytes += size - (previous["size_bytes"] if previous else 0)
+                over_budget = self._total_bytes > self.max_bytes
+            if over_budget:
+                self._evict(conn)
+
+    @staticmethod
+    def _stored_bytes(conn: Any) -> int:
+        return conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM llm_cache").fetchone()[0]
+
+    def _evict(self, conn: Any) -> None:
+        target = int(self.max_bytes * EVICT_TO)
+        # Other processes may share the file, so re-measure before trimming.
+        total = self._stored_bytes(conn)
+        victims: list[tuple[str]] = []
+        for row in conn.execute(
+            "SELECT cache_key, size_bytes FROM llm_cache ORDER BY last_used_at"
+        ):
+            if total <= target:
+                break
+            victims.append((row["cache_key"],))
+            total -= row["size_bytes"]
+        conn.executemany("DELETE FROM llm_cache WHERE cache_key = ?", victims)
+        with self._lock:
+            self._total_bytes = total
+            self.evictions += len(victims)
+
+    def clear(self) -> None:
+        with self._pool().connection() as conn:
+            conn.execute("DELETE FROM llm_cache")
+        with self._lock:
+            self._total_bytes = 0
+
+    def recorded(self, agent_name: Optional[str] = None) -> list[tuple[str, str]]:
+        """Return ``(agent_name, payload)`` rows in the order they were stored."""
+
+        query = "SELECT agent_name, payload FROM llm_cache"
+        params: tuple[Any, ...] = ()
+        if agent_name:
+            query += " WHERE agent_name = ?"
+            params = (agent_name,)
+        with self._pool().connection() as conn:
+            rows = conn.execute(query + " ORDER BY created_at, rowid", params).fetchall()
+        return [(row["agent_name"], row["payload"]) for row in rows]
+
+    def stats(self) -> dict[str, Any]:
+        """Return entry count, stored bytes, and evictions."""
+
+        with self._pool().connection() as conn:
+            entries, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM llm_cache"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "bytes": stored,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+llm_response_cache = LlmResponseCache()
@@ -0,0 +1,107 @@
+"""Incremental daily rollups of outfit feedback for the metrics engine.
+
+``metrics_daily`` folds ``outfit_feedback`` into one row per (user, day) with
+decision, rating and ban counters, and ``metrics_daily_bans`` lists the outfit
+combos (built from ``item_feedback``) banned on each day, so a date window is
+answered from O(days) rows instead of O(events). Writers call
+:func:`apply_metrics_events` in the transaction that inserts the feedback rows,
+next to `tools.affinity.apply_feedback_events`; :func:`rebuild_metrics` replays
+everything from scratch.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Sequence
+from typing import Any, Optional
+
+from tools.affinity import DO_NOT_RECOMMEND, combo_key
+
+# Days are the date part of created_at ("YYYY-MM-DD HH:MM:SS" or ISO 8601).
+_DAY = "substr({table}created_at, 1, 10)"
+
+_DAILY_FOLD = f"""
+INSERT INTO metrics_daily (
+    user_id, day, event_count, accepted_count, rejected_count, skipped_count,
+    rating_count, rating_sum, banned_count
+)
+SELECT
+    user_id,
+    {_DAY.format(table="")},
+    COUNT(*),
+    SUM(decision = 'accepted'),
+    SUM(decision = 'rejected'),
+    SUM(decision = 'skipped'),
+    COUNT(rating),
+    COALESCE(SUM(rating), 0),
+    SUM(future_intent IS '{DO_NOT_RECOMMEND}')
+FROM outfit_feedback
+WHERE {{where}}
+GROUP BY user_id, {_DAY.format(table="")}
+ON CONFLICT (user_id, day) DO UPDATE SET
+    event_count = event_count + excluded.event_count,
+    accepted_count = accepted_count + excluded.accepted_count,
+    rejected_count = rejected_count + excluded.rejected_count,
+    skipped_count = skipped_count + excluded.skipped_count,
+    rating_count = rating_count + excluded.rating_count,
+    rating_sum = rating_sum + excluded.rating_sum,
+    banned_count = banned_count + excluded.banned_count
+"""
+
+_BAN_SELECT = f"""
+SELECT
+    o.user_id,
+    {_DAY.format(table="o.")} AS day,
+    GROUP_CONCAT(i.item_id, char(31)) AS item_ids
+FROM outfit_feedback AS o
+JOIN item_feedback AS i ON i.event_id = o.event_id
+WHERE o.future_intent = '{DO_NOT_RECOMMEND}' AND {{where}}
+GROUP BY o.event_id
+"""
+
+_BAN_INSERT = """
+INSERT OR IGNORE INTO metrics_daily_bans (user_id, day, combo_key) VALUES (?, ?, ?)
+"""
+
+
+def _ban_params(row: Sequence[Any]) -> tuple[str, str, str]:
+    user_id, day, item_ids = row
+    return user_id, day, combo_key(item_ids.split(chr(31)))
+
+
+def _fold(conn: sqlite3.Connection, where: str, event_where: str, params: Sequence[Any]) -> None:
+    conn.execute(_DAILY_FOLD.format(where=where), params)
+    ban_rows = conn.execute(_BAN_SELECT.format(where=event_where), params)
+    conn.executemany(_BAN_INSERT, (_ban_params(tuple(row)) for row in ban_rows))
+
+
+def apply_metrics_events(conn: sqlite3.Connection, event_ids: Sequence[int]) -> None:
+    """Fold newly inserted ``outfit_feedback`` events into the daily rollups.
+
+    Call after the events' ``item_feedback`` rows are written (ban combos are
+    built from them), inside the same transaction. Each event must be applied
+    exactly once.
+    """
+
+    if not event_ids:
+        return
+    placeholders = ",".join("?" for _ in event_ids)
+    _fold(
+        conn,
+        f"event_id IN ({placeholders})",
+        f"o.event_id IN ({placeholders})",
+        list(event_ids),
+    )
+
+
+def rebuild_metrics(conn: sqlite3.Connection, user_id: Optional[str] = None) -> None:
+    """Recompute the daily rollups from raw feedback for one user (or everyone)."""
+
+    if user_id is None:
+        conn.execute("DELETE FROM metrics_daily")
+        conn.execute("DELETE FROM metrics_daily_bans")
+        _fold(conn, "1", "1", [])
+        return
+    conn.execute("DELETE FROM metrics_daily WHERE user_id = ?", [user_id])
+    conn.execute("DELETE FROM metrics_daily_bans WHERE user_id = ?", [user_id])
+    _fold(conn, "user_id = ?", "o.user_id = ?", [user_id])
@@ -0,0 +1,121 @@
+"""Metrics FunctionTool: KPI snapshots computed from the daily feedback rollups."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any, Optional
+
+from google.adk.tools.function_tool import FunctionTool
+
+from tools.db_pool import get_pool
+from tools.migrations import migrate_preference_db
+from tools.preference_history_tool import DB_PATH
+
+DEFAULT_WINDOW_DAYS = 30
+
+_POOL = get_pool(
+    DB_PATH,
+    missing_hint="Run scripts/create_preference_db.py first.",
+    initializer=migrate_preference_db,
+)
+
+
+def _parse_day(value: str, field_name: str) -> date:
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        raise ValueError(f"{field_name} must be an ISO date (YYYY-MM-DD), got {value!r}.") from None
+
+
+def resolve_window(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    *,
+    today: Optional[date] = None,
+) -> tuple[date, date]:
+    """Inclusive ``(start, end)`` days; defaults to the last `DEFAULT_WINDOW_DAYS` days."""
+
+    end = _parse_day(end_date, "end_date") if end_date else (today or date.today())
+    start = (
+        _parse_day(start_date, "start_date")
+        if start_date
+        else end - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+    )
+    if start > end:
+        raise ValueError(f"start_date {start} is after end_date {end}.")
+    return start, end
+
+
+def compute_metrics(
+    user_id: str = "123",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    include_travel: bool = True,
+) -> dict[str, Any]:
+    """Return FreshFit KPIs for a user over an inclusive date window.
+
+    Aggregates the per-day feedback rollups, so a wide window costs one row per
+    active day rather than one per feedback event.
+
+    Args:
+        user_id: Demo user identifier to filter feedback.
+        start_date: First day (YYYY-MM-DD); defaults to 30 days before `end_date`.
+        end_date: Last day (YYYY-MM-DD); defaults to today.
+        include_travel: Whether to report travel coverage (not tracked yet).
+
+    Returns:
+        Dict with the MetricsResponse fields (`acceptance_rate`, `average_rating`,
+        `banned_combo_count`, `travel_coverage_ratio`, `notes`) plus the resolved
+        window and raw `counts`.
+    """
+
+    start, end = resolve_window(start_date, end_date)
+    window = [user_id, start.isoformat(), end.isoformat()]
+    with _POOL.connection() as conn:
+        totals = conn.execute(
+            """
+            SELECT
+                COUNT(*) AS active_days,
+                COALESCE(SUM(event_count), 0) AS events,
+                COALESCE(SUM(accepted_count), 0) AS accepted,
+                COALESCE(SUM(rejected_count), 0) AS rejected,
+                COALESCE(SUM(skipped_count), 0) AS skipped,
+                COALESCE(SUM(rating_count), 0) AS rated,
+                COALESCE(SUM(rating_sum), 0) AS rating_sum,
+                COALESCE(SUM(banned_count), 0) AS banned_events
+            FROM metrics_daily
+            WHERE user_id = ? AND day BETWEEN ? AND ?
+            """,
+            window,
+        ).fetchone()
+        banned_combos = conn.execute(
+            """
+            SELECT COUNT(DISTINCT combo_key)
+            FROM metrics_daily_bans
+            WHERE user_id = ? AND day BETWEEN ? AND ?
+            """,
+            window,
+        ).fetchone()[0]
+
+    counts = {key: totals[key] for key in totals.keys()}
+    events, rated = counts["events"], counts["rated"]
+    notes = [
+        f"{events} outfit decisions over {counts['active_days']} active day(s) "
+        f"between {start} and {end}."
+    ]
+    if include_travel:
+        notes.append("Travel coverage is not tracked yet.")
+    return {
+        "user_id": user_id,
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "acceptance_rate": round(counts["accepted"] / events, 4) if events else None,
+        "average_rating": round(counts["rating_sum"] / rated, 2) if rated else None,
+        "banned_combo_count": banned_combos,
+        "travel_coverage_ratio": None,
+        "notes": " ".join(notes),
+        "counts": counts,
+    }
+
+
+metrics_tool = FunctionTool(compute_metrics)
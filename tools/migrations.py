@@ -0,0 +1,391 @@
+"""Versioned, in-place schema migrations for the FreshFit SQLite databases."""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Optional
+
+from tools.affinity import rebuild_affinity
+from tools.metrics_rollup import rebuild_metrics
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Single schema step tracked through ``PRAGMA user_version``."""
+
+    version: int
+    description: str
+    statements: tuple[str, ...] = ()
+    apply: Optional[Callable[[sqlite3.Connection], None]] = None
+
+
+def _data_version_statements(table: str) -> tuple[str, ...]:
+    """Create ``data_versions`` and the triggers that bump it on ``table`` writes.
+
+    Each row stamps one user's data; caches key on ``(version, updated_at)`` so a
+    reseeded database never reproduces an old stamp.
+    """
+
+    bump = """
+        INSERT INTO data_versions (user_id, version, updated_at)
+        VALUES ({row}.user_id, 1, julianday('now'))
+        ON CONFLICT (user_id) DO UPDATE SET
+            version = version + 1,
+            updated_at = excluded.updated_at;
+    """
+    trigger = """
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_{name}_version
+        AFTER {event} ON {table}
+        BEGIN {bump} END
+    """
+    triggers = [
+        trigger.format(table=table, name=event.lower(), event=event, bump=bump.format(row=row))
+        for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))
+    ]
+    return (
+        """
+        CREATE TABLE IF NOT EXISTS data_versions (
+            user_id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            updated_at REAL NOT NULL
+        ) WITHOUT ROWID
+        """,
+        *triggers,
+        f"""
+        INSERT OR IGNORE INTO data_versions (user_id, version, updated_at)
+        SELECT user_id, 1, julianday('now') FROM {table} GROUP BY user_id
+        """,
+    )
+
+
+WARDROBE_MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        description="Create wardrobe_items",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS wardrobe_items (
+                item_id INTEGER PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                category TEXT NOT NULL,
+                color TEXT,
+                warmth_level TEXT,
+                formality TEXT,
+                body_zone TEXT,
+                last_worn_date TEXT
+            )
+            """,
+        ),
+    ),
+    Migration(
+        version=2,
+        description="Index the wardrobe fetch and rotation paths",
+        statements=(
+            """
+            CREATE INDEX IF NOT EXISTS idx_wardrobe_user_category_name
+            ON wardrobe_items (user_id, category, name)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_wardrobe_user_last_worn
+            ON wardrobe_items (user_id, last_worn_date)
+            """,
+            "ANALYZE wardrobe_items",
+        ),
+    ),
+    Migration(
+        version=3,
+        description="Stamp per-user wardrobe versions for cache invalidation",
+        statements=_data_version_statements("wardrobe_items"),
+    ),
+    Migration(
+        version=4,
+        description="Clear unparseable or future last_worn_date values",
+        statements=(
+            # last_worn_date only moves forward, so a bad value would pin it forever.
+            """
+            UPDATE wardrobe_items
+            SET last_worn_date = NULL
+            WHERE last_worn_date IS NOT NULL
+              AND (date(last_worn_date) IS NULL OR date(last_worn_date) > date('now'))
+            """,
+        ),
+    ),
+)
+
+PREFERENCE_MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        description="Create outfit_feedback and item_feedback",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS outfit_feedback (
+                event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                outfit_id TEXT NOT NULL,
+                outfit_name TEXT,
+                outfit_description TEXT,
+                decision TEXT NOT NULL CHECK (
+                    decision IN ('accepted', 'rejected', 'skipped')
+                ),
+                rating INTEGER CHECK (rating BETWEEN 1 AND 5),
+                future_intent TEXT CHECK (
+                    future_intent IN ('try_again', 'maybe_later', 'do_not_recommend')
+                ),
+                notes TEXT,
+                tags TEXT,
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS item_feedback (
+                item_feedback_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_id INTEGER NOT NULL,
+                user_id TEXT NOT NULL,
+                outfit_id TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                item_short_name TEXT,
+                decision TEXT NOT NULL CHECK (
+                    decision IN ('accepted', 'rejected', 'skipped')
+                ),
+                rating INTEGER CHECK (rating BETWEEN 1 AND 5),
+                future_intent TEXT CHECK (
+                    future_intent IN ('try_again', 'maybe_later', 'do_not_recommend')
+                ),
+                notes TEXT,
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (event_id) REFERENCES outfit_feedback (event_id) ON DELETE CASCADE
+            )
+            """,
+        ),
+    ),
+    Migration(
+        version=2,
+        description="Index the rating-bucketed history scans",
+        statements=(
+            """
+            CREATE INDEX IF NOT EXISTS idx_outfit_feedback_user_rating_created
+            ON outfit_feedback (user_id, rating, created_at)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_item_feedback_user_rating_created
+            ON item_feedback (user_id, rating, created_at)
+            """,
+            "ANALYZE outfit_feedback",
+            "ANALYZE item_feedback",
+        ),
+    ),
+    Migration(
+        version=3,
+        description="Materialize item_affinity and combo_affinity",
+        statements=(
+            """
+            CREATE INDEX IF NOT EXISTS idx_item_feedback_event
+            ON item_feedback (event_id)
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS item_affinity (
+                user_id TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                item_short_name TEXT,
+                feedback_count INTEGER NOT NULL DEFAULT 0,
+                accepted_count INTEGER NOT NULL DEFAULT 0,
+                rating_count INTEGER NOT NULL DEFAULT 0,
+                rating_sum INTEGER NOT NULL DEFAULT 0,
+                last_seen_at TEXT NOT NULL,
+                last_intent TEXT,
+                last_intent_at TEXT,
+                do_not_recommend INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, item_id)
+            ) WITHOUT ROWID
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS combo_affinity (
+                user_id TEXT NOT NULL,
+                combo_key TEXT NOT NULL,
+                outfit_id TEXT NOT NULL,
+                outfit_name TEXT,
+                item_count INTEGER NOT NULL,
+                feedback_count INTEGER NOT NULL DEFAULT 0,
+                accepted_count INTEGER NOT NULL DEFAULT 0,
+                rating_count INTEGER NOT NULL DEFAULT 0,
+                rating_sum INTEGER NOT NULL DEFAULT 0,
+                last_seen_at TEXT NOT NULL,
+                last_intent TEXT,
+                last_intent_at TEXT,
+                do_not_recommend INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, combo_key)
+            ) WITHOUT ROWID
+            """,
+        ),
+        apply=rebuild_affinity,
+    ),
+    Migration(
+        version=4,
+        description="Key outfit_feedback by session for idempotent writes",
+        statements=(
+            "ALTER TABLE outfit_feedback ADD COLUMN session_id TEXT",
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_outfit_feedback_session_outfit
+            ON outfit_feedback (user_id, session_id, outfit_id)
+            WHERE session_id IS NOT NULL
+            """,
+        ),
+    ),
+    Migration(
+        version=5,
+        description="Stamp per-user feedback versions for cache invalidation",
+        statements=_data_version_statements("outfit_feedback"),
+    ),
+    Migration(
+        version=6,
+        description="Materialize daily metrics rollups",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS metrics_daily (
+                user_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                event_count INTEGER NOT NULL DEFAULT 0,
+                accepted_count INTEGER NOT NULL DEFAULT 0,
+                rejected_count INTEGER NOT NULL DEFAULT 0,
+                skipped_count INTEGER NOT NULL DEFAULT 0,
+                rating_count INTEGER NOT NULL DEFAULT 0,
+                rating_sum INTEGER NOT NULL DEFAULT 0,
+                banned_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, day)
+            ) WITHOUT ROWID
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS metrics_daily_bans (
+                user_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                combo_key TEXT NOT NULL,
+                PRIMARY KEY (user_id, day, combo_key)
+            ) WITHOUT ROWID
+            """,
+        ),
+        apply=rebuild_metrics,
+    ),
+)
+
+WEATHER_CACHE_MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        description="Create weather_cache",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS weather_cache (
+                location_key TEXT NOT NULL,
+                forecast_date TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (location_key, forecast_date)
+            ) WITHOUT ROWID
+            """,
+        ),
+    ),
+)
+
+LLM_CACHE_MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        description="Create llm_cache",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                cache_key TEXT PRIMARY KEY,
+                agent_name TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used
+            ON llm_cache (last_used_at)
+            """,
+        ),
+    ),
+)
+
+
+def read_data_version(conn: sqlite3.Connection, user_id: str) -> str:
+    """Return ``user_id``'s data stamp ("0" when the user has no rows yet)."""
+
+    row = conn.execute(
+        "SELECT version, updated_at FROM data_versions WHERE user_id = ?", (user_id,)
+    ).fetchone()
+    return f"{row[0]}@{row[1]:.8f}" if row else "0"
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """Return the schema version recorded in the database header."""
+
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def apply_migrations(conn: sqlite3.Connection, migrations: Sequence[Migration]) -> list[int]:
+    """Upgrade ``conn`` in place, running each pending migration in its own transaction.
+
+    Args:
+        conn: Open SQLite connection (pooled or standalone).
+        migrations: Ordered migrations for this database.
+
+    Returns:
+        The versions that were applied (empty when the schema is already current).
+    """
+
+    target = max((migration.version for migration in migrations), default=0)
+    if current_version(conn) >= target:
+        return []
+
+    if conn.in_transaction:
+        conn.commit()
+
+    applied: list[int] = []
+    for migration in sorted(migrations, key=lambda entry: entry.version):
+        # BEGIN IMMEDIATE takes the write lock first, so concurrent processes
+        # re-check the version instead of racing to apply the same step.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if current_version(conn) >= migration.version:
+                conn.rollback()
+                continue
+            for statement in migration.statements:
+                conn.execute(statement)
+            if migration.apply is not None:
+                migration.apply(conn)
+            conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        applied.append(migration.version)
+    return applied
+
+
+def migrate_wardrobe_db(conn: sqlite3.Connection) -> list[int]:
+    """Bring a wardrobe DB up to the latest schema."""
+
+    return apply_migrations(conn, WARDROBE_MIGRATIONS)
+
+
+def migrate_preference_db(conn: sqlite3.Connection) -> list[int]:
+    """Bring a preference DB up to the latest schema."""
+
+    return apply_migrations(conn, PREFERENCE_MIGRATIONS)
+
+
+def migrate_weather_cache_db(conn: sqlite3.Connection) -> list[int]:
+    """Bring a weather cache DB up to the latest schema."""
+
+    return apply_migrations(conn, WEATHER_CACHE_MIGRATIONS)
+
+
+def migrate_llm_cache_db(conn: sqlite3.Connection) -> list[int]:
+    """Bring an LLM response cache DB up to the latest schema."""
+
+    return apply_migrations(conn, LLM_CACHE_MIGRATIONS)
@@ -2,13 +2,29 @@
 
 from __future__ import annotations
 
+import heapq
+import os
 import sqlite3
+from itertools import islice
 from pathlib import Path
 from typing import Any, Optional
 
 from google.adk.tools.function_tool import FunctionTool
 
-DB_PATH = Path(__file__).resolve().parents[1] / "data" / "demo_preferences.db"
+from tools.db_pool import get_pool
+from tools.migrations import migrate_preference_db, read_data_version
+
+DB_PATH = Path(
+    os.getenv(
+        "PREFERENCE_DB_PATH",
+        Path(__file__).resolve().parents[1] / "data" / "demo_preferences.db",
+    )
+)
+_POOL = get_pool(
+    DB_PATH,
+    missing_hint="Run scripts/create_preference_db.py first.",
+    initializer=migrate_preference_db,
+)
 
 
 def _serialize_outfit_row(row: sqlite3.Row) -> dict[str, Any]:
@@ -43,6 +59,145 @@ def _serialize_item_row(row: sqlite3.Row) -> dict[str, Any]:
     }
 
 
+_OUTFIT_COLUMNS = """
+    event_id AS row_id,
+    outfit_id,
+    outfit_name,
+    outfit_description,
+    decision,
+    rating,
+    future_intent,
+    notes,
+    tags,
+    created_at
+"""
+
+_ITEM_COLUMNS = """
+    item_feedback_id AS row_id,
+    item_id,
+    item_short_name,
+    outfit_id,
+    decision,
+    rating,
+    future_intent,
+    notes,
+    created_at
+"""
+
+# (table, primary key, selected columns, row serializer) per history bucket.
+_OUTFIT_TABLE = ("outfit_feedback", "event_id", _OUTFIT_COLUMNS, _serialize_outfit_row)
+_ITEM_TABLE = ("item_feedback", "item_feedback_id", _ITEM_COLUMNS, _serialize_item_row)
+_BUCKETS = {
+    "liked_outfits": _OUTFIT_TABLE,
+    "disliked_outfits": _OUTFIT_TABLE,
+    "liked_items": _ITEM_TABLE,
+    "disliked_items": _ITEM_TABLE,
+}
+
+
+def _validate_thresholds(liked_rating_min: int, disliked_rating_max: int) -> None:
+    if liked_rating_min < 1 or liked_rating_min > 5:
+        raise ValueError("liked_rating_min must be between 1 and 5.")
+    if disliked_rating_max < 1 or disliked_rating_max > liked_rating_min:
+        raise ValueError("disliked_rating_max must be between 1 and liked_rating_min.")
+
+
+def _newest_first(row: sqlite3.Row) -> tuple[str, int]:
+    return row["created_at"], row["row_id"]
+
+
+def _rating_walks(
+    conn: sqlite3.Connection,
+    table: str,
+    key_column: str,
+    columns: str,
+    user_id: str,
+    ratings: list[int],
+    *,
+    limit: Optional[int],
+    cursor: Optional[tuple[str, int]] = None,
+) -> dict[int, list[sqlite3.Row]]:
+    """Read one table in a single statement, newest-first per rating value.
+
+    Every UNION ALL leg pins ``rating`` to one value, so it walks the
+    ``(user_id, rating, created_at)`` index backwards and stops after ``limit``
+    rows instead of sorting the user's whole history.
+    """
+
+    legs: list[str] = []
+    params: list[Any] = []
+    for rating in ratings:
+        cursor_clause = ""
+        leg_params: list[Any] = [user_id, rating]
+        if cursor is not None:
+            cursor_clause = f"AND (created_at, {key_column}) < (?, ?)"
+            leg_params.extend(cursor)
+        limit_clause = ""
+        if limit is not None:
+            limit_clause = "LIMIT ?"
+            leg_params.append(limit)
+        legs.append(
+            f"""
+            SELECT * FROM (
+                SELECT {columns}
+                FROM {table}
+                WHERE user_id = ?
+                  AND rating = ?
+                  {cursor_clause}
+                ORDER BY created_at DESC, {key_column} DESC
+                {limit_clause}
+            )
+            """
+        )
+        params.extend(leg_params)
+
+    by_rating: dict[int, list[sqlite3.Row]] = {rating: [] for rating in ratings}
+    for row in conn.execute(" UNION ALL ".join(legs), params):
+        by_rating[row["rating"]].append(row)
+    return by_rating
+
+
+def _merge_newest_first(
+    by_rating: dict[int, list[sqlite3.Row]],
+    ratings: range,
+    limit: Optional[int],
+) -> list[sqlite3.Row]:
+    """Merge the per-rating runs for one bucket and apply the bucket limit."""
+
+    merged = heapq.merge(
+        *(by_rating[rating] for rating in ratings),
+        key=_newest_first,
+        reverse=True,
+    )
+    return list(islice(merged, limit))
+
+
+def _bucketed_rows(
+    conn: sqlite3.Connection,
+    table: str,
+    key_column: str,
+    columns: str,
+    user_id: str,
+    liked: range,
+    disliked: range,
+    limit: Optional[int],
+) -> tuple[list[sqlite3.Row], list[sqlite3.Row]]:
+    """Split one feedback table into (liked, disliked) rows with one query.
+
+    A rating that satisfies both thresholds lands in both lists, matching the
+    original per-bucket SELECTs.
+    """
+
+    ratings = sorted(set(liked) | set(disliked))
+    by_rating = _rating_walks(
+        conn, table, key_column, columns, user_id, ratings, limit=limit
+    )
+    return (
+        _merge_newest_first(by_rating, liked, limit),
+        _merge_newest_first(by_rating, disliked, limit),
+    )
+
+
 def fetch_preference_history(
     user_id: str = "123",
     *,
@@ -62,121 +217,213 @@ def fetch_preference_history(
         Dict containing liked/disliked outfits and items keyed by rating buckets.
     """
 
-    if liked_rating_min < 1 or liked_rating_min > 5:
-        raise ValueError("liked_rating_min must be between 1 and 5.")
-    if disliked_rating_max < 1 or disliked_rating_max > liked_rating_min:
-        raise ValueError("disliked_rating_max must be between 1 and liked_rating_min.")
-    if not DB_PATH.exists():
-        raise FileNotFoundError(
-            f"Demo preference database not found at {DB_PATH}. "
-            "Run scripts/create_preference_db.py first."
+    _validate_thresholds(liked_rating_min, disliked_rating_max)
+    liked = range(liked_rating_min, 6)
+    disliked = range(1, disliked_rating_max + 1)
+    with _POOL.connection() as conn:
+        liked_outfit_rows, disliked_outfit_rows = _bucketed_rows(
+            conn, *_OUTFIT_TABLE[:3], user_id, liked, disliked, limit or None
+        )
+        liked_item_rows, disliked_item_rows = _bucketed_rows(
+            conn, *_ITEM_TABLE[:3], user_id, liked, disliked, limit or None
         )
 
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
+    return {
+        "user_id": user_id,
+        "liked_outfits": [_serialize_outfit_row(row) for row in liked_outfit_rows],
+        "disliked_outfits": [
+            _serialize_outfit_row(row) for row in disliked_outfit_rows
+        ],
+        "liked_items": [_serialize_item_row(row) for row in liked_item_rows],
+        "disliked_items": [_serialize_item_row(row) for row in disliked_item_rows],
+        "metadata": {
+            "liked_rating_min": liked_rating_min,
+            "disliked_rating_max": disliked_rating_max,
+            "limit": limit,
+        },
+    }
 
-        outfit_limit_clause = " LIMIT ?" if limit else ""
-        outfit_limit_params: list[Any] = [limit] if limit else []
 
-        liked_outfit_rows = conn.execute(
-            f"""
-            SELECT
-                outfit_id,
-                outfit_name,
-                outfit_description,
-                decision,
-                rating,
-                future_intent,
-                notes,
-                tags,
-                created_at
-            FROM outfit_feedback
-            WHERE user_id = ?
-              AND rating IS NOT NULL
-              AND rating >= ?
-            ORDER BY created_at DESC{outfit_limit_clause}
-            """,
-            [user_id, liked_rating_min, *outfit_limit_params],
-        ).fetchall()
+def _encode_cursor(row: sqlite3.Row) -> str:
+    return f"{row['created_at']}|{row['row_id']}"
 
-        disliked_outfit_rows = conn.execute(
-            f"""
-            SELECT
-                outfit_id,
-                outfit_name,
-                outfit_description,
-                decision,
-                rating,
-                future_intent,
-                notes,
-                tags,
-                created_at
-            FROM outfit_feedback
-            WHERE user_id = ?
-              AND rating IS NOT NULL
-              AND rating <= ?
-            ORDER BY created_at DESC{outfit_limit_clause}
-            """,
-            [user_id, disliked_rating_max, *outfit_limit_params],
-        ).fetchall()
 
-        item_limit_clause = " LIMIT ?" if limit else ""
-        item_limit_params: list[Any] = [limit] if limit else []
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    created_at, _, row_id = cursor.rpartition("|")
+    if not created_at or not row_id.isdigit():
+        raise ValueError(f"Malformed history cursor: {cursor!r}")
+    return created_at, int(row_id)
+
+
+def fetch_preference_history_page(
+    user_id: str = "123",
+    bucket: str = "liked_outfits",
+    *,
+    cursor: Optional[str] = None,
+    page_size: int = 50,
+    liked_rating_min: int = 4,
+    disliked_rating_max: int = 1,
+) -> dict[str, Any]:
+    """Page through one history bucket newest-first using a keyset cursor.
+
+    Args:
+        user_id: Demo user identifier to filter feedback rows.
+        bucket: One of liked_outfits, disliked_outfits, liked_items, disliked_items.
+        cursor: Opaque `next_cursor` from the previous page (omit for the first page).
+        page_size: Maximum rows to return (1-500).
+        liked_rating_min: Inclusive lower bound for liked outfits/items.
+        disliked_rating_max: Inclusive upper bound for disliked outfits/items.
+
+    Returns:
+        Dict with the bucket rows and `next_cursor` (None once the history is exhausted).
+    """
+
+    if bucket not in _BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(_BUCKETS)}.")
+    if page_size < 1 or page_size > 500:
+        raise ValueError("page_size must be between 1 and 500.")
+    _validate_thresholds(liked_rating_min, disliked_rating_max)
+
+    table, key_column, columns, serialize = _BUCKETS[bucket]
+    if bucket.startswith("liked_"):
+        ratings = range(liked_rating_min, 6)
+    else:
+        ratings = range(1, disliked_rating_max + 1)
+    with _POOL.connection() as conn:
+        by_rating = _rating_walks(
+            conn,
+            table,
+            key_column,
+            columns,
+            user_id,
+            list(ratings),
+            limit=page_size + 1,
+            cursor=_decode_cursor(cursor) if cursor else None,
+        )
+    rows = _merge_newest_first(by_rating, ratings, page_size + 1)
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    return {
+        "user_id": user_id,
+        "bucket": bucket,
+        "rows": [serialize(row) for row in rows],
+        "next_cursor": _encode_cursor(rows[-1]) if has_more else None,
+    }
+
+
+def _mean_rating(row: sqlite3.Row) -> Optional[float]:
+    if not row["rating_count"]:
+        return None
+    return round(row["rating_sum"] / row["rating_count"], 2)
+
+
+def _serialize_item_affinity(row: sqlite3.Row) -> dict[str, Any]:
+    """Normalize item_affinity rows."""
+
+    return {
+        "item_id": row["item_id"],
+        "item_short_name": row["item_short_name"],
+        "feedback_count": row["feedback_count"],
+        "accepted_count": row["accepted_count"],
+        "mean_rating": _mean_rating(row),
+        "last_seen_at": row["last_seen_at"],
+        "last_intent": row["last_intent"],
+        "do_not_recommend": bool(row["do_not_recommend"]),
+    }
+
+
+def _serialize_combo_affinity(row: sqlite3.Row) -> dict[str, Any]:
+    """Normalize combo_affinity rows."""
+
+    return {
+        "outfit_items": row["combo_key"].split(","),
+        "outfit_id": row["outfit_id"],
+        "outfit_name": row["outfit_name"],
+        "feedback_count": row["feedback_count"],
+        "accepted_count": row["accepted_count"],
+        "mean_rating": _mean_rating(row),
+        "last_seen_at": row["last_seen_at"],
+        "last_intent": row["last_intent"],
+        "do_not_recommend": bool(row["do_not_recommend"]),
+    }
+
+
+def fetch_preference_affinity(
+    user_id: str = "123",
+    item_ids: Optional[list[str]] = None,
+    *,
+    liked_rating_min: int = 4,
+    combo_limit: int = 50,
+) -> dict[str, Any]:
+    """Return precomputed per-item and per-combo affinity for a user.
+
+    Args:
+        user_id: Demo user identifier to filter affinity rows.
+        item_ids: Optional closet item_ids to restrict item rows to (e.g., the current slate).
+        liked_rating_min: Mean rating at or above which a combo counts as loved.
+        combo_limit: Maximum loved/banned combos to return, newest first.
+
+    Returns:
+        Dict with `items`, loved/banned `combos`, and convenience `banned_item_ids`
+        and `loved_combos` lists.
+    """
+
+    if liked_rating_min < 1 or liked_rating_min > 5:
+        raise ValueError("liked_rating_min must be between 1 and 5.")
+    item_params: list[Any] = [user_id]
+    item_clause = ""
+    if item_ids:
+        item_clause = f"AND item_id IN ({','.join('?' for _ in item_ids)})"
+        item_params.extend(str(item_id) for item_id in item_ids)
 
-        liked_item_rows = conn.execute(
+    with _POOL.connection() as conn:
+        item_rows = conn.execute(
             f"""
-            SELECT
-                item_id,
-                item_short_name,
-                outfit_id,
-                decision,
-                rating,
-                future_intent,
-                notes,
-                created_at
-            FROM item_feedback
+            SELECT *
+            FROM item_affinity
             WHERE user_id = ?
-              AND rating IS NOT NULL
-              AND rating >= ?
-            ORDER BY created_at DESC{item_limit_clause}
+              {item_clause}
+            ORDER BY item_id
             """,
-            [user_id, liked_rating_min, *item_limit_params],
+            item_params,
         ).fetchall()
-
-        disliked_item_rows = conn.execute(
-            f"""
-            SELECT
-                item_id,
-                item_short_name,
-                outfit_id,
-                decision,
-                rating,
-                future_intent,
-                notes,
-                created_at
-            FROM item_feedback
+        combo_rows = conn.execute(
+            """
+            SELECT *
+            FROM combo_affinity
             WHERE user_id = ?
-              AND rating IS NOT NULL
-              AND rating <= ?
-            ORDER BY created_at DESC{item_limit_clause}
+              AND (
+                do_not_recommend = 1
+                OR (rating_count > 0 AND rating_sum >= ? * rating_count)
+              )
+            ORDER BY last_seen_at DESC
+            LIMIT ?
             """,
-            [user_id, disliked_rating_max, *item_limit_params],
+            [user_id, liked_rating_min, combo_limit],
         ).fetchall()
 
+    items = [_serialize_item_affinity(row) for row in item_rows]
+    combos = [_serialize_combo_affinity(row) for row in combo_rows]
     return {
         "user_id": user_id,
-        "liked_outfits": [_serialize_outfit_row(row) for row in liked_outfit_rows],
-        "disliked_outfits": [
-            _serialize_outfit_row(row) for row in disliked_outfit_rows
+        "items": items,
+        "combos": combos,
+        "banned_item_ids": [item["item_id"] for item in items if item["do_not_recommend"]],
+        "loved_combos": [
+            combo["outfit_items"] for combo in combos if not combo["do_not_recommend"]
         ],
-        "liked_items": [_serialize_item_row(row) for row in liked_item_rows],
-        "disliked_items": [_serialize_item_row(row) for row in disliked_item_rows],
-        "metadata": {
-            "liked_rating_min": liked_rating_min,
-            "disliked_rating_max": disliked_rating_max,
-            "limit": limit,
-        },
+        "metadata": {"liked_rating_min": liked_rating_min, "combo_limit": combo_limit},
     }
 
 
+def preference_data_version(user_id: str) -> str:
+    """Stamp that changes whenever feedback is recorded for ``user_id``."""
+
+    with _POOL.connection() as conn:
+        return read_data_version(conn, user_id)
+
+
 preference_history_tool = FunctionTool(fetch_preference_history)
+preference_history_page_tool = FunctionTool(fetch_preference_history_page)
+preference_affinity_tool = FunctionTool(fetch_preference_affinity)
@@ -0,0 +1,456 @@
+"""Synthetic wardrobe and feedback data at production scale.
+
+`generate_synthetic_dbs` writes a wardrobe DB and a preference DB for
+``users × items_per_user`` closet rows and ``users × events_per_user`` feedback
+events, on the latest schema. Distributions follow the demo closet:
+
+- categories, formality and colors are weighted (tops and neutrals dominate),
+  warmth depends on the category, and body_zone follows it;
+- ``last_worn_date`` is skewed toward recent days with a long tail, and a share
+  of items has never been worn;
+- feedback comes in slates of ``slate_size`` outfits per session (at most one
+  accepted), outfits favour each user's favourite pieces, a few favourite combos
+  recur so ``combo_affinity`` has repeat rows, and ratings and future intents
+  follow the decision.
+
+Generation is deterministic for a given spec. Rows are streamed per user and
+bulk-loaded with ``executemany`` in ``batch_size`` transactions, with ingest
+pragmas on and secondary indexes and triggers deferred until after the load;
+``data_versions`` stamps and the affinity summaries are rebuilt at the end.
+Benchmarks can point the tools at the result via `SyntheticDataset.environ`.
+"""
+
+from __future__ import annotations
+
+import random
+import sqlite3
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Optional
+
+from tools.affinity import rebuild_affinity
+from tools.metrics_rollup import rebuild_metrics
+from tools.migrations import migrate_preference_db, migrate_wardrobe_db
+
+CATEGORY_WEIGHTS = {
+    "top": 30,
+    "bottom": 20,
+    "dress": 8,
+    "outerwear": 10,
+    "shoes": 14,
+    "accessory": 18,
+}
+CATEGORY_ZONES = {
+    "top": "upper",
+    "bottom": "lower",
+    "dress": "full_body",
+    "outerwear": "upper",
+    "shoes": "shoe",
+    "accessory": "accessory",
+}
+# (light, medium, heavy) weights per category.
+WARMTH_WEIGHTS = {
+    "top": (45, 40, 15),
+    "bottom": (30, 55, 15),
+    "dress": (55, 35, 10),
+    "outerwear": (20, 40, 40),
+    "shoes": (45, 40, 15),
+    "accessory": (25, 50, 25),
+}
+WARMTH_LEVELS = ("light", "medium", "heavy")
+FORMALITY_WEIGHTS = {"casual": 40, "smart_casual": 30, "business": 20, "formal": 10}
+COLOR_WEIGHTS = {
+    "black": 16,
+    "navy": 12,
+    "white": 12,
+    "grey": 10,
+    "charcoal": 8,
+    "camel": 7,
+    "ivory": 6,
+    "olive": 6,
+    "denim blue": 8,
+    "burgundy": 4,
+    "rust": 3,
+    "sky blue": 4,
+    "blush": 2,
+    "emerald": 2,
+}
+NOUNS = {
+    "top": ("Oxford Shirt", "Silk Blouse", "Merino Sweater", "Graphic Tee", "Mock-Neck Top"),
+    "bottom": ("Chinos", "Tailored Trousers", "Denim Jeans", "Pleated Skirt", "Joggers"),
+    "dress": ("Wrap Dress", "Slip Dress", "Knit Midi Dress", "Shirt Dress"),
+    "outerwear": ("Wool Coat", "Denim Jacket", "Rain Shell", "Puffer Jacket", "Blazer"),
+    "shoes": ("Court Sneakers", "Chelsea Boots", "Loafers", "Ankle Boots", "Running Shoes"),
+    "accessory": ("Wool Scarf", "Leather Belt", "Statement Necklace", "Canvas Tote"),
+}
+STYLE_WORDS = ("Layers", "Errands", "Polish", "Weekend", "Commute", "Evening", "Gallery Hop")
+
+WARDROBE_INSERT = """
+    INSERT INTO wardrobe_items (
+        item_id, user_id, name, category, color, warmth_level,
+        formality, body_zone, last_worn_date
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+OUTFIT_INSERT = """
+    INSERT INTO outfit_feedback (
+        event_id, user_id, outfit_id, outfit_name, outfit_description, decision,
+        rating, future_intent, notes, tags, created_at, session_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+ITEM_INSERT = """
+    INSERT INTO item_feedback (
+        event_id, user_id, outfit_id, item_id, item_short_name, decision,
+        rating, future_intent, notes, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    """Size and shape of a synthetic dataset."""
+
+    users: int = 10
+    items_per_user: int = 200
+    events_per_user: int = 500
+    seed: int = 42
+    first_user_id: int = 1000
+    today: date = field(default_factory=date.today)
+    history_days: int = 365
+    never_worn_share: float = 0.1
+    slate_size: int = 5
+    favourite_combos: int = 8
+    batch_size: int = 50_000
+
+    def user_ids(self) -> list[str]:
+        return [str(self.first_user_id + offset) for offset in range(self.users)]
+
+
+@dataclass
+class SyntheticDataset:
+    """Paths and row counts of a generated dataset."""
+
+    wardrobe_db: Path
+    preference_db: Path
+    spec: SyntheticSpec
+    wardrobe_rows: int = 0
+    outfit_rows: int = 0
+    item_rows: int = 0
+    seconds: float = 0.0
+
+    def environ(self) -> dict[str, str]:
+        """Environment that points the wardrobe and preference tools at this dataset."""
+
+        return {
+            "WARDROBE_DB_PATH": str(self.wardrobe_db),
+            "PREFERENCE_DB_PATH": str(self.preference_db),
+        }
+
+
+def _weighted(options: dict[str, int]) -> tuple[tuple[str, ...], list[int]]:
+    return tuple(options), list(accumulate(options.values()))
+
+
+_CATEGORIES = _weighted(CATEGORY_WEIGHTS)
+_FORMALITIES = _weighted(FORMALITY_WEIGHTS)
+_COLORS = _weighted(COLOR_WEIGHTS)
+
+
+def _days_ago(rng: random.Random, spec: SyntheticSpec) -> int:
+    # Beta(0.7, 2.5): most wear is recent, with a long tail of neglected pieces.
+    return int(spec.history_days * rng.betavariate(0.7, 2.5))
+
+
+def closet_rows(
+    user_id: str, first_item_id: int, spec: SyntheticSpec, rng: random.Random
+) -> list[tuple[Any, ...]]:
+    """One user's ``wardrobe_items`` rows."""
+
+    rows = []
+    categories = rng.choices(_CATEGORIES[0], cum_weights=_CATEGORIES[1], k=spec.items_per_user)
+    for offset, category in enumerate(categories):
+        color = rng.choices(_COLORS[0], cum_weights=_COLORS[1])[0]
+        last_worn = (
+            None
+            if rng.random() < spec.never_worn_share
+            else (spec.today - timedelta(days=_days_ago(rng, spec))).isoformat()
+        )
+        rows.append(
+            (
+                first_item_id + offset,
+                user_id,
+                f"{color.title()} {rng.choice(NOUNS[category])}",
+                category,
+                color,
+                rng.choices(WARMTH_LEVELS, weights=WARMTH_WEIGHTS[category])[0],
+                rng.choices(_FORMALITIES[0], cum_weights=_FORMALITIES[1])[0],
+                CATEGORY_ZONES[category],
+                last_worn,
+            )
+        )
+    return rows
+
+
+class _OutfitPicker:
+    """Draws outfits from one closet, favouring a Zipf-weighted set of pieces."""
+
+    def __init__(self, closet: Sequence[tuple[Any, ...]], rng: random.Random) -> None:
+        self.rng = rng
+        self.by_category: dict[str, tuple[list[tuple[Any, ...]], list[float]]] = {}
+        for category in CATEGORY_WEIGHTS:
+            items = [row for row in closet if row[3] == category]
+            rng.shuffle(items)
+            weights = list(accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(items))))
+            self.by_category[category] = (items, weights)
+
+    def _pick(self, category: str) -> Optional[tuple[Any, ...]]:
+        items, weights = self.by_category[category]
+        if not items:
+            return None
+        return self.rng.choices(items, cum_weights=weights)[0]
+
+    def outfit(self) -> list[tuple[Any, ...]]:
+        rng = self.rng
+        if self.by_category["dress"][0] and rng.random() < 0.15:
+            base = [self._pick("dress")]
+        else:
+            base = [self._pick("top"), self._pick("bottom")]
+        extras = [self._pick("shoes")]
+        if rng.random() < 0.5:
+            extras.append(self._pick("outerwear"))
+        if rng.random() < 0.6:
+            extras.append(self._pick("accessory"))
+        outfit, seen = [], set()
+        for item in (*base, *extras):
+            if item is not None and item[0] not in seen:
+                seen.add(item[0])
+                outfit.append(item)
+        return outfit
+
+
+def _verdict(
+    decision: str, rng: random.Random
+) -> tuple[Optional[int], Optional[str], Optional[str]]:
+    """(rating, future_intent, notes) consistent with ``decision``."""
+
+    if decision == "accepted":
+        rating = rng.choices((3, 4, 5), weights=(15, 45, 40))[0]
+    elif decision == "rejected":
+        rating = rng.choices((1, 2, 3), weights=(35, 45, 20))[0]
+    else:
+        rating = None if rng.random() < 0.7 else rng.choice((2, 3, 4))
+    if rating is not None and rating >= 4:
+        intent = "try_again"
+    elif decision == "rejected" and (rating == 1 or rng.random() < 0.1):
+        intent = "do_not_recommend"
+    else:
+        intent = "maybe_later"
+    notes = None
+    if rating is not None and rng.random() < 0.2:
+        notes = "Loved the layering." if rating >= 4 else "Not quite right for the day."
+    return rating, intent, notes
+
+
+def feedback_rows(
+    user_id: str,
+    closet: Sequence[tuple[Any, ...]],
+    first_event_id: int,
+    spec: SyntheticSpec,
+    rng: random.Random,
+) -> Iterator[tuple[tuple[Any, ...], list[tuple[Any, ...]]]]:
+    """One user's ``(outfit_feedback row, item_feedback rows)`` pairs, oldest first."""
+
+    if not closet or spec.events_per_user <= 0:
+        return
+    picker = _OutfitPicker(closet, rng)
+    favourites = [picker.outfit() for _ in range(spec.favourite_combos)]
+    slates = -(-spec.events_per_user // spec.slate_size)
+    # One slate per session, spread over the history window, recent-heavy.
+    starts = sorted(
+        datetime.combine(spec.today, datetime.min.time())
+        - timedelta(days=_days_ago(rng, spec), minutes=rng.randrange(24 * 60))
+        for _ in range(slates)
+    )
+    event_id = first_event_id
+    remaining = spec.events_per_user
+    for slate, started in enumerate(starts):
+        size = min(spec.slate_size, remaining)
+        remaining -= size
+        accepted = rng.randrange(size) if rng.random() < 0.8 else None
+        for position in range(size):
+            items = (
+                rng.choice(favourites) if favourites and rng.random() < 0.25 else picker.outfit()
+            )
+            if not items:
+                continue
+            decision = (
+                "accepted"
+                if position == accepted
+                else rng.choices(("rejected", "skipped"), weights=(60, 40))[0]
+            )
+            rating, intent, notes = _verdict(decision, rng)
+            created_at = (started + timedelta(seconds=position * 20)).strftime("%Y-%m-%d %H:%M:%S")
+            outfit_id = f"{user_id}-{position + 1:02d}"
+            lead = items[0]
+            outfit_row = (
+                event_id,
+                user_id,
+                outfit_id,
+                f"{lead[4].title()} {rng.choice(STYLE_WORDS)}",
+                " + ".join(item[2] for item in items),
+                decision,
+                rating,
+                intent,
+                notes,
+                None,
+                created_at,
+                f"synthetic-{user_id}-{slate:06d}",
+            )
+            item_rows = [
+                (
+                    event_id,
+                    user_id,
+                    outfit_id,
+                    str(item[0]),
+                    item[2],
+                    decision,
+                    rating,
+                    intent,
+                    notes,
+                    created_at,
+                )
+                for item in items
+            ]
+            yield outfit_row, item_rows
+            event_id += 1
+
+
+@contextmanager
+def ingest_mode(conn: sqlite3.Connection, tables: Sequence[str]) -> Iterator[None]:
+    """Bulk-load settings: no fsync, in-memory journal, big cache, deferred indexes.
+
+    Secondary indexes and triggers on ``tables`` are dropped for the load and
+    recreated afterwards (which also re-checks unique indexes); the connection
+    then switches to the WAL settings the tools use.
+    """
+
+    placeholders = ",".join("?" for _ in tables)
+    deferred = conn.execute(
+        f"""
+        SELECT type, name, sql FROM sqlite_master
+        WHERE tbl_name IN ({placeholders}) AND type IN ('index', 'trigger') AND sql IS NOT NULL
+        """,
+        list(tables),
+    ).fetchall()
+    conn.execute("PRAGMA journal_mode=MEMORY")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-262144")
+    with conn:
+        for kind, name, _ in deferred:
+            conn.execute(f'DROP {kind.upper()} IF EXISTS "{name}"')
+    try:
+        yield
+    finally:
+        with conn:
+            for _, _, sql in sorted(deferred, key=lambda entry: entry[0]):
+                conn.execute(sql)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+
+def _flush(conn: sqlite3.Connection, statement: str, rows: list[tuple[Any, ...]]) -> int:
+    if not rows:
+        return 0
+    with conn:
+        conn.executemany(statement, rows)
+    count = len(rows)
+    rows.clear()
+    return count
+
+
+def _stamp_data_versions(conn: sqlite3.Connection, table: str) -> None:
+    conn.execute(f"""
+        INSERT OR IGNORE INTO data_versions (user_id, version, updated_at)
+        SELECT user_id, 1, julianday('now') FROM {table} GROUP BY user_id
+        """)
+
+
+def _reset(path: Path, overwrite: bool) -> None:
+    sidecars = [path, path.with_name(f"{path.name}-wal"), path.with_name(f"{path.name}-shm")]
+    if path.exists() and not overwrite:
+        raise FileExistsError(f"{path} already exists; pass overwrite=True to replace it.")
+    for sidecar in sidecars:
+        sidecar.unlink(missing_ok=True)
+
+
+def generate_synthetic_dbs(
+    directory: Path,
+    spec: Optional[SyntheticSpec] = None,
+    *,
+    overwrite: bool = False,
+) -> SyntheticDataset:
+    """Write ``wardrobe.db`` and ``preferences.db`` for ``spec`` under ``directory``."""
+
+    spec = spec or SyntheticSpec()
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    dataset = SyntheticDataset(
+        wardrobe_db=directory / "wardrobe.db",
+        preference_db=directory / "preferences.db",
+        spec=spec,
+    )
+    for path in (dataset.wardrobe_db, dataset.preference_db):
+        _reset(path, overwrite)
+
+    started = time.perf_counter()
+    rng = random.Random(spec.seed)
+    wardrobe = sqlite3.connect(dataset.wardrobe_db)
+    preferences = sqlite3.connect(dataset.preference_db)
+    try:
+        migrate_wardrobe_db(wardrobe)
+        migrate_preference_db(preferences)
+        with (
+            ingest_mode(wardrobe, ["wardrobe_items"]),
+            ingest_mode(preferences, ["outfit_feedback", "item_feedback"]),
+        ):
+            closet_buffer: list[tuple[Any, ...]] = []
+            outfit_buffer: list[tuple[Any, ...]] = []
+            item_buffer: list[tuple[Any, ...]] = []
+            next_item_id = next_event_id = 1
+            for user_id in spec.user_ids():
+                closet = closet_rows(user_id, next_item_id, spec, rng)
+                next_item_id += len(closet)
+                closet_buffer.extend(closet)
+                for outfit_row, item_rows in feedback_rows(
+                    user_id, closet, next_event_id, spec, rng
+                ):
+                    outfit_buffer.append(outfit_row)
+                    item_buffer.extend(item_rows)
+                    next_event_id += 1
+                    if len(item_buffer) >= spec.batch_size:
+                        dataset.outfit_rows += _flush(preferences, OUTFIT_INSERT, outfit_buffer)
+                        dataset.item_rows += _flush(preferences, ITEM_INSERT, item_buffer)
+                if len(closet_buffer) >= spec.batch_size:
+                    dataset.wardrobe_rows += _flush(wardrobe, WARDROBE_INSERT, closet_buffer)
+            dataset.wardrobe_rows += _flush(wardrobe, WARDROBE_INSERT, closet_buffer)
+            dataset.outfit_rows += _flush(preferences, OUTFIT_INSERT, outfit_buffer)
+            dataset.item_rows += _flush(preferences, ITEM_INSERT, item_buffer)
+
+        with wardrobe:
+            _stamp_data_versions(wardrobe, "wardrobe_items")
+            wardrobe.execute("ANALYZE")
+        with preferences:
+            _stamp_data_versions(preferences, "outfit_feedback")
+            rebuild_affinity(preferences)
+            rebuild_metrics(preferences)
+            preferences.execute("ANALYZE")
+    finally:
+        wardrobe.close()
+        preferences.close()
+    dataset.seconds = time.perf_counter() - started
+    return dataset
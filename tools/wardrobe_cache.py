@@ -0,0 +1,156 @@
+"""In-process wardrobe snapshot cache shared by the wardrobe tools."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Optional
+
+DEFAULT_TTL_S = float(os.getenv("FRESHFIT_WARDROBE_CACHE_TTL_S", "300"))
+DEFAULT_MAX_USERS = 256
+
+
+class _UserSnapshot:
+    """All cached query results for one user, sharing a single expiry."""
+
+    __slots__ = ("expires_at", "results")
+
+    def __init__(self, expires_at: float) -> None:
+        self.expires_at = expires_at
+        self.results: dict[Hashable, dict[str, Any]] = {}
+
+
+def _copy_response(value: dict[str, Any]) -> dict[str, Any]:
+    """Copy a tool response down to its row dicts (rows hold only scalars)."""
+
+    return {
+        key: (
+            [dict(row) if isinstance(row, dict) else row for row in rows]
+            if isinstance(rows, list)
+            else rows
+        )
+        for key, rows in value.items()
+    }
+
+
+class WardrobeSnapshotCache:
+    """Per-user LRU + TTL cache holding fully serialized tool responses.
+
+    Values are the dicts returned by ``fetch_demo_wardrobe_items``. They are copied
+    on the way in and out, so a caller mutating its rows cannot corrupt the
+    snapshot other callers see. Writes through the wardrobe tools invalidate the
+    affected user; changes made by other processes are bounded by the TTL.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_users: int = DEFAULT_MAX_USERS,
+        ttl_s: float = DEFAULT_TTL_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_users = max_users
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._snapshots: OrderedDict[str, _UserSnapshot] = OrderedDict()
+        self._generation: dict[str, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def generation(self, user_id: str) -> int:
+        """Return a counter that changes whenever ``user_id`` is invalidated."""
+
+        with self._lock:
+            return self._epoch + self._generation.get(user_id, 0)
+
+    def get(self, user_id: str, key: Hashable) -> Optional[dict[str, Any]]:
+        """Return the cached response for ``(user_id, key)`` or ``None``."""
+
+        if self.ttl_s <= 0:
+            return None
+        with self._lock:
+            snapshot = self._snapshots.get(user_id)
+            if snapshot is not None and snapshot.expires_at <= self._clock():
+                del self._snapshots[user_id]
+                self.expirations += 1
+                snapshot = None
+            value = snapshot.results.get(key) if snapshot is not None else None
+            if value is None:
+                self.misses += 1
+                return None
+            self._snapshots.move_to_end(user_id)
+            self.hits += 1
+        return _copy_response(value)
+
+    def put(
+        self,
+        user_id: str,
+        key: Hashable,
+        value: dict[str, Any],
+        *,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Store a response unless ``user_id`` was invalidated since ``generation``."""
+
+        if self.ttl_s <= 0:
+            return
+        value = _copy_response(value)
+        with self._lock:
+            current = self._epoch + self._generation.get(user_id, 0)
+            if generation is not None and generation != current:
+                # A write landed while this result was being read; don't cache it.
+                return
+            snapshot = self._snapshots.get(user_id)
+            if snapshot is None:
+                snapshot = _UserSnapshot(self._clock() + self.ttl_s)
+                self._snapshots[user_id] = snapshot
+            snapshot.results[key] = value
+            self._snapshots.move_to_end(user_id)
+            while len(self._snapshots) > self.max_users:
+                self._snapshots.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Drop one user's snapshot, or every snapshot when ``user_id`` is None."""
+
+        with self._lock:
+            self.invalidations += 1
+            if user_id is None:
+                self._epoch += 1
+                self._snapshots.clear()
+                return
+            self._generation[user_id] = self._generation.get(user_id, 0) + 1
+            self._snapshots.pop(user_id, None)
+            if len(self._generation) > self.max_users:
+                # Fold per-user counters into the epoch so the map stays bounded.
+                # Every user's generation still only moves forward, so in-flight
+                # reads started before the fold are never cached.
+                self._epoch += max(self._generation.values()) + 1
+                self._generation.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit-rate and eviction counters."""
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "users": len(self._snapshots),
+                "ttl_s": self.ttl_s,
+            }
+
+
+wardrobe_cache = WardrobeSnapshotCache()
@@ -0,0 +1,177 @@
+"""Persistent weather cache keyed by normalized location and ISO date."""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+from tools.db_pool import get_pool
+from tools.migrations import migrate_weather_cache_db
+
+DB_PATH = Path(
+    os.getenv(
+        "FRESHFIT_WEATHER_CACHE_PATH",
+        Path(__file__).resolve().parents[1] / "data" / "weather_cache.db",
+    )
+)
+
+CacheMode = Literal["swr", "strict", "off"]
+DEFAULT_MODE: CacheMode = os.getenv("FRESHFIT_WEATHER_CACHE_MODE", "swr")  # type: ignore[assignment]
+# Same-day conditions move fastest; forecasts for later days are revised a few
+# times a day; observed (past) weather never changes.
+TTL_TODAY_S = float(os.getenv("FRESHFIT_WEATHER_TTL_TODAY_S", "3600"))
+TTL_FUTURE_S = float(os.getenv("FRESHFIT_WEATHER_TTL_FUTURE_S", "21600"))
+TTL_PAST_S = 30 * 24 * 3600.0
+STALE_GRACE_S = float(os.getenv("FRESHFIT_WEATHER_STALE_S", "86400"))
+
+_NON_KEY_CHARS = re.compile(r"[^\w, ]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_location(location: str) -> str:
+    """Canonical cache key for a free-text location ("Seattle,  WA." -> "seattle, wa")."""
+
+    text = _NON_KEY_CHARS.sub(" ", location.casefold())
+    parts = [_SPACES.sub(" ", part).strip() for part in text.split(",")]
+    return ", ".join(part for part in parts if part)
+
+
+@dataclass(frozen=True)
+class CachedWeather:
+    """A cache hit; ``fresh`` is False inside the stale-while-revalidate window."""
+
+    payload: dict[str, Any]
+    fetched_at: float
+    age_s: float
+    fresh: bool
+
+
+class WeatherCache:
+    """SQLite-backed weather results with date-dependent freshness tiers."""
+
+    def __init__(
+        self,
+        db_path: Path = DB_PATH,
+        *,
+        ttl_today_s: float = TTL_TODAY_S,
+        ttl_future_s: float = TTL_FUTURE_S,
+        ttl_past_s: float = TTL_PAST_S,
+        stale_grace_s: float = STALE_GRACE_S,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._pool = get_pool(db_path, initializer=migrate_weather_cache_db, create_missing=True)
+        self.ttl_today_s = ttl_today_s
+        self.ttl_future_s = ttl_future_s
+        self.ttl_past_s = ttl_past_s
+        self.stale_grace_s = stale_grace_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def ttl_for(self, forecast_date: str, today: date) -> float:
+        """Freshness lifetime for an entry about ``forecast_date``."""
+
+        try:
+            day = date.fromisoformat(forecast_date)
+        except ValueError:
+            return self.ttl_today_s
+        if day < today:
+            return self.ttl_past_s
+        if day == today:
+            return self.ttl_today_s
+        return self.ttl_future_s
+
+    def get(
+        self, location: str, forecast_date: str, *, today: Optional[date] = None
+    ) -> Optional[CachedWeather]:
+        """Return a fresh or stale-but-servable entry, else ``None``."""
+
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                """
+                SELECT payload, fetched_at
+                FROM weather_cache
+                WHERE location_key = ? AND forecast_date = ?
+                """,
+                (normalize_location(location), forecast_date),
+            ).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+
+        age_s = max(self._clock() - row["fetched_at"], 0.0)
+        ttl_s = self.ttl_for(forecast_date, today or date.today())
+        if age_s <= ttl_s:
+            self._count("hits")
+            fresh = True
+        elif age_s <= ttl_s + self.stale_grace_s:
+            self._count("stale_hits")
+            fresh = False
+        else:
+            self._count("misses")
+            return None
+        return CachedWeather(json.loads(row["payload"]), row["fetched_at"], age_s, fresh)
+
+    def put(
+        self,
+        locations: Iterable[str],
+        forecast_date: str,
+        payload: dict[str, Any],
+    ) -> None:
+        """Store ``payload`` under every distinct normalized location alias."""
+
+        keys = {normalize_location(location) for location in locations if location}
+        keys.discard("")
+        if not keys:
+            return
+        fetched_at = self._clock()
+        encoded = json.dumps(payload, separators=(",", ":"))
+        with self._pool.connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO weather_cache (location_key, forecast_date, payload, fetched_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (location_key, forecast_date) DO UPDATE SET
+                    payload = excluded.payload,
+                    fetched_at = excluded.fetched_at
+                """,
+                [(key, forecast_date, encoded, fetched_at) for key in sorted(keys)],
+            )
+
+    def purge(self, *, older_than_s: float = TTL_PAST_S) -> int:
+        """Delete entries fetched more than ``older_than_s`` ago."""
+
+        with self._pool.connection() as conn:
+            return conn.execute(
+                "DELETE FROM weather_cache WHERE fetched_at < ?",
+                (self._clock() - older_than_s,),
+            ).rowcount
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/stale/miss counters."""
+
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else None,
+            }
+
+
+weather_cache = WeatherCache()
@@ -0,0 +1,261 @@
+"""Asyncio write-behind queue that group-commits feedback and wear events.
+
+The CLI and agents hand events to :class:`WriteBehindQueue` and move on; a
+background task collects them until ``max_batch`` jobs are waiting or the oldest
+has waited ``max_delay_s``, then writes each database in one transaction on a
+worker thread. Both writers are idempotent, so a failed group is retried job by
+job without duplicating rows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Optional, Union
+
+from google.adk.tools.function_tool import FunctionTool
+
+from tools.demo_wardrobe_tool import parse_worn_date, record_wear_events
+from tools.feedback_writer import FeedbackBatch, record_feedback_batches
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = int(os.getenv("FRESHFIT_WRITE_BEHIND_MAX_BATCH", "64"))
+DEFAULT_MAX_DELAY_S = float(os.getenv("FRESHFIT_WRITE_BEHIND_MAX_DELAY_MS", "250")) / 1000
+DEFAULT_MAX_DEPTH = 1024
+
+
+@dataclass(frozen=True)
+class WearEvent:
+    """Items worn by a user on a given day."""
+
+    user_id: str
+    item_ids: tuple[str, ...]
+    worn_date: Optional[str] = None
+
+
+Job = Union[FeedbackBatch, WearEvent]
+
+
+@dataclass
+class WriteBehindStats:
+    """Queue depth and flush latency counters."""
+
+    enqueued: int = 0
+    written: int = 0
+    failed: int = 0
+    flushes: int = 0
+    flush_reasons: dict[str, int] = field(
+        default_factory=lambda: {"size": 0, "time": 0, "drain": 0}
+    )
+    max_depth: int = 0
+    last_flush_ms: float = 0.0
+    max_flush_ms: float = 0.0
+    total_flush_ms: float = 0.0
+    max_lag_ms: float = 0.0
+
+    def snapshot(self, depth: int) -> dict[str, Any]:
+        return {
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "flush_reasons": dict(self.flush_reasons),
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "avg_flush_ms": round(self.total_flush_ms / self.flushes, 3) if self.flushes else None,
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "max_lag_ms": round(self.max_lag_ms, 3),
+        }
+
+
+def _write_group(jobs: Sequence[Job]) -> None:
+    """Write one group: a single transaction per database."""
+
+    feedback = [job for job in jobs if isinstance(job, FeedbackBatch)]
+    wear = [job for job in jobs if isinstance(job, WearEvent)]
+    if feedback:
+        record_feedback_batches(feedback)
+    if wear:
+        record_wear_events([(job.user_id, job.item_ids, job.worn_date) for job in wear])
+
+
+class WriteBehindQueue:
+    """Bounded queue drained by one background task; use as an async context manager."""
+
+    def __init__(
+        self,
+        *,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_delay_s: float = DEFAULT_MAX_DELAY_S,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+    ) -> None:
+        self.max_batch = max_batch
+        self.max_delay_s = max_delay_s
+        self.stats = WriteBehindStats()
+        self._queue: asyncio.Queue[tuple[float, Optional[Job]]] = asyncio.Queue(max_depth)
+        self._task: Optional[asyncio.Task[None]] = None
+
+    async def __aenter__(self) -> WriteBehindQueue:
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        global _ACTIVE
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            _ACTIVE = self
+
+    async def close(self) -> None:
+        """Flush everything already queued, then stop the background task."""
+
+        global _ACTIVE
+        if self._task is None:
+            return
+        await self._queue.put((time.perf_counter(), None))
+        await self._task
+        self._task = None
+        if _ACTIVE is self:
+            _ACTIVE = None
+
+    async def put(self, job: Job) -> None:
+        """Enqueue a job, waiting only when the queue is full (backpressure)."""
+
+        if self._task is None:
+            raise RuntimeError("WriteBehindQueue is not running; call start() first.")
+        await self._queue.put((time.perf_counter(), job))
+        self.stats.enqueued += 1
+        self.stats.max_depth = max(self.stats.max_depth, self._queue.qsize())
+
+    async def submit_feedback(
+        self,
+        user_id: str,
+        events: Sequence[Mapping[str, Any]],
+        outfit_lookup: Mapping[str, Mapping[str, Any]],
+        *,
+        session_id: str,
+    ) -> None:
+        await self.put(FeedbackBatch(user_id, session_id, list(events), outfit_lookup))
+
+    async def submit_wear(
+        self, user_id: str, item_ids: Sequence[str], worn_date: Optional[str] = None
+    ) -> None:
+        await self.put(WearEvent(user_id, tuple(map(str, item_ids)), worn_date))
+
+    def snapshot(self) -> dict[str, Any]:
+        return self.stats.snapshot(self._queue.qsize())
+
+    async def _next(self, deadline: float) -> Optional[tuple[float, Optional[Job]]]:
+        """Return the next queued entry, or None once ``deadline`` has passed."""
+
+        timeout = deadline - time.perf_counter()
+        try:
+            if timeout <= 0:
+                return self._queue.get_nowait()
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except (asyncio.QueueEmpty, asyncio.TimeoutError):
+            return None
+
+    async def _run(self) -> None:
+        draining = False
+        while not draining:
+            enqueued_at, job = await self._queue.get()
+            group: list[tuple[float, Job]] = []
+            deadline = enqueued_at + self.max_delay_s
+            while True:
+                if job is None:
+                    draining = True
+                    break
+                group.append((enqueued_at, job))
+                if len(group) >= self.max_batch:
+                    break
+                entry = await self._next(deadline)
+                if entry is None:
+                    break
+                enqueued_at, job = entry
+
+            if draining:
+                reason = "drain"
+                # Keep anything that raced in behind the stop sentinel.
+                while not self._queue.empty():
+                    enqueued_at, job = self._queue.get_nowait()
+                    if job is not None:
+                        group.append((enqueued_at, job))
+            elif len(group) >= self.max_batch:
+                reason = "size"
+            else:
+                reason = "time"
+            if group:
+                await self._flush(group, reason)
+
+    async def _flush(self, group: list[tuple[float, Job]], reason: str) -> None:
+        jobs = [job for _, job in group]
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(_write_group, jobs)
+            self.stats.written += len(jobs)
+        except Exception:
+            logger.warning("Group write of %d jobs failed; retrying individually.", len(jobs))
+            for job in jobs:
+                try:
+                    await asyncio.to_thread(_write_group, [job])
+                    self.stats.written += 1
+                except Exception:
+                    self.stats.failed += 1
+                    logger.exception("Dropping write-behind job %r", job)
+        finished = time.perf_counter()
+        elapsed_ms = (finished - started) * 1000
+        self.stats.flushes += 1
+        self.stats.flush_reasons[reason] += 1
+        self.stats.last_flush_ms = elapsed_ms
+        self.stats.total_flush_ms += elapsed_ms
+        self.stats.max_flush_ms = max(self.stats.max_flush_ms, elapsed_ms)
+        self.stats.max_lag_ms = max(
+            self.stats.max_lag_ms, (finished - min(at for at, _ in group)) * 1000
+        )
+
+
+_ACTIVE: Optional[WriteBehindQueue] = None
+
+
+def active_queue() -> Optional[WriteBehindQueue]:
+    """Return the running queue (set by ``start()``), if any."""
+
+    return _ACTIVE
+
+
+async def log_worn_items(
+    user_id: str, item_ids: list[str], worn_date: Optional[str] = None
+) -> dict[str, Any]:
+    """Record that the user wore the given items today (or on worn_date).
+
+    Args:
+        user_id: The owner of the items.
+        item_ids: Wardrobe item_ids that were worn.
+        worn_date: Optional ISO date (defaults to today); future dates are rejected.
+
+    Returns:
+        Confirmation dict; writes are queued when the write-behind queue is running.
+    """
+
+    try:
+        worn_date = parse_worn_date(worn_date)
+    except ValueError as exc:
+        return {"status": "error", "message": str(exc)}
+    queue = active_queue()
+    if queue is not None:
+        await queue.submit_wear(user_id, item_ids, worn_date)
+        return {"status": "queued", "items": len(item_ids), "worn_date": worn_date}
+    updated = await asyncio.to_thread(record_wear_events, [(user_id, item_ids, worn_date)])
+    return {"status": "success", "updated": updated, "worn_date": worn_date}
+
+
+log_worn_items_tool = FunctionTool(log_worn_items)